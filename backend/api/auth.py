@@ -2,13 +2,15 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from backend.db.session import get_app_session
+from backend.db.session import AppSessionLocal, run_db
 from backend.db.models import User
-from backend.core.auth import verify_password, create_access_token, decode_token
+from backend.core.auth import create_access_token, decode_token, password_needs_rehash
 from backend.core.config import get_settings
 from backend.deps import get_current_active_user
+from backend.services.auth_epochs import auth_epochs
+from backend.services.password_pool import PasswordPoolBusy, password_pool
 
 settings = get_settings()
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -33,12 +35,50 @@ class UserResponse(BaseModel):
     active: int
 
 
+def _load_user(username: str) -> Optional[User]:
+    with AppSessionLocal() as db:
+        user = db.query(User).filter(User.username == username).first()
+        if user is not None:
+            db.expunge(user)
+        return user
+
+
+def _store_password_hash(user_id: int, password_hash: str) -> None:
+    with AppSessionLocal() as db:
+        db.query(User).filter(User.id == user_id).update({User.password_hash: password_hash})
+        db.commit()
+
+
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_app_session)):
-    """Authenticate user and return JWT token."""
-    user = db.query(User).filter(User.username == credentials.username).first()
+async def login(credentials: LoginRequest):
+    """Authenticate user and return JWT token.
+    bcrypt runs on the bounded password pool and the user lookup on the DB
+    executor, so a burst of logins can't tie up the threads serving scans;
+    when too many logins are already queued the answer is 503 + Retry-After."""
+    user = await run_db(_load_user, credentials.username)
+    
+    try:
+        valid = user is not None and await password_pool.verify_async(credentials.password, user.password_hash)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins at once, please try again in a moment",
+            headers={"Retry-After": "2"},
+        )
+    
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    # Re-read after the ~250 ms verify: a supervisor may have revoked, deactivated or
+    # reset the password of the user meanwhile, and the token must carry the epoch /
+    # flag as they are now
+    verified_hash = user.password_hash
+    user = await run_db(_load_user, credentials.username)
+    if user is None or user.password_hash != verified_hash:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -51,10 +91,27 @@ def login(credentials: LoginRequest, db: Session = Depends(get_app_session)):
             detail="User account is inactive"
         )
     
+    # BCRYPT_ROUNDS changed since this hash was made: upgrade it while we have the password
+    if password_needs_rehash(user.password_hash):
+        try:
+            new_hash = await password_pool.hash_async(credentials.password)
+            await run_db(_store_password_hash, user.id, new_hash)
+        except PasswordPoolBusy:
+            pass  # busy right now; the next login will do it
+    
+    # Publish the current epoch so this token is authorized from its claims
+    auth_epochs.set(user.id, user.auth_epoch, user.active)
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username, "user_id": user.id, "role": user.role.value},
+        data={
+            "sub": user.username,
+            "user_id": user.id,
+            "uid": user.id,
+            "role": user.role.value,
+            "auth_epoch": user.auth_epoch or 0,  # revoked once the user's epoch is bumped
+        },
         expires_delta=access_token_expires
     )
     
@@ -1,5 +1,17 @@
 # backend/api/health.py
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+
+from backend.db.session import pool_metrics
+from backend.deps import require_supervisor
+from backend.services import ups_service
+from backend.services.carrier_log import debug_sink
+from backend.services.carrier_http import carrier_http
+from backend.services.auth_epochs import auth_epochs
+from backend.services.password_pool import password_pool
+from backend.services.user_cache import user_cache
 
 router = APIRouter(prefix="/api", tags=["system"])
 
@@ -7,3 +19,46 @@ router = APIRouter(prefix="/api", tags=["system"])
 def health_check():
     """Simple heartbeat endpoint for uptime checks."""
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+def metrics(current_user = Depends(require_supervisor)):
+    """Runtime metrics: carrier API call counts, retries and latency per endpoint; auth user cache hit rate, epoch map state bcrypt queue depth and DB connection pool usage."""
+    return {
+        "carrier_http": carrier_http.metrics(),
+        "ups_rate_limiter": ups_service.rate_limiter.snapshot(),
+        "auth_user_cache": user_cache.metrics(),
+        "auth_epochs": auth_epochs.status(),
+        "password_pool": password_pool.metrics(),
+        "db_pool": pool_metrics(),
+    }
+
+
+class CarrierDebugIn(BaseModel):
+    enabled: bool
+    minutes: Optional[float] = Field(default=None, gt=0, le=24 * 60)  # switch itself off after this long
+
+
+@router.get("/carrier-debug")
+def get_carrier_debug(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user = Depends(require_supervisor)
+):
+    """Capture state and the latest redacted carrier request/response pairs (newest first)."""
+    return {**debug_sink.state(), "items": debug_sink.entries(limit)}
+
+
+@router.put("/carrier-debug")
+def set_carrier_debug(body: CarrierDebugIn, current_user = Depends(require_supervisor)):
+    """Turn capture of redacted carrier payloads on or off at runtime."""
+    if body.enabled:
+        debug_sink.enable(body.minutes)
+    else:
+        debug_sink.disable()
+    return debug_sink.state()
+
+
+@router.delete("/carrier-debug")
+def clear_carrier_debug(current_user = Depends(require_supervisor)):
+    debug_sink.clear()
+    return debug_sink.state()
@@ -1,8 +1,10 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
-from backend.services.report import generate_packing_slip_via_excel
-from backend.services.report_html import generate_packing_slip_pdf
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from backend.services.report import render_packing_slip_in_pool
+from backend.services.report_html import render_packing_slip_pdf
+from backend.services.browser_pool import BrowserRenderTimeout
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy import func, select, cast, Date
@@ -10,15 +12,40 @@ from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 from datetime import datetime, date, timedelta
 
-from backend.db.session import get_app_session as get_db
+from backend.db.session import get_app_session as get_db, AppSessionLocal, run_db
 from backend.db import models , oes_read
 from backend.services import pack_view
 from backend.services import ups_service
+from backend.services import prerender
+from backend.services import print_queue
+from backend.services import stations
+from backend.services.render_cache import SLIP_PDF, LABELS_HTML
+from backend.services.label_cache import label_cache, box_label, render_label
 from backend.core.config import get_settings
-from backend.deps import get_current_active_user, require_supervisor
+from backend.deps import get_current_active_user, require_supervisor, require_supervisor_async, get_station_id
 
 router = APIRouter(prefix="/api/pack", tags=["pack"])
 
+PDF_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _pdf_response(pdf_bytes: bytes, filename: str) -> StreamingResponse:
+    """Stream an in-memory PDF with an explicit Content-Length."""
+    view = memoryview(pdf_bytes)
+
+    def chunks():
+        for i in range(0, len(view), PDF_STREAM_CHUNK_BYTES):
+            yield view[i:i + PDF_STREAM_CHUNK_BYTES]
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(len(pdf_bytes)),
+        }
+    )
+
 # ---------------------------------------------------------------------
 # Completed Packs History (Supervisor Only)
 # ---------------------------------------------------------------------
@@ -154,6 +181,123 @@ def list_completed_packs(
     return completed_packs
 
 
+@router.get("/completed/packing-slips")
+def export_completed_packing_slips(
+    date: Optional[str] = Query(None, description="Export all packs completed on this date (YYYY-MM-DD)"),
+    pack_ids: Optional[List[int]] = Query(None, description="Export these completed packs instead of a date"),
+    format: str = Query("zip", description="zip (one PDF per pack) or pdf (single merged PDF, "
+                                           "at most BATCH_EXPORT_MAX_MERGED_PACKS packs)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_supervisor)
+):
+    """
+    Export the packing slips of many completed packs in one download.
+    Slips are rendered in parallel on the browser pool and streamed back as a
+    ZIP or a single merged PDF. The merged PDF is built in memory, so it is
+    limited to fewer packs; ZIP handles up to BATCH_EXPORT_MAX_PACKS.
+    Supervisor only endpoint.
+    """
+    from backend.services.slip_export import export_packing_slips, iter_file
+
+    if not date and not pack_ids:
+        raise HTTPException(400, "Provide a date or pack_ids")
+
+    query = db.query(models.Pack.id).filter(models.Pack.status == 'complete')
+    if pack_ids:
+        query = query.filter(models.Pack.id.in_(pack_ids))
+    if date:
+        try:
+            filter_date = datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD")
+        query = query.filter(cast(models.Pack.completed_at, Date) == filter_date)
+
+    ids = [r.id for r in query.order_by(models.Pack.completed_at, models.Pack.id).all()]
+    if not ids:
+        raise HTTPException(404, "No completed packs found")
+
+    settings = get_settings()
+    if len(ids) > settings.BATCH_EXPORT_MAX_PACKS:
+        raise HTTPException(400, f"Too many packs ({len(ids)}); the limit is {settings.BATCH_EXPORT_MAX_PACKS}")
+
+    try:
+        out, size, skipped = export_packing_slips(ids, format)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    label = date or f"{len(ids)}_packs"
+    filename = f"packing_slips_{label}.{format}"
+    return StreamingResponse(
+        iter_file(out),
+        media_type="application/zip" if format == "zip" else "application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(size),
+            "X-Exported-Packs": str(len(ids) - len(skipped)),
+            "X-Skipped-Packs": ",".join(str(s["pack_id"]) for s in skipped),
+        },
+        # Close (and delete, if it spilled to disk) the spool even if the client disconnects
+        background=BackgroundTask(out.close),
+    )
+
+
+@router.post("/completed/ups-rates")
+def rate_completed_packs(
+    date: Optional[str] = Query(None, description="Rate all packs completed on this date (YYYY-MM-DD)"),
+    pack_ids: Optional[List[int]] = Query(None, description="Rate these completed packs instead of a date"),
+    refresh: bool = Query(False, description="Ask UPS even for shipments with a cached quote"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_supervisor)
+):
+    """
+    Get UPS rates for many completed packs at once, each at its OES service
+    level. Quotes run concurrently under the UPS rate limit; the run is saved
+    and returned as one row per pack (failed packs carry an "error").
+    Supervisor only endpoint.
+    """
+    from backend.services import bulk_rating
+
+    if not date and not pack_ids:
+        raise HTTPException(400, "Provide a date or pack_ids")
+
+    filter_date = None
+    query = db.query(models.Pack.id).filter(models.Pack.status == 'complete')
+    if pack_ids:
+        query = query.filter(models.Pack.id.in_(pack_ids))
+    if date:
+        try:
+            filter_date = datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD")
+        query = query.filter(cast(models.Pack.completed_at, Date) == filter_date)
+
+    ids = [r.id for r in query.order_by(models.Pack.completed_at, models.Pack.id).all()]
+    if not ids:
+        raise HTTPException(404, "No completed packs found")
+
+    settings = get_settings()
+    if len(ids) > settings.BULK_RATE_MAX_PACKS:
+        raise HTTPException(400, f"Too many packs ({len(ids)}); the limit is {settings.BULK_RATE_MAX_PACKS}")
+
+    try:
+        return bulk_rating.rate_packs(
+            db, ids, completion_date=filter_date, user_id=current_user.id, use_cache=not refresh
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.get("/completed/ups-rates/{batch_id}")
+def get_rate_batch(batch_id: int, db: Session = Depends(get_db), current_user = Depends(require_supervisor)):
+    """A saved bulk rating run with its per-pack rows. Supervisor only endpoint."""
+    from backend.services import bulk_rating
+
+    batch = bulk_rating.get_batch(db, batch_id)
+    if batch is None:
+        raise HTTPException(404, "Rate batch not found")
+    return batch
+
+
 @router.post("/{pack_id}/reopen")
 def reopen_pack(
     pack_id: int,
@@ -179,29 +323,129 @@ def reopen_pack(
     pack.completed_by = None
     
     db.commit()
+
+    # Drop pre-rendered slip/labels; the pack is about to change
+    prerender.invalidate(pack_id)
+    label_cache.invalidate_pack(pack_id)
     
     return {"message": "Pack reopened successfully", "pack_id": pack_id, "status": "in_progress"}
 
 
+@router.post("/{pack_id}/refresh-labels")
+def refresh_pack_labels(pack_id: int, current_user = Depends(get_current_active_user)):
+    """
+    Drop the pack's cached slip and box labels so the next print reads the
+    order again. Use after editing the ship-to or attention in OES; otherwise
+    labels pick the edit up within LABEL_CACHE_FAST_PATH_SECONDS.
+    """
+    prerender.invalidate(pack_id)
+    label_cache.invalidate_pack(pack_id)
+    return {"message": "Cached labels dropped", "pack_id": pack_id}
+
+
+def _ups_rate_inputs(db: Session, pack_id: int) -> tuple:
+    """
+    Gather what UPS rating needs for a pack: its boxes (with carton type
+    dimensions filled in), the OES ship-to address and service level, and the
+    configured ship-from address.
+    
+    Returns:
+        (boxes_for_ups, ship_to_address, service_level, ship_from_address)
+    """
+    # Get pack snapshot with boxes
+    pack_snapshot = pack_view.get_pack_snapshot(db, pack_id)
+    
+    if not pack_snapshot.get("boxes"):
+        raise HTTPException(400, "Pack has no boxes")
+    
+    # Get order number and fetch OES data for ship-to address and service level
+    order_no = pack_snapshot["header"]["order_no"]
+    oes_header, _ = oes_read.fetch_order_from_oes(order_no)
+    
+    if not oes_header:
+        raise HTTPException(404, f"Order {order_no} not found in OES")
+    
+    # Build ship-to address from OES data
+    ship_to_address = {
+        "ship_name": oes_header.get("ship_name", ""),
+        "ship_address1": oes_header.get("ship_address1", ""),
+        "ship_address2": oes_header.get("ship_address2"),
+        "ship_city": oes_header.get("ship_city", ""),
+        "ship_province": oes_header.get("ship_province", ""),
+        "ship_postal_code": oes_header.get("ship_postal_code", ""),
+        "ship_country": oes_header.get("ship_country", "US")
+    }
+    
+    # Get service level from OES
+    service_level = oes_header.get("ServiceLevel")
+    
+    # Build ship-from address from config
+    ship_from_address = ups_service.ship_from_address()
+    
+    # Prepare boxes data for UPS service
+    boxes_for_ups = []
+    for box in pack_snapshot["boxes"]:
+        # Get dimensions - prefer custom, fall back to carton type dimensions
+        length = box.get("custom_l_in")
+        width = box.get("custom_w_in")
+        height = box.get("custom_h_in")
+        
+        # If custom dimensions not available, fetch from carton type
+        if not all([length, width, height]):
+            carton_type_id = box.get("carton_type_id")
+            if carton_type_id:
+                carton = db.get(models.CartonType, carton_type_id)
+                if carton:
+                    length = length or getattr(carton, 'length_in', None)
+                    width = width or getattr(carton, 'width_in', None)
+                    height = height or getattr(carton, 'height_in', None)
+        
+        boxes_for_ups.append({
+            "box_no": box.get("box_no"),
+            "custom_l_in": length,
+            "custom_w_in": width,
+            "custom_h_in": height,
+            "weight_lbs": box.get("weight_lbs"),
+            "weight_entered": box.get("weight_entered")
+        })
+    
+    return boxes_for_ups, ship_to_address, service_level, ship_from_address
+
+
+def _completed_pack_rate_inputs(pack_id: int) -> tuple:
+    """_ups_rate_inputs() for a completed pack, on its own session (runs on the DB executor)."""
+    with AppSessionLocal() as db:
+        # Verify pack exists and is completed
+        pack = db.query(models.Pack).filter(models.Pack.id == pack_id).first()
+        if not pack:
+            raise HTTPException(404, "Pack not found")
+        
+        if pack.status != 'complete':
+            raise HTTPException(400, "Pack must be completed to get UPS rates")
+        
+        return _ups_rate_inputs(db, pack_id)
+
+
 @router.post("/{pack_id}/ups-rate")
-def get_ups_rate(
+async def get_ups_rate(
     pack_id: int,
-    db: Session = Depends(get_db),
-    current_user = Depends(require_supervisor)
+    refresh: bool = Query(False, description="Ask UPS even if a cached quote for this shipment exists"),
+    shop: bool = Query(False, description="Quote every eligible service and rank them by price"),
+    current_user = Depends(require_supervisor_async)
 ):
     """
     Get UPS shipping rate for a completed pack.
     Requires supervisor role.
     Returns negotiated rates based on the pack's service level.
+    Quotes for an identical shipment are reused for UPS_RATE_CACHE_TTL_SECONDS;
+    the response's "cache" entry says whether this one was.
+    With shop=true every eligible service is quoted concurrently and the
+    results come back cheapest first; services UPS did not answer within
+    UPS_RATE_SHOP_TIMEOUT_SECONDS are listed under "timed_out".
+    Async: auth runs on the event loop (require_supervisor_async), pack / OES
+    reads on the DB executor, and UPS is awaited, so rating takes none of the
+    threads that serve scanning.
     """
-    # Verify pack exists and is completed
-    pack = db.query(models.Pack).filter(models.Pack.id == pack_id).first()
-    if not pack:
-        raise HTTPException(404, "Pack not found")
-    
-    if pack.status != 'complete':
-        raise HTTPException(400, "Pack must be completed to get UPS rates")
-    
     # Get settings
     settings = get_settings()
     
@@ -223,81 +467,34 @@ def get_ups_rate(
         raise HTTPException(500, "UPS ship-from address not fully configured")
     
     try:
-        # Get pack snapshot with boxes
-        pack_snapshot = pack_view.get_pack_snapshot(db, pack_id)
-        
-        if not pack_snapshot.get("boxes"):
-            raise HTTPException(400, "Pack has no boxes")
-        
-        # Get order number and fetch OES data for ship-to address and service level
-        order_no = pack_snapshot["header"]["order_no"]
-        oes_header, _ = oes_read.fetch_order_from_oes(order_no)
-        
-        if not oes_header:
-            raise HTTPException(404, f"Order {order_no} not found in OES")
-        
-        # Build ship-to address from OES data
-        ship_to_address = {
-            "ship_name": oes_header.get("ship_name", ""),
-            "ship_address1": oes_header.get("ship_address1", ""),
-            "ship_address2": oes_header.get("ship_address2"),
-            "ship_city": oes_header.get("ship_city", ""),
-            "ship_province": oes_header.get("ship_province", ""),
-            "ship_postal_code": oes_header.get("ship_postal_code", ""),
-            "ship_country": oes_header.get("ship_country", "US")
-        }
-        
-        # Get service level from OES
-        service_level = oes_header.get("ServiceLevel")
-        
-        # Build ship-from address from config
-        ship_from_address = {
-            "name": settings.UPS_SHIP_FROM_NAME,
-            "address1": settings.UPS_SHIP_FROM_ADDRESS1,
-            "address2": settings.UPS_SHIP_FROM_ADDRESS2,
-            "city": settings.UPS_SHIP_FROM_CITY,
-            "province": settings.UPS_SHIP_FROM_PROVINCE,
-            "postal_code": settings.UPS_SHIP_FROM_POSTAL_CODE,
-            "country": settings.UPS_SHIP_FROM_COUNTRY
-        }
+        boxes_for_ups, ship_to_address, service_level, ship_from_address = await run_db(
+            _completed_pack_rate_inputs, pack_id
+        )
         
-        # Prepare boxes data for UPS service
-        boxes_for_ups = []
-        for box in pack_snapshot["boxes"]:
-            # Get dimensions - prefer custom, fall back to carton type dimensions
-            length = box.get("custom_l_in")
-            width = box.get("custom_w_in")
-            height = box.get("custom_h_in")
-            
-            # If custom dimensions not available, fetch from carton type
-            if not all([length, width, height]):
-                carton_type_id = box.get("carton_type_id")
-                if carton_type_id:
-                    carton = db.get(models.CartonType, carton_type_id)
-                    if carton:
-                        length = length or getattr(carton, 'length_in', None)
-                        width = width or getattr(carton, 'width_in', None)
-                        height = height or getattr(carton, 'height_in', None)
-            
-            boxes_for_ups.append({
-                "box_no": box.get("box_no"),
-                "custom_l_in": length,
-                "custom_w_in": width,
-                "custom_h_in": height,
-                "weight_lbs": box.get("weight_lbs"),
-                "weight_entered": box.get("weight_entered")
-            })
+        use_production = settings.UPS_USE_PRODUCTION
+        if shop:
+            # Quote every eligible service concurrently and rank them
+            return await ups_service.rate_shop_async(
+                pack_id=pack_id,
+                pack_boxes=boxes_for_ups,
+                ship_to_address=ship_to_address,
+                service_level=service_level,
+                ups_account_number=settings.UPS_ACCOUNT_NUMBER,
+                ship_from_address=ship_from_address,
+                use_production=use_production,
+                use_cache=not refresh
+            )
         
         # Call UPS service
-        use_production = settings.UPS_USE_PRODUCTION
-        rate_response = ups_service.get_ups_rate(
+        rate_response = await ups_service.get_ups_rate_async(
             pack_id=pack_id,
             pack_boxes=boxes_for_ups,
             ship_to_address=ship_to_address,
             service_level=service_level,
             ups_account_number=settings.UPS_ACCOUNT_NUMBER,
             ship_from_address=ship_from_address,
-            use_production=use_production
+            use_production=use_production,
+            use_cache=not refresh
         )
         
         return rate_response
@@ -437,6 +634,8 @@ def create_box(pack_id: int, body: CreateBoxIn, db: Session = Depends(get_db), c
         try:
             db.commit()
             db.refresh(pb)
+            # "Box N of M" changes on every existing label
+            label_cache.invalidate_pack(pack_id)
             return {"id": pb.id, "pack_id": pb.pack_id, "box_no": pb.box_no}
         except IntegrityError:
             db.rollback()
@@ -459,6 +658,8 @@ def complete_pack(
     """
     try:
         result = pack_view.complete_pack(db, pack_id, current_user.id)
+        # Render slip + labels in the background; the operator asks for them next
+        prerender.schedule_prerender(pack_id)
         # Return the updated snapshot so the UI refreshes immediately
         snapshot = pack_view.get_pack_snapshot(db, pack_id)
         snapshot["message"] = result["message"]
@@ -482,8 +683,6 @@ def complete_pack(
 # Assign item to box
 # ---------------------------------------------------------------------
 import os
-from fastapi.responses import FileResponse
-from backend.services.report import generate_packing_slip_via_excel
 from backend.services.pack_view import get_packing_slip_data
 
 @router.post("/{pack_id}/assign-one")
@@ -519,26 +718,55 @@ def set_qty(pack_id: int, body: dict, db: Session = Depends(get_db), current_use
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _auto_print_box_label(pack_id: int, box_id: int, printer_name: str, fmt: str, user_id: Optional[int]) -> None:
+    """Background task: queue a weighed box's label on the station printer."""
+    try:
+        payload = box_label(pack_id, box_id, fmt)
+        printer_name = _resolve_label_printer(printer_name, raw=(fmt == "zpl"))
+        print_queue.enqueue(
+            printer_name, payload, fmt=fmt,
+            description=f"Pack {pack_id} box {box_id} label (auto)",
+            pack_id=pack_id, label_count=1, user_id=user_id,
+        )
+    except Exception as e:
+        print(f"Auto-print of label for box {box_id} (pack {pack_id}) failed: {e}")
+
+
 @router.post("/{pack_id}/boxes/{box_id}/weight")
 def set_box_weight(
     pack_id: int,
     box_id: int,
     body: dict,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user),
+    station_id: Optional[str] = Depends(get_station_id),
 ):
     """
     Set (or clear) the weight of a specific box.
     Body can be {"weight": float} or {"weight": null}
     Returns the updated pack snapshot.
+    
+    If the calling station (X-Station-Id) has auto_print_labels on, entering
+    a weight also queues the box label on the station printer after the
+    response is sent; `auto_print_printer` in the response says where.
     """
     weight = body.get("weight")
     try:
         pack_view.set_box_weight(db, pack_id, box_id, weight)
         # Return the updated snapshot so the UI refreshes
-        return pack_view.get_pack_snapshot(db, pack_id)
+        snapshot = pack_view.get_pack_snapshot(db, pack_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    station = stations.auto_print_target(db, station_id) if weight is not None else None
+    if station is not None:
+        background_tasks.add_task(
+            _auto_print_box_label, pack_id, box_id, station.printer_name, station.label_format,
+            getattr(current_user, "id", None),
+        )
+    snapshot["auto_print_printer"] = station.printer_name if station is not None else None
+    return snapshot
     
 @router.delete("/{pack_id}/boxes/{box_id}")
 def delete_box(pack_id: int, box_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
@@ -616,33 +844,39 @@ def export_packing_slip_pdf(pack_id: int, current_user = Depends(get_current_act
     Generate a packing slip PDF for the specified pack.
 
     This endpoint fetches the packing slip data using `get_packing_slip_data`,
-    builds a PDF via the Excel-based report generator, and streams the file
-    back to the client.  If the pack does not exist, a 404 error is
-    returned; if the report fails to generate, a 500 error is raised.
+    renders the PDF in-process with the reportlab renderer (on the shared
+    process pool), and sends it back to the client.  If the pack does not
+    exist, a 404 error is returned; if the report fails to generate, a 500
+    error is raised.
     """
     # Fetch the report data
-    data = get_packing_slip_data(pack_id)
+    try:
+        data = get_packing_slip_data(pack_id)
+    except ValueError as e:
+        raise HTTPException(404, str(e))
     if not data:
         raise HTTPException(404, "Pack not found")
 
-    # Create the PDF via Excel macro
-    pdf_path = generate_packing_slip_via_excel(data, pack_id)
-    # Validate that the file exists
-    if not (pdf_path and os.path.exists(pdf_path)):
-        raise HTTPException(500, "PDF generation failed")
+    # Render the PDF
+    try:
+        pdf_bytes = render_packing_slip_in_pool(data)
+    except Exception as e:
+        raise HTTPException(500, f"PDF generation failed: {str(e)}")
 
-    # Stream the file back to the caller
-    return FileResponse(
-        pdf_path,
-        media_type="application/pdf",
-        filename=f"packing_slip_{pack_id}.pdf",
-    )
+    return _pdf_response(pdf_bytes, f"packing_slip_{pack_id}.pdf")
 
 
 @router.get("/{pack_id}/html-packing-slip.pdf")
-def export_html_packing_slip_pdf(pack_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+def export_html_packing_slip_pdf(
+    pack_id: int,
+    engine: Optional[str] = Query(None, pattern="^(chromium|native)$",
+                                  description="chromium (HTML template) or native (reportlab); defaults to PACKING_SLIP_ENGINE"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
     """
-    Generate a packing slip PDF using HTML template and Playwright.
+    Generate a packing slip PDF using HTML template and Playwright
+    (or, with engine=native, the reportlab drawing of the same layout).
     
     Process:
     1. Fetch packing data from database (OES + app DB)
@@ -652,35 +886,31 @@ def export_html_packing_slip_pdf(pack_id: int, db: Session = Depends(get_db), cu
     5. Return PDF file for download
     
     Returns:
-        FileResponse: PDF file download
+        StreamingResponse: PDF file download
     """
     try:
+        # Serve the slip pre-rendered on pack completion, if any (rendered with the default engine)
+        if engine in (None, get_settings().PACKING_SLIP_ENGINE):
+            cached_pdf = prerender.get_cached(pack_id, SLIP_PDF)
+            if cached_pdf is not None:
+                return _pdf_response(cached_pdf, f"packing_slip_{pack_id}.pdf")
+
         # Fetch packing slip data
         data = get_packing_slip_data(pack_id)
         if not data:
             raise HTTPException(404, f"Pack {pack_id} not found")
         
-        # Generate PDF from HTML template using Playwright
-        pdf_path = generate_packing_slip_pdf(data, pack_id)
-        
-        # Verify PDF was created
-        if not pdf_path or not os.path.exists(pdf_path):
-            raise HTTPException(500, "PDF generation failed - file not created")
-        
-        # Return PDF file
-        return FileResponse(
-            path=pdf_path,
-            media_type="application/pdf",
-            filename=f"packing_slip_{pack_id}.pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=packing_slip_{pack_id}.pdf"
-            }
-        )
+        # Render to PDF bytes in memory (no temp file)
+        pdf_bytes = render_packing_slip_pdf(data, engine)
+        return _pdf_response(pdf_bytes, f"packing_slip_{pack_id}.pdf")
     
     except ValueError as e:
         # Database/validation errors
         raise HTTPException(status_code=404, detail=str(e))
     
+    except BrowserRenderTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    
     except FileNotFoundError as e:
         # Template file missing
         raise HTTPException(
@@ -875,17 +1105,24 @@ def get_packing_slip_report_data(pack_id: int, current_user = Depends(get_curren
 
 # --- Box Label Preview Endpoint ---
 @router.get("/system/printers")
-def get_system_printers(current_user = Depends(get_current_active_user)):
+def get_system_printers(response: Response, refresh: bool = False, current_user = Depends(get_current_active_user)):
     """
     Get list of available printers on the system.
     
+    Served from the printer registry (refreshed in the background every
+    PRINTER_REFRESH_SECONDS); pass refresh=true to re-query the OS now.
+    The X-Printers-Refreshed-At header tells when the list was taken.
+    
     Returns:
         list: List of printer dictionaries with name and id
     """
-    from backend.services.printer_service import get_system_printers
+    from backend.services.printer_registry import printer_registry
     
     try:
-        printers = get_system_printers()
+        printers = printer_registry.refresh() if refresh else printer_registry.printers()
+        last_refreshed = printer_registry.last_refreshed
+        if last_refreshed is not None:
+            response.headers["X-Printers-Refreshed-At"] = last_refreshed.isoformat() + "Z"
         return printers
     except Exception as e:
         import traceback
@@ -894,6 +1131,23 @@ def get_system_printers(current_user = Depends(get_current_active_user)):
         raise HTTPException(status_code=500, detail=f"Failed to get printers: {str(e)}")
 
 
+@router.get("/system/printers/status")
+def get_printer_registry_status(current_user = Depends(get_current_active_user)):
+    """Printer cache state: count, last refresh time, refresh interval and last error."""
+    from backend.services.printer_registry import printer_registry
+
+    return printer_registry.status()
+
+
+@router.post("/system/printers/refresh")
+def refresh_system_printers(current_user = Depends(get_current_active_user)):
+    """Re-query the OS printer list now (e.g. right after installing a printer)."""
+    from backend.services.printer_registry import printer_registry
+
+    printers = printer_registry.refresh()
+    return {**printer_registry.status(), "printers": printers}
+
+
 @router.post("/test-print/{printer_name}")
 def test_print(printer_name: str, current_user = Depends(get_current_active_user)):
     """
@@ -944,52 +1198,73 @@ def test_print(printer_name: str, current_user = Depends(get_current_active_user
         raise HTTPException(status_code=500, detail=f"Test print failed: {str(e)}")
 
 
+def _resolve_label_printer(printer_name: str, raw: bool = False) -> str:
+    """Fall back to the first known printer for unknown names; raw socket targets are used as given."""
+    from backend.services.printer_registry import printer_registry
+    from backend.services.printer_service import raw_printer_address
+
+    if raw and raw_printer_address(printer_name) is not None:
+        return printer_name
+
+    available_printers = printer_registry.names()
+    if printer_name not in available_printers:
+        # Use first available printer if specified printer not found
+        printer_name = available_printers[0] if available_printers else "Default Printer"
+    return printer_name
+
+
 @router.post("/{pack_id}/boxes/{box_id}/print-label")
-def print_box_label(pack_id: int, box_id: int, printer_name: str = "Default Printer", db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+def print_box_label(
+    pack_id: int,
+    box_id: int,
+    printer_name: str = "Default Printer",
+    format: str = Query("html", pattern="^(html|zpl)$", description="html (template via browser/html2ps) or zpl (raw, Zebra)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
     """
-    Print a single box label directly to the specified printer.
+    Queue a single box label for the specified printer.
+    
+    Returns as soon as the job is queued; poll /api/print-jobs/{job_id}
+    for the outcome.
     
     Args:
         pack_id: Pack ID
         box_id: Box ID to print
-        printer_name: Name of the printer to print to
+        printer_name: Name of the printer to print to (for zpl, also a
+            ZPL_PRINTER_HOSTS name or "host:port")
+        format: html or zpl
         
     Returns:
-        dict: Success message
+        dict: Queued job (job_id, status)
     """
-    from backend.services.pack_view import get_box_label_data
-    from backend.services.printer_service import print_box_label_from_template, get_system_printers
-    
     try:
-        # Fetch box label data
-        data = get_box_label_data(pack_id, box_id)
-        if not data:
-            raise HTTPException(404, f"Box {box_id} not found in Pack {pack_id}")
+        # Unchanged boxes (reprints, pre-rendered on completion) come from the label cache
+        payload = box_label(pack_id, box_id, format)
         
         # Validate printer name
-        printers = get_system_printers()
-        available_printers = [p["name"] for p in printers]
-        
-        if printer_name not in available_printers:
-            # Use first available printer if specified printer not found
-            printer_name = available_printers[0] if available_printers else "Default Printer"
+        printer_name = _resolve_label_printer(printer_name, raw=(format == "zpl"))
         
-        # Print the label
-        success = print_box_label_from_template(data, printer_name)
-        
-        if success:
-            return {
-                "success": True,
-                "message": f"Box label for Box {box_id} sent to {printer_name} successfully",
-                "box_id": box_id,
-                "pack_id": pack_id,
-                "printer": printer_name
-            }
-        else:
-            raise HTTPException(500, f"Failed to print box label to {printer_name}")
+        job = print_queue.enqueue(
+            printer_name, payload, fmt=format,
+            description=f"Pack {pack_id} box {box_id} label",
+            pack_id=pack_id, label_count=1, user_id=getattr(current_user, "id", None),
+        )
+        return {
+            "success": True,
+            "message": f"Box label for Box {box_id} queued for {printer_name}",
+            "box_id": box_id,
+            "pack_id": pack_id,
+            "printer": printer_name,
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "deduplicated": job["deduplicated"],
+        }
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"Box label printing failed: {str(e)}\n{traceback.format_exc()}"
@@ -998,86 +1273,72 @@ def print_box_label(pack_id: int, box_id: int, printer_name: str = "Default Prin
 
 
 @router.post("/{pack_id}/boxes/print-all-labels")
-def print_all_box_labels(pack_id: int, printer_name: str = "Default Printer", db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+def print_all_box_labels(
+    pack_id: int,
+    printer_name: str = "Default Printer",
+    format: str = Query("html", pattern="^(html|zpl)$", description="html (template via browser/html2ps) or zpl (raw, Zebra)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
     """
-    Print all box labels for a pack directly to the specified printer.
+    Queue all box labels for a pack as one print job.
     
     Args:
         pack_id: Pack ID
-        printer_name: Name of the printer to print to
+        printer_name: Name of the printer to print to (for zpl, also a
+            ZPL_PRINTER_HOSTS name or "host:port")
+        format: html or zpl; either way all labels go out as one job
         
     Returns:
-        dict: Success message with count of printed labels
+        dict: Queued job (job_id, status) and the number of labels in it
     """
-    from backend.services.pack_view import get_pack_snapshot
-    from backend.services.printer_service import print_box_label_from_template, get_system_printers
+    from backend.services.pack_view import get_pack_label_data
     
     try:
-        # Get pack snapshot to find all boxes
-        pack_snapshot = get_pack_snapshot(db, pack_id)
-        if not pack_snapshot:
-            raise HTTPException(404, f"Pack {pack_id} not found")
-        
-        # Filter boxes that have items
-        boxes_with_items = [box for box in pack_snapshot.get('boxes', []) if box.get('items')]
-        
-        if not boxes_with_items:
-            raise HTTPException(400, "No boxes with items found to print")
-        
-        # Validate printer name
-        printers = get_system_printers()
-        available_printers = [p["name"] for p in printers]
-        
-        if printer_name not in available_printers:
-            # Use first available printer if specified printer not found
-            printer_name = available_printers[0] if available_printers else "Default Printer"
-        
-        # Collect all box label data
-        from backend.services.pack_view import get_box_label_data
-        from backend.services.printer_service import generate_multi_page_label_html, print_html_to_printer
-        
-        all_box_data = []
-        for box in boxes_with_items:
+        # Labels pre-rendered on pack completion go out as-is
+        cached = prerender.get_cached(pack_id, LABELS_HTML) if format == "html" else None
+        if cached is not None:
+            payload, label_count = cached
+        else:
+            # Label data for every non-empty box in one pass (one OES read, one items query)
+            from backend.services.printer_service import generate_multi_page_label_html
+            
             try:
-                box_data = get_box_label_data(pack_id, box['id'])
-                if box_data:
-                    all_box_data.append(box_data)
-            except Exception as e:
-                print(f"Failed to get data for box {box['id']}: {e}")
-                continue
-        
-        if not all_box_data:
-            raise HTTPException(400, "No box label data found to print")
-        
-        # Generate multi-page HTML document with all labels
-        multi_page_html = generate_multi_page_label_html(all_box_data)
-        
-        # Print all labels in one job
-        success = print_html_to_printer(multi_page_html, printer_name)
+                generation = label_cache.generation(pack_id)
+                all_box_data = get_pack_label_data(pack_id)
+            except ValueError as e:
+                raise HTTPException(404, str(e))
+            
+            if not all_box_data:
+                raise HTTPException(400, "No boxes with items found to print")
+            
+            label_count = len(all_box_data)
+            if format == "zpl":
+                # One raw job with a ^XA...^XZ block per label, reusing cached labels
+                payload = "".join(render_label(box_data, "zpl", generation) for box_data in all_box_data)
+            else:
+                # Multi-page HTML document with all labels
+                payload = generate_multi_page_label_html(all_box_data)
         
-        if success:
-            printed_count = len(all_box_data)
-            failed_count = 0
-        else:
-            printed_count = 0
-            failed_count = len(all_box_data)
-            print(f"Failed to print all box labels")
+        # Validate printer name
+        printer_name = _resolve_label_printer(printer_name, raw=(format == "zpl"))
         
-        if printed_count > 0:
-            message = f"Successfully sent {printed_count} box labels to {printer_name}"
-            if failed_count > 0:
-                message += f" ({failed_count} failed)"
-            
-            return {
-                "success": True,
-                "message": message,
-                "printed_count": printed_count,
-                "failed_count": failed_count,
-                "pack_id": pack_id,
-                "printer": printer_name
-            }
-        else:
-            raise HTTPException(500, f"Failed to print any box labels to {printer_name}")
+        job = print_queue.enqueue(
+            printer_name, payload, fmt=format,
+            description=f"Pack {pack_id} labels ({label_count})",
+            pack_id=pack_id, label_count=label_count, user_id=getattr(current_user, "id", None),
+        )
+        return {
+            "success": True,
+            "message": f"{label_count} box labels queued for {printer_name}",
+            "printed_count": label_count,
+            "failed_count": 0,
+            "pack_id": pack_id,
+            "printer": printer_name,
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "deduplicated": job["deduplicated"],
+        }
         
     except HTTPException:
         raise
@@ -1095,86 +1356,15 @@ def preview_box_label_html(pack_id: int, box_id: int, db: Session = Depends(get_
     
     This endpoint renders the box_label.html template with all data embedded,
     allowing you to see exactly how the label will look before printing.
+    Unchanged boxes are served from the label cache.
     
     Returns:
         HTMLResponse: Rendered HTML box label (4×6 format)
     """
     from fastapi.responses import HTMLResponse
-    from jinja2 import Environment, FileSystemLoader, select_autoescape
-    from backend.services.pack_view import get_box_label_data
-    
-    def format_dimension(value):
-        """
-        Format dimension values:
-        - Remove trailing zeros after decimal point
-        - Remove decimal point if value is whole number
-        Examples: 24.500 -> 24.5, 24.000 -> 24, 24.125 -> 24.125
-        """
-        if value is None:
-            return ''
-        try:
-            num = float(value)
-            # Format to 3 decimal places, then remove trailing zeros
-            formatted = f"{num:.3f}".rstrip('0').rstrip('.')
-            return formatted
-        except (ValueError, TypeError):
-            return str(value)
-    
-    def format_phone(value):
-        """
-        Format phone numbers to standard (xxx) xxx-xxxx format.
-        Removes all non-digit characters and formats accordingly.
-        Examples: 
-        - "6044204323" -> "(604) 420-4323"
-        - "(604) 420-4323" -> "(604) 420-4323"
-        - "604-420-4323" -> "(604) 420-4323"
-        """
-        if not value:
-            return ''
-        
-        # Remove all non-digit characters
-        digits = ''.join(filter(str.isdigit, str(value)))
-        
-        # If we have 10 digits, format as (xxx) xxx-xxxx
-        if len(digits) == 10:
-            return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
-        
-        # If we have 11 digits starting with 1, format as (xxx) xxx-xxxx
-        elif len(digits) == 11 and digits[0] == '1':
-            return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
-        
-        # For other lengths, return as-is (might be international format)
-        return str(value)
     
     try:
-        # Fetch box label data
-        data = get_box_label_data(pack_id, box_id)
-        if not data:
-            raise HTTPException(404, f"Box {box_id} not found in Pack {pack_id}")
-        
-        # Setup Jinja2 environment
-        templates_dir = os.path.join(
-            os.path.dirname(__file__), 
-            "..", 
-            "templates"
-        )
-        
-        env = Environment(
-            loader=FileSystemLoader(templates_dir),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
-        
-        # Add custom filter for dimension formatting
-        env.filters['format_dim'] = format_dimension
-        
-        # Add custom filter for phone formatting
-        env.filters['format_phone'] = format_phone
-        
-        # Load template
-        template = env.get_template('box_label.html')
-        
-        # Render HTML with all data
-        html_content = template.render(**data)
+        html_content = box_label(pack_id, box_id, "html")
         
         # Return HTML response
         return HTMLResponse(
@@ -1195,3 +1385,47 @@ def preview_box_label_html(pack_id: int, box_id: int, db: Session = Depends(get_
         error_detail = f"Box label preview failed: {str(e)}\n{traceback.format_exc()}"
         print(error_detail)
         raise HTTPException(status_code=500, detail=f"Box label preview failed: {str(e)}")
+
+
+@router.get("/{pack_id}/boxes/{box_id}/label.zpl")
+def preview_box_label_zpl(pack_id: int, box_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    """
+    The ZPL that print-label?format=zpl sends for this box (paste into a
+    ZPL viewer, or pipe to a printer / scripts/fake_printer.py).
+    
+    Returns:
+        PlainTextResponse: ZPL for one label
+    """
+    from fastapi.responses import PlainTextResponse
+
+    try:
+        return PlainTextResponse(
+            content=box_label(pack_id, box_id, "zpl"),
+            headers={
+                "Content-Disposition": f"inline; filename=box_label_{pack_id}_{box_id}.zpl"
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{pack_id}/boxes/{box_id}/label.pdf")
+def export_box_label_pdf(pack_id: int, box_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    """
+    The box label as a one-page 4in x 4.75in PDF (for printers without a
+    ZPL or HTML path, or to save with the shipment).
+    
+    Returns:
+        StreamingResponse: PDF label
+    """
+    try:
+        pdf_bytes = box_label(pack_id, box_id, "pdf")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BrowserRenderTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        import traceback
+        print(f"Box label PDF failed: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Box label PDF failed: {str(e)}")
+    return _pdf_response(pdf_bytes, f"box_label_{pack_id}_{box_id}.pdf")
@@ -0,0 +1,66 @@
+# backend/api/print_jobs.py
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from backend.services import print_queue
+from backend.deps import get_current_active_user
+
+router = APIRouter(prefix="/api/print-jobs", tags=["print-jobs"])
+
+
+class PrintJobOut(BaseModel):
+    job_id: int
+    printer: str
+    format: str
+    status: str  # queued | printing | done | failed | cancelled
+    description: Optional[str] = None
+    pack_id: Optional[int] = None
+    label_count: int
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    printer_job_id: Optional[str] = None  # spooler (CUPS) job id once handed off
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    deduplicated: bool = False
+
+
+@router.get("", response_model=List[PrintJobOut])
+def list_print_jobs(
+    status: Optional[str] = Query(None, description="queued | printing | done | failed | cancelled"),
+    printer: Optional[str] = None,
+    pack_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user = Depends(get_current_active_user)
+):
+    """Most recent print jobs first."""
+    return print_queue.list_jobs(status=status, printer_name=printer, pack_id=pack_id, limit=limit)
+
+
+@router.get("/{job_id}", response_model=PrintJobOut)
+def get_print_job(job_id: int, current_user = Depends(get_current_active_user)):
+    """Status of a print job (poll after queuing a label)."""
+    job = print_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Print job {job_id} not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=PrintJobOut)
+def cancel_print_job(job_id: int, current_user = Depends(get_current_active_user)):
+    try:
+        return print_queue.cancel_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{job_id}/retry", response_model=PrintJobOut)
+def retry_print_job(job_id: int, current_user = Depends(get_current_active_user)):
+    try:
+        return print_queue.retry_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,75 @@
+# backend/api/quotes.py
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from backend.services import quote_history
+from backend.deps import require_supervisor
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+
+class ShipmentQuoteOut(BaseModel):
+    quote_id: int
+    pack_id: int
+    service_code: Optional[str] = None
+    total_charge: Optional[float] = None  # published
+    negotiated_charge: Optional[float] = None
+    currency: Optional[str] = None
+    billing_weight_lbs: Optional[float] = None
+    package_count: int
+    fingerprint: str
+    environment: str
+    from_cache: bool
+    quoted_at: datetime
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(400, "Invalid date format. Use YYYY-MM-DD")
+
+
+@router.get("", response_model=List[ShipmentQuoteOut])
+def list_quotes(
+    pack_id: Optional[int] = None,
+    date_from: Optional[str] = Query(None, description="First quote date (YYYY-MM-DD, UTC)"),
+    date_to: Optional[str] = Query(None, description="Last quote date, inclusive"),
+    service_code: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=5000),
+    current_user = Depends(require_supervisor)
+):
+    """Recorded UPS quotes, newest first. Supervisor only endpoint."""
+    return quote_history.list_quotes(
+        pack_id=pack_id, date_from=_parse_date(date_from), date_to=_parse_date(date_to),
+        service_code=service_code, limit=limit,
+    )
+
+
+@router.get("/summary")
+def quote_summary(
+    date_from: Optional[str] = Query(None, description="First quote date (YYYY-MM-DD, UTC)"),
+    date_to: Optional[str] = Query(None, description="Last quote date, inclusive"),
+    current_user = Depends(require_supervisor)
+):
+    """Quote counts and negotiated charge totals per service. Supervisor only endpoint."""
+    return quote_history.summary(date_from=_parse_date(date_from), date_to=_parse_date(date_to))
+
+
+@router.get("/packs/{pack_id}/latest", response_model=List[ShipmentQuoteOut])
+def latest_pack_quotes(pack_id: int, current_user = Depends(require_supervisor)):
+    """The most recent quote of each service for a pack, cheapest first - re-display without calling UPS."""
+    latest = {}
+    for q in quote_history.list_quotes(pack_id=pack_id, limit=500):
+        latest.setdefault(q["service_code"], q)
+    if not latest:
+        raise HTTPException(404, f"No UPS quotes recorded for pack {pack_id}")
+    return sorted(
+        latest.values(),
+        key=lambda q: q["negotiated_charge"] if q["negotiated_charge"] is not None else (q["total_charge"] or 0),
+    )
@@ -0,0 +1,73 @@
+# backend/api/stations.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from backend.db.session import get_app_session as get_db
+from backend.services import stations as svc
+from backend.deps import get_current_active_user, get_station_id
+
+router = APIRouter(prefix="/api/stations", tags=["stations"])
+
+
+class StationIn(BaseModel):
+    printer_name: Optional[str] = Field(default=None, max_length=255)
+    label_format: str = Field(default="html", pattern="^(html|zpl)$")
+    auto_print_labels: bool = False  # queue the box label as soon as its weight is entered
+
+
+class StationOut(StationIn):
+    station_id: str
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("", response_model=list[StationOut])
+def list_stations(db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    return svc.list_stations(db)
+
+
+@router.get("/current", response_model=Optional[StationOut])
+def current_station(station_id: Optional[str] = Depends(get_station_id), db: Session = Depends(get_db),
+                    current_user = Depends(get_current_active_user)):
+    """Settings of the station making the request (X-Station-Id), or null."""
+    if not station_id:
+        return None
+    return svc.get_station(db, station_id)
+
+
+@router.get("/{station_id}", response_model=StationOut)
+def get_station(station_id: str, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    s = svc.get_station(db, station_id)
+    if not s:
+        raise HTTPException(status_code=404, detail=f"Station {station_id} not found")
+    return s
+
+
+@router.put("/{station_id}", response_model=StationOut)
+def update_station(station_id: str, payload: StationIn, db: Session = Depends(get_db),
+                   current_user = Depends(get_current_active_user)):
+    try:
+        s = svc.upsert_station(db, station_id, user_id=current_user.id, **payload.model_dump())
+        db.commit()
+        db.refresh(s)
+        return s
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{station_id}")
+def delete_station(station_id: str, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    try:
+        svc.delete_station(db, station_id)
+        db.commit()
+        return {"message": f"Station {station_id} deleted"}
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
@@ -6,8 +6,10 @@ from datetime import datetime
 
 from backend.db.session import get_app_session
 from backend.db.models import User, Role
-from backend.core.auth import hash_password, verify_password
+from backend.services.password_pool import password_pool
 from backend.deps import get_current_active_user
+from backend.services.auth_epochs import auth_epochs
+from backend.services.user_cache import user_cache
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -50,6 +52,17 @@ def require_supervisor(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 
+def _revoke_tokens(user: User) -> None:
+    """Bump the user's auth epoch; tokens issued before stop working once the caller commits."""
+    user.auth_epoch = (user.auth_epoch or 0) + 1
+
+
+def _forget_cached(user: User, *usernames: str) -> None:
+    """After a commit: drop cached lookups and publish the user's new epoch to this process."""
+    user_cache.invalidate(user.username, *usernames)
+    auth_epochs.set(user.id, user.auth_epoch, user.active)
+
+
 @router.get("/", response_model=List[UserResponse])
 def list_users(
     db: Session = Depends(get_app_session),
@@ -76,7 +89,7 @@ def create_user(
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = password_pool.hash(user_data.password)
     new_user = User(
         username=user_data.username,
         password_hash=hashed_password,
@@ -87,6 +100,7 @@ def create_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    auth_epochs.set(new_user.id, new_user.auth_epoch, new_user.active)
     
     return new_user
 
@@ -138,6 +152,8 @@ def update_user(
                 detail="Username already exists"
             )
     
+    previous = (user.username, user.role, user.active)
+    
     # Update fields
     if user_data.username is not None:
         user.username = user_data.username
@@ -146,8 +162,13 @@ def update_user(
     if user_data.active is not None:
         user.active = 1 if user_data.active else 0
     
+    # Name, role or active changed: tokens carrying the old claims are revoked
+    if (user.username, user.role, user.active) != previous:
+        _revoke_tokens(user)
+    
     db.commit()
     db.refresh(user)
+    _forget_cached(user, previous[0])
     
     return user
 
@@ -168,8 +189,10 @@ def reset_user_password(
         )
     
     # Update password
-    user.password_hash = hash_password(password_data.password)
+    user.password_hash = password_pool.hash(password_data.password)
+    _revoke_tokens(user)
     db.commit()
+    _forget_cached(user)
     
     return {"message": "Password reset successfully"}
 
@@ -195,8 +218,11 @@ def delete_user(
             detail="Cannot delete your own account"
         )
     
+    username = user.username
     db.delete(user)
     db.commit()
+    user_cache.invalidate(username)
+    auth_epochs.remove(user_id)
     
     return {"message": "User deleted successfully"}
 
@@ -224,7 +250,9 @@ def toggle_user_active(
     
     # Toggle active status
     user.active = 0 if user.active == 1 else 1
+    _revoke_tokens(user)
     db.commit()
     db.refresh(user)
+    _forget_cached(user)
     
     return user
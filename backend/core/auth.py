@@ -19,7 +19,7 @@ def hash_password(password: str) -> str:
         password_bytes = password_bytes[:72]
     
     # Generate salt and hash
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     
     # Return as string (bcrypt hash format)
@@ -49,14 +49,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if a bcrypt hash was made with a different cost than BCRYPT_ROUNDS."""
+    try:
+        rounds = int(hashed_password.split("$")[2])  # $2b$12$<salt+hash>
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return rounds != settings.BCRYPT_ROUNDS
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token (with issue time "iat", used to key the user cache)."""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -8,17 +8,50 @@ class Settings(BaseSettings):
     # Database URLs (loaded from .env)
     APP_DATABASE_URL: str | None = None
     OES_DATABASE_URL: str | None = None
+    ASYNC_DB_WORKERS: int = 8  # Threads running DB / OES queries for async endpoints (see session.run_db)
+    # Connection pool per engine. Size it for everything that can hold a session at once: the
+    # request threadpool (40 by default; one session per request), ASYNC_DB_WORKERS, and the
+    # background workers (print queue, prerender, bulk rating, auth epoch refresh).
+    DB_POOL_SIZE: int = 20  # Connections kept open
+    DB_MAX_OVERFLOW: int = 30  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30  # Wait for a free connection before failing the request
 
     # Authentication settings
     SECRET_KEY: str = "your-secret-key-change-in-production"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 240  # 4 hours inactivity timeout
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60  # Reuse a token's user lookup this long; 0 disables
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 1024
+    AUTH_EPOCH_REFRESH_SECONDS: float = 15  # Reload of users' auth epochs (revocations made by other workers)
+    BCRYPT_ROUNDS: int = 12  # Cost for new hashes; existing ones are rehashed at the next login when it changes
+    PASSWORD_HASH_WORKERS: int = 2  # Threads running bcrypt (login / password changes)
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Queued logins beyond this get 503 + Retry-After
 
     # UPS API credentials
     UPS_CLIENT_ID: str | None = None
     UPS_CLIENT_SECRET: str | None = None
     UPS_ACCOUNT_NUMBER: str | None = None  # 6-digit UPS account number (e.g., "02243E")
     UPS_USE_PRODUCTION: bool = True  # Set to True to use production endpoint, False for CIE (testing)
+    UPS_BASE_URL: str = ""  # Overrides the production/CIE host, e.g. http://127.0.0.1:8089 for scripts/fake_ups_server.py
+    UPS_TOKEN_REFRESH_MARGIN_SECONDS: int = 300  # Refresh the cached OAuth token this long before it expires
+    UPS_RATE_CACHE_TTL_SECONDS: int = 3600  # Reuse a rate quote for an identical shipment this long; 0 disables
+    UPS_RATE_SHOP_WORKERS: int = 8  # Concurrent UPS rate calls (rate shopping / bulk rating)
+    UPS_RATE_SHOP_TIMEOUT_SECONDS: float = 20.0  # Rate shopping returns whatever has come back by then
+    UPS_RATE_LIMIT_PER_SECOND: float = 10.0  # Rating calls sent to UPS per second (all requests); 0 disables
+    UPS_RATE_LIMIT_BURST: int = 10
+    UPS_RATE_PAUSE_ON_429_SECONDS: float = 2.0  # Hold all rating calls this long (or Retry-After) after a 429
+    BULK_RATE_MAX_PACKS: int = 500
+
+    # Carrier API HTTP client (pooled keep-alive session)
+    CARRIER_HTTP_CONNECT_TIMEOUT: float = 5.0
+    CARRIER_HTTP_READ_TIMEOUT: float = 30.0
+    CARRIER_HTTP_RETRIES: int = 3  # on connection errors, 429 and 5xx
+    CARRIER_HTTP_BACKOFF_SECONDS: float = 0.5  # backoff: factor * 2^(retry-1)
+    CARRIER_HTTP_POOL_SIZE: int = 10
+    CARRIER_HTTP_ASYNC_MAX_CONNECTIONS: int = 50  # Async endpoints (httpx); further calls wait for a connection
+    CARRIER_DEBUG_CAPTURE: bool = False  # Keep redacted request/response bodies in memory (toggle at /api/carrier-debug)
+    CARRIER_DEBUG_BUFFER_SIZE: int = 200  # Exchanges kept
+    CARRIER_DEBUG_MAX_ENTRY_BYTES: int = 64000  # Bodies larger than this are truncated
     
     # Ship-from address for UPS
     UPS_SHIP_FROM_NAME: str | None = None
@@ -29,6 +62,40 @@ class Settings(BaseSettings):
     UPS_SHIP_FROM_POSTAL_CODE: str | None = None
     UPS_SHIP_FROM_COUNTRY: str = "CA"  # Default to Canada based on example
 
+    # Rendering (packing slips / box labels)
+    PRERENDER_ON_COMPLETE: bool = True  # Pre-render slip + labels in the background when a pack completes
+    PRERENDER_WORKERS: int = 2
+    PRERENDER_WAIT_SECONDS: float = 3  # A request waits this long for an in-flight pre-render, then renders itself; 0 never waits
+    RENDER_CACHE_MAX_ENTRIES: int = 512
+    LABEL_CACHE_MAX_ENTRIES: int = 2048  # Rendered box labels (html/zpl/pdf), one per box and format
+    LABEL_CACHE_FAST_PATH_SECONDS: float = 30  # Serve a cached label by box id without re-reading pack/OES data this long; 0 always re-reads
+    BROWSER_POOL_SIZE: int = 2  # Headless Chromium instances kept warm for HTML -> PDF
+    BROWSER_RENDER_TIMEOUT_SECONDS: float = 60  # Give up on an HTML -> PDF render (504) after this long
+    PACKING_SLIP_ENGINE: str = "chromium"  # "chromium" (HTML template) or "native" (reportlab, no browser)
+    PACKING_SLIP_PROCESS_WORKERS: int | None = None  # reportlab render processes; None = CPU count
+    BATCH_EXPORT_MAX_PACKS: int = 500
+    BATCH_EXPORT_CHUNK_SIZE: int = 20  # Packs assembled/rendered per round; bounds memory
+    BATCH_EXPORT_MAX_MERGED_PACKS: int = 100  # format=pdf merges in memory; larger exports must use zip
+
+    # Raw (ZPL) label printing
+    ZPL_PRINTER_HOSTS: dict[str, str] = {}  # printer name -> "host[:port]" for network Zebras, e.g. {"Zebra ZD420": "10.0.0.50"}
+    RAW_PRINT_PORT: int = 9100
+    RAW_PRINT_TIMEOUT_SECONDS: float = 10.0
+    PRINTER_REFRESH_SECONDS: float = 300  # background refresh of the cached system printer list
+
+    # CUPS (Linux / macOS print queues)
+    CUPS_SUBMIT_METHOD: str = "lp"  # "lp" (stdin, no shell) or "ipp" (Print-Job straight to the server)
+    CUPS_SERVER: str = ""  # host[:port]; empty = the local scheduler (localhost:631)
+    CUPS_SUBMIT_TIMEOUT_SECONDS: float = 30.0
+
+    # Print queue (spooler)
+    PRINT_QUEUE_WORKERS_PER_PRINTER: int = 1  # concurrent jobs per printer; 1 keeps labels in order
+    PRINT_JOB_MAX_ATTEMPTS: int = 5
+    PRINT_RETRY_BASE_SECONDS: float = 2.0  # backoff: base * 2^(attempt-1), capped
+    PRINT_RETRY_MAX_SECONDS: float = 60.0
+    PRINT_QUEUE_POLL_SECONDS: float = 2.0
+    PRINT_HTML_CLEANUP_DELAY_SECONDS: float = 5.0  # Windows: time the browser gets to load the HTML before it is deleted
+
     # point to .env file
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
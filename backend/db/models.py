@@ -3,7 +3,7 @@ from typing import Optional  # ⬅️ added
 
 from sqlalchemy import (
     Integer, String, Date, DateTime, Enum, ForeignKey, UniqueConstraint,
-    CheckConstraint, Float, Boolean, DECIMAL
+    CheckConstraint, Float, Boolean, DECIMAL, LargeBinary, Index, Text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from backend.db.session import AppBase as Base
@@ -22,6 +22,7 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String(255))
     role: Mapped[Role] = mapped_column(Enum(Role), default=Role.packager)
     active: Mapped[int] = mapped_column(Integer, default=1)  # 1=true, 0=false
+    auth_epoch: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # bumped to revoke issued tokens
 
 class CartonType(Base):
     __tablename__ = "carton_type"
@@ -213,3 +214,115 @@ class PairGuard(Base):
         UniqueConstraint("order_id", "line_a_id", "line_b_id", name="uq_pair_guard"),
         CheckConstraint("line_a_id < line_b_id", name="ck_pair_guard_order"),
     )
+
+class PrintJob(Base):
+    """Spooled print job; the payload is stored so queued jobs survive a restart."""
+    __tablename__ = "print_job"
+    __table_args__ = (
+        Index("ix_print_job_printer_status", "printer_name", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    printer_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    format: Mapped[str] = mapped_column(String(16), nullable=False)  # html | zpl
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    payload_hash: Mapped[str] = mapped_column(String(64), index=True)  # sha256 of printer + format + payload
+    description: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    pack_id: Mapped[int | None] = mapped_column(Integer, index=True, nullable=True)
+    label_count: Mapped[int] = mapped_column(Integer, default=1)
+
+    status: Mapped[str] = mapped_column(String(16), default="queued")  # queued | printing | done | failed | cancelled
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    last_error: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    printer_job_id: Mapped[str | None] = mapped_column(String(64), nullable=True)  # CUPS job id, e.g. "Zebra-42"
+
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class StationSetting(Base):
+    """Per packing-station preferences (identified by the X-Station-Id header)."""
+    __tablename__ = "station_setting"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    station_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    printer_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    label_format: Mapped[str] = mapped_column(String(16), default="html")  # html | zpl
+    auto_print_labels: Mapped[bool] = mapped_column(Boolean, default=False)  # print a box's label once it is weighed
+    updated_by: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class RateQuoteCache(Base):
+    """Stored UPS rate responses keyed by a fingerprint of the shipment."""
+    __tablename__ = "rate_quote_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)  # sha256 of shipment + environment
+    service_code: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    response_json: Mapped[str] = mapped_column(Text, nullable=False)
+    pack_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # pack that fetched it
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True, nullable=False)
+
+
+class RateBatch(Base):
+    """One bulk UPS rating run over a day's (or a hand-picked list of) completed packs."""
+    __tablename__ = "rate_batch"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    completion_date: Mapped[datetime | None] = mapped_column(Date, nullable=True)  # when run for a day
+    pack_count: Mapped[int] = mapped_column(Integer, default=0)
+    rated_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_charge: Mapped[float | None] = mapped_column(DECIMAL(12, 2), nullable=True)
+    elapsed_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("user.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class RateBatchResult(Base):
+    """The quote (or the error) for one pack of a RateBatch."""
+    __tablename__ = "rate_batch_result"
+    __table_args__ = (
+        UniqueConstraint("batch_id", "pack_id", name="uq_rate_batch_result_pack"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    batch_id: Mapped[int] = mapped_column(ForeignKey("rate_batch.id", ondelete="CASCADE"), index=True, nullable=False)
+    pack_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
+    order_no: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    service_code: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    service: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    box_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_charge: Mapped[float | None] = mapped_column(DECIMAL(12, 2), nullable=True)
+    negotiated_charge: Mapped[float | None] = mapped_column(DECIMAL(12, 2), nullable=True)
+    currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    cache_hit: Mapped[bool] = mapped_column(Boolean, default=False)
+    error: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+
+
+class ShipmentQuote(Base):
+    """Every UPS quote shown for a pack, kept for cost reports and re-display."""
+    __tablename__ = "shipment_quote"
+    __table_args__ = (
+        Index("ix_shipment_quote_pack_quoted", "pack_id", "quoted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pack_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    service_code: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    total_charge: Mapped[float | None] = mapped_column(DECIMAL(12, 2), nullable=True)  # published
+    negotiated_charge: Mapped[float | None] = mapped_column(DECIMAL(12, 2), nullable=True)
+    currency: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    billing_weight_lbs: Mapped[float | None] = mapped_column(DECIMAL(10, 1), nullable=True)
+    package_count: Mapped[int] = mapped_column(Integer, default=0)
+    fingerprint: Mapped[str] = mapped_column(String(64), index=True, nullable=False)  # rate_cache.fingerprint of the shipment
+    environment: Mapped[str] = mapped_column(String(16), default="production")  # production | cie
+    from_cache: Mapped[bool] = mapped_column(Boolean, default=False)  # answered from rate_quote_cache
+    quoted_at: Mapped[datetime] = mapped_column(DateTime, index=True, default=datetime.utcnow)
@@ -1,22 +1,70 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from backend.core.config import get_settings
 
 settings = get_settings()
 
+
+def _pool_options(url: str) -> dict:
+    # SQLite (scripts, local runs) keeps SQLAlchemy's default pool
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+
 # --- Engines ---
 app_engine = create_engine(
     str(settings.APP_DATABASE_URL),
     pool_pre_ping=True,
     future=True,
+    **_pool_options(str(settings.APP_DATABASE_URL)),
 )
 
 oes_engine = create_engine(
     str(settings.OES_DATABASE_URL),
     pool_pre_ping=True,
     future=True,
+    **_pool_options(str(settings.OES_DATABASE_URL)),
 )
 
+
+# --- Pool checkout counters (for /api/metrics) ---
+_checkouts = {"app": 0, "oes": 0}
+_checkouts_lock = threading.Lock()
+
+
+def _count_checkouts(engine, name: str) -> None:
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with _checkouts_lock:
+            _checkouts[name] += 1
+
+
+_count_checkouts(app_engine, "app")
+_count_checkouts(oes_engine, "oes")
+
+
+def pool_metrics() -> dict:
+    """Connections checked out since start, and the current pool state, per engine."""
+    result = {}
+    for name, engine in (("app", app_engine), ("oes", oes_engine)):
+        pool = engine.pool
+        with _checkouts_lock:
+            stats = {"checkouts": _checkouts[name]}
+        for attr in ("size", "checkedout", "overflow"):  # QueuePool only
+            if callable(getattr(pool, attr, None)):
+                stats[attr] = getattr(pool, attr)()
+        result[name] = stats
+    return result
+
 # --- Session factories ---
 AppSessionLocal = sessionmaker(
     autocommit=False,
@@ -51,4 +99,19 @@ def get_oes_session() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Blocking DB work from async endpoints ---
+# Its own pool, so slow OES queries can't starve the threadpool that serves
+# the sync endpoints (scans)
+_db_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_WORKERS, thread_name_prefix="async-db")
+
+
+async def run_db(fn, *args, **kwargs):
+    """Await a blocking DB / OES call (fn(*args, **kwargs)) without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    _db_executor.shutdown(wait=False, cancel_futures=True)
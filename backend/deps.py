@@ -1,31 +1,30 @@
-from fastapi import Depends, HTTPException, status, Query
+from fastapi import Depends, HTTPException, status, Query, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from backend.db.session import AppSessionLocal, OesSessionLocal
+from backend.db.session import AppSessionLocal, get_app_session, get_oes_session, run_db
 from backend.db.models import User, Role
 from backend.core.auth import decode_token
+from backend.services.auth_epochs import auth_epochs
+from backend.services.user_cache import user_cache
 
 security = HTTPBearer(auto_error=False)
 
 
-# Dependency for App DB
-def get_app_db():
-    db = AppSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Dependency for App DB. The same callable as the handlers' get_app_session / get_db,
+# so FastAPI resolves it once per request: auth and handler share one session (and
+# at most one pooled connection) instead of checking out two.
+get_app_db = get_app_session
+
+
+# Packing station making the request (sent by the station's browser)
+def get_station_id(x_station_id: Optional[str] = Header(None)) -> Optional[str]:
+    return x_station_id.strip() if x_station_id and x_station_id.strip() else None
 
 
 # Dependency for OES DB (read-only)
-def get_oes_db():
-    db = OesSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+get_oes_db = get_oes_session
 
 
 def get_current_user(
@@ -34,7 +33,33 @@ def get_current_user(
     token: Optional[str] = Query(None)
 ) -> User:
     """Get current authenticated user from JWT token.
-    Accepts token from Authorization header or query parameter (for window.open compatibility)."""
+    Accepts token from Authorization header or query parameter (for window.open compatibility).
+    Tokens carrying uid / role / auth_epoch are authorized from their claims against the
+    in-memory auth epochs (no query); a token whose epoch is behind the user's is revoked.
+    Older tokens, or users the epoch map doesn't know yet, fall back to a lookup cached per
+    (username, token issue time) for AUTH_USER_CACHE_TTL_SECONDS."""
+    payload = _token_payload(credentials, token)
+    user = _user_from_claims(payload)
+    if user is not None:
+        return user
+    return _lookup_user(db, payload)
+
+
+async def get_current_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    token: Optional[str] = Query(None)
+) -> User:
+    """get_current_user() for async endpoints: the claims check runs on the event loop and
+    the fallback lookup on the DB executor, so no request threadpool thread is taken."""
+    payload = _token_payload(credentials, token)
+    user = _user_from_claims(payload)
+    if user is not None:
+        return user
+    return await run_db(_lookup_user_own_session, payload)
+
+
+def _token_payload(credentials: Optional[HTTPAuthorizationCredentials], token: Optional[str]) -> dict:
+    """Decoded claims of the request's token (header first, then query parameter)."""
     # Try to get token from Authorization header first
     auth_token = None
     if credentials:
@@ -53,34 +78,75 @@ def get_current_user(
     
     payload = decode_token(auth_token)
     
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    username: str = payload.get("sub")
-    if username is None:
+    if payload is None or payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(User).filter(User.username == username).first()
+    return payload
+
+
+def _user_from_claims(payload: dict) -> Optional[User]:
+    """The user described by the token's claims, or None if they can't be checked in memory."""
+    user_id, role, token_epoch = payload.get("uid"), payload.get("role"), payload.get("auth_epoch")
+    if user_id is not None and role and token_epoch is not None:
+        current = auth_epochs.lookup(user_id)
+        if current is not None:
+            current_epoch, active = current
+            if token_epoch < current_epoch:
+                raise _token_revoked()
+            if token_epoch > current_epoch:
+                # Issued after a change this worker hasn't loaded yet (another worker
+                # bumped the epoch): the DB decides
+                return None
+            # Unsaved stand-in built from the claims; callers only read its columns
+            return User(id=user_id, username=payload["sub"], role=Role(role), active=active,
+                        auth_epoch=current_epoch)
+    return None
+
+
+def _lookup_user(db: Session, payload: dict) -> User:
+    """The token's user from the user cache, or loaded (and cached) from the App DB."""
+    username, issued_at, token_epoch = payload["sub"], payload.get("iat"), payload.get("auth_epoch")
+    user = user_cache.get(username, issued_at)
+    if user is not None and token_epoch is not None and token_epoch > (user.auth_epoch or 0):
+        user = None  # cached before the change that issued this token; read it again
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        generation = user_cache.generation(username)
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Detach so the row can be shared across requests (only its columns are read)
+        db.expunge(user)
+        user_cache.put(username, issued_at, user, generation)
+        auth_epochs.set(user.id, user.auth_epoch, user.active)
     
+    if token_epoch is not None and token_epoch != (user.auth_epoch or 0):
+        raise _token_revoked()
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    """Get current active user (ensures user is active)."""
+def _lookup_user_own_session(payload: dict) -> User:
+    """_lookup_user() on a session of its own (runs on the DB executor)."""
+    with AppSessionLocal() as db:
+        return _lookup_user(db, payload)
+
+
+def _token_revoked() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _check_active(current_user: User) -> User:
     if current_user.active != 1:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -89,11 +155,30 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def require_supervisor(current_user: User = Depends(get_current_active_user)) -> User:
-    """Require supervisor role to access certain endpoints."""
+def _check_supervisor(current_user: User) -> User:
     if current_user.role != Role.supervisor:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Supervisor access required"
         )
     return current_user
+
+
+def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+    """Get current active user (ensures user is active)."""
+    return _check_active(current_user)
+
+
+def require_supervisor(current_user: User = Depends(get_current_active_user)) -> User:
+    """Require supervisor role to access certain endpoints."""
+    return _check_supervisor(current_user)
+
+
+async def get_current_active_user_async(current_user: User = Depends(get_current_user_async)) -> User:
+    """get_current_active_user() for async endpoints (no threadpool hop)."""
+    return _check_active(current_user)
+
+
+async def require_supervisor_async(current_user: User = Depends(get_current_active_user_async)) -> User:
+    """require_supervisor() for async endpoints (no threadpool hop)."""
+    return _check_supervisor(current_user)
@@ -3,7 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 from backend.core.config import get_settings
-from backend.api import orders , cartons, packs, health, auth, users
+from backend.api import orders , cartons, packs, health, auth, users, print_jobs, stations, quotes
+from backend.db.session import AppBase, app_engine, shutdown_db_executor
+from backend.db.models import PrintJob, StationSetting, RateQuoteCache, RateBatch, RateBatchResult, ShipmentQuote
+from backend.services import prerender, print_queue, rate_cache
+from backend.services.printer_registry import printer_registry
+from backend.services.auth_epochs import auth_epochs
+from backend.services.password_pool import password_pool
+from backend.services.browser_pool import BrowserRenderTimeout, browser_pool
+from backend.services.report import shutdown_render_pool
+from backend.services.carrier_http import async_carrier_http, carrier_http
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +41,39 @@ app.add_middleware(
 def root():
     return {"message": "Backend running!"}
 
+# --- Startup / shutdown ---
+@app.on_event("startup")
+def startup():
+    # Tables added after the initial schema (the rest are managed by hand)
+    AppBase.metadata.create_all(bind=app_engine, tables=[
+        PrintJob.__table__, StationSetting.__table__, RateQuoteCache.__table__,
+        RateBatch.__table__, RateBatchResult.__table__, ShipmentQuote.__table__,
+    ])
+    rate_cache.purge_expired()
+    print_queue.start()
+    printer_registry.start()
+    auth_epochs.start()
+    async_carrier_http.open()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    print_queue.shutdown()
+    printer_registry.stop()
+    auth_epochs.stop()
+    carrier_http.close()
+    shutdown_db_executor()
+    password_pool.shutdown()
+    prerender.shutdown()  # before the pools its renders use
+    shutdown_render_pool()
+    browser_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_async_clients():
+    await async_carrier_http.aclose()
+
+
 # --- Exception handlers ---
 @app.exception_handler(ValueError)
 def value_error_exception_handler(request, exc):
@@ -39,6 +81,14 @@ def value_error_exception_handler(request, exc):
         status_code=400,
         content={"detail": str(exc)},
     )
+
+
+@app.exception_handler(BrowserRenderTimeout)
+def browser_render_timeout_exception_handler(request, exc):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": str(exc)},
+    )
 # --- Include API routers ---
 # from backend.api import orders, packs, cartons
 app.include_router(auth.router, tags=["auth"])
@@ -46,4 +96,7 @@ app.include_router(orders.router, tags=["orders"])
 app.include_router(packs.router, tags=["pack"])
 app.include_router(cartons.router, tags=["cartons"])
 app.include_router(users.router, tags=["users"])
+app.include_router(print_jobs.router, tags=["print-jobs"])
+app.include_router(stations.router, tags=["stations"])
+app.include_router(quotes.router, tags=["quotes"])
 app.include_router(health.router, tags=["system"])
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Throughput / memory benchmark for the packing slip renderers.
+
+Engines:
+  workbook  - reportlab renderer of the Excel workbook layout (services/report.py)
+  native    - reportlab renderer of the HTML layout (services/report_native.py)
+  chromium  - HTML template printed by the headless Chromium pool (services/report_html.py)
+
+Each engine runs in its own Python process so peak RSS is not polluted by the
+others; RSS covers the benchmark process and its children (Chromium).
+Usage: python -m backend.scripts.bench_packing_slip [--slips 50] [--items 40] [--workers 4]
+                                                    [--engines workbook,native,chromium]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.report import render_packing_slip
+
+ENGINES = ("workbook", "native", "chromium")
+
+
+def make_slip_data(n_items: int, order_no: str = "290066") -> dict:
+    """Synthetic packing slip data shaped like get_packing_slip_data() output."""
+    items = []
+    for i in range(n_items):
+        items.append({
+            "box_no": i // 4 + 1,
+            "carton_type": "Carton 24x12x8",
+            "weight_lb": 18,
+            "product_code": f"DA{100 + i % 12}",
+            "length_in": 24.5 + (i % 3),
+            "height_in": 12.125,
+            "finish": "Satin Aluminum",
+            "qty_ordered": 4,
+            "qty_shipped": 1,
+            "build_note": None,
+            "product_tag": f"TAG-{i % 5}" if i % 2 else None,
+        })
+    return {
+        "order_no": order_no,
+        "po_number": "PO-12345",
+        "order_date": "2025-10-01",
+        "due_date": "2025-10-08",
+        "lead_time_plan": "3 Day",
+        "project_name": "Benchmark Project",
+        "tag": "BENCH",
+        "customer_name": "ACME Mechanical",
+        "customer_address1": "1 Example Rd",
+        "customer_address2": None,
+        "customer_city": "Windsor",
+        "customer_province": "ON",
+        "customer_postal_code": "N9A 6J3",
+        "customer_country": "CA",
+        "customer_phone": "5197371199",
+        "sales_rep_name": "Sales Rep",
+        "ship_name": "ACME Site Office",
+        "ship_address1": "200 Jobsite Ave",
+        "ship_address2": "Unit 4",
+        "ship_city": "Toronto",
+        "ship_province": "ON",
+        "ship_postal_code": "M5V 1A1",
+        "ship_country": "CA",
+        "ship_attention": "Receiver",
+        "ship_phone": "4165550100",
+        "ship_email": "receiving@example.com",
+        "ship_by": "UPS - Ground - Prepaid - Account #: 02243E",
+        "ship_by_date": "2025-10-08",
+        "items": items,
+        "boxes": [],
+    }
+
+
+def _engine_fn(engine: str):
+    if engine == "native":
+        from backend.services.report_native import render_packing_slip_native
+        return render_packing_slip_native
+    if engine == "chromium":
+        from backend.services.report_html import render_packing_slip_pdf
+        return lambda data: render_packing_slip_pdf(data, "chromium")
+    return render_packing_slip
+
+
+def _tree_rss_kb(pid: int) -> int:
+    """Resident set size of `pid` and all its descendants (Linux /proc)."""
+    total = 0
+    pending = [pid]
+    while pending:
+        p = pending.pop()
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            with open(f"/proc/{p}/task/{p}/children") as f:
+                pending.extend(int(c) for c in f.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total
+
+
+class PeakRss:
+    """Samples the process tree RSS in the background and keeps the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, _tree_rss_kb(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, _tree_rss_kb(os.getpid()))
+
+
+def bench_inline(render, data: dict, slips: int) -> float:
+    render(data)  # warm up (fonts, images, browser launch)
+    start = time.perf_counter()
+    for _ in range(slips):
+        render(data)
+    return time.perf_counter() - start
+
+
+def bench_pool(data: dict, slips: int, workers: int, engine: str = "workbook") -> float:
+    if engine == "chromium":
+        # Chromium parallelism comes from the browser pool (BROWSER_POOL_SIZE)
+        render = _engine_fn(engine)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render, [data] * workers))
+            start = time.perf_counter()
+            list(pool.map(render, [data] * slips))
+            return time.perf_counter() - start
+
+    fn = render_packing_slip
+    if engine == "native":
+        from backend.services.report_native import render_packing_slip_native
+        fn = render_packing_slip_native
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Warm up so process start-up isn't counted
+        list(pool.map(fn, [data] * workers))
+        start = time.perf_counter()
+        list(pool.map(fn, [data] * slips))
+        return time.perf_counter() - start
+
+
+def report(name: str, slips: int, elapsed: float, peak_kb: int = 0) -> None:
+    rss = f"  peak RSS {peak_kb / 1024:8.1f} MiB" if peak_kb else ""
+    print(f"{name:<28} {slips:>5} slips  {elapsed:8.2f} s  {slips / elapsed:8.1f} slips/s  "
+          f"{elapsed / slips * 1000:8.1f} ms/slip{rss}", flush=True)
+
+
+def run_engine(engine: str, slips: int, items: int, workers: int) -> None:
+    data = make_slip_data(items)
+    render = _engine_fn(engine)
+    pdf = render(data)
+    print(f"[{engine}] slip size: {len(pdf) / 1024:.1f} KiB, {items} item lines", flush=True)
+
+    with PeakRss() as rss:
+        elapsed = bench_inline(render, data, slips)
+    report(f"{engine} sequential", slips, elapsed, rss.peak_kb)
+
+    with PeakRss() as rss:
+        elapsed = bench_pool(data, slips, workers, engine)
+    report(f"{engine} x{workers} parallel", slips, elapsed, rss.peak_kb)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slips", type=int, default=50, help="Slips to render per run")
+    parser.add_argument("--items", type=int, default=40, help="Item lines per slip")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool / concurrent render count")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Comma separated engines to compare")
+    parser.add_argument("--engine", choices=ENGINES, help=argparse.SUPPRESS)  # single-engine child run
+    args = parser.parse_args()
+
+    if args.engine:
+        if args.engine == "chromium":
+            os.environ["BROWSER_POOL_SIZE"] = str(args.workers)
+        run_engine(args.engine, args.slips, args.items, args.workers)
+        sys.exit(0)
+
+    for engine in args.engines.split(","):
+        engine = engine.strip()
+        if engine not in ENGINES:
+            parser.error(f"unknown engine '{engine}' (choose from {', '.join(ENGINES)})")
+        result = subprocess.run([
+            sys.executable, "-m", "backend.scripts.bench_packing_slip", "--engine", engine,
+            "--slips", str(args.slips), "--items", str(args.items), "--workers", str(args.workers),
+        ], cwd=str(Path(__file__).parent.parent.parent))
+        if result.returncode != 0:
+            print(f"[{engine}] failed (exit {result.returncode})")
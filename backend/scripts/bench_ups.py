@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Latency / throughput benchmark for the UPS integration, run entirely against
+scripts/fake_ups_server.py (started in-process on a free port) - no network,
+no UPS credentials, no SQL Server (batch results go to a throwaway SQLite DB).
+
+Suites:
+  token  - OAuth token cache: cold fetch vs cached, and single-flight under
+           concurrent callers (expects exactly one token request)
+  pool   - sequential rating calls on the shared keep-alive client vs a new
+           connection per call (expects the pooled run to reuse one connection)
+  shop   - rate shopping (all services concurrently) vs quoting them one by one
+  batch  - bulk rating of synthetic packs through bulk_rating.rate_packs()
+
+The rate quote cache is disabled so every call reaches the fake server.
+Exits non-zero if an expectation fails, so it can run as a CI check.
+Usage: python -m backend.scripts.bench_ups [--suites token,pool,shop,batch] [--calls 50] [--packs 60]
+                                           [--latency-ms 80] [--error-rate 0] [--throttle-rate 0]
+                                           [--rate-limit 10]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+SUITES = ("token", "pool", "shop", "batch")
+
+SHIP_FROM = {
+    "name": "Bench Shipper", "address1": "1 Example Rd", "address2": None, "city": "Windsor",
+    "province": "ON", "postal_code": "N9A6J3", "country": "CA",
+}
+SHIP_TO = {
+    "ship_name": "ACME Site Office", "ship_address1": "200 Jobsite Ave", "ship_address2": "Unit 4",
+    "ship_city": "Buffalo", "ship_province": "NY", "ship_postal_code": "14201", "ship_country": "US",
+}
+
+
+def make_boxes(n: int = 3) -> list:
+    return [
+        {"box_no": i + 1, "custom_l_in": 24 + i, "custom_w_in": 12, "custom_h_in": 8, "weight_lbs": 15 + 3 * i}
+        for i in range(n)
+    ]
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.1f} ms"
+
+
+def refill_rate_limiter() -> None:
+    """Let the token bucket fill up so one suite's calls don't throttle the next."""
+    from backend.services import ups_service
+
+    if ups_service.rate_limiter.rate > 0:
+        time.sleep(ups_service.rate_limiter.burst / ups_service.rate_limiter.rate)
+
+
+class Checks:
+    def __init__(self):
+        self.failed = []
+
+    def expect(self, ok: bool, message: str) -> None:
+        print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+        if not ok:
+            self.failed.append(message)
+
+
+def bench_token(server, checks: Checks) -> None:
+    from backend.core.config import get_settings
+    from backend.services import ups_service
+
+    settings = get_settings()
+    ups_service._token_cache.invalidate(settings.UPS_CLIENT_ID, True)
+    start = time.perf_counter()
+    ups_service.get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, True)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        ups_service.get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, True)
+    cached = (time.perf_counter() - start) / 1000
+    print(f"token  cold fetch {ms(cold)}   cached {cached * 1e6:8.1f} us/call")
+
+    ups_service._token_cache.invalidate(settings.UPS_CLIENT_ID, True)
+    before = server.stats.snapshot()["token_requests"]
+    barrier = threading.Barrier(16)
+
+    def caller():
+        barrier.wait()
+        ups_service.get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, True)
+
+    threads = [threading.Thread(target=caller) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    fetched = server.stats.snapshot()["token_requests"] - before
+    checks.expect(fetched == 1, f"16 concurrent callers after expiry -> {fetched} token request(s)")
+    checks.expect(cached < cold / 100, "cached token at least 100x faster than a fetch")
+
+
+def bench_pool(server, checks: Checks, calls: int) -> None:
+    import requests
+    from backend.core.config import get_settings
+    from backend.services import ups_service
+
+    settings = get_settings()
+    payload = ups_service.build_rate_payload(1, make_boxes(), SHIP_TO, SHIP_FROM, settings.UPS_ACCOUNT_NUMBER,
+                                             "11", "UPS Standard")
+    ups_service.get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, True)
+    try:
+        ups_service.post_rate_request(payload, 1)  # first connection
+    except ValueError:
+        pass
+
+    before = server.stats.snapshot()["connections"]
+    pooled, failed = [], 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            ups_service.post_rate_request(payload, 1)
+        except ValueError:  # injected failure that outlasted the retries
+            failed += 1
+        pooled.append(time.perf_counter() - start)
+    pooled_connections = server.stats.snapshot()["connections"] - before
+
+    token = ups_service.get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, True)
+    url = f"{ups_service.ups_base_url(True)}/api/rating/v2409/Rate"
+    fresh = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        with requests.Session() as session:  # new connection every call
+            session.post(url, json=payload, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        fresh.append(time.perf_counter() - start)
+
+    print(f"pool   pooled p50 {ms(statistics.median(pooled))}  p95 {ms(sorted(pooled)[int(0.95 * len(pooled))])}  "
+          f"({pooled_connections} new connection(s) for {calls} calls, {failed} failed)")
+    print(f"       fresh  p50 {ms(statistics.median(fresh))}  p95 {ms(sorted(fresh)[int(0.95 * len(fresh))])}")
+    checks.expect(pooled_connections <= 1, f"pooled calls reused the connection ({pooled_connections} opened)")
+
+
+def bench_shop(server, checks: Checks) -> None:
+    from backend.core.config import get_settings
+    from backend.services import ups_service
+
+    settings = get_settings()
+    boxes = make_boxes()
+    services = ups_service.eligible_services(*ups_service.shipment_countries(SHIP_TO, SHIP_FROM))
+    # Warm up: token, rate cache module import, pool threads and connections
+    ups_service.rate_shop(1, boxes, SHIP_TO, "Ground", settings.UPS_ACCOUNT_NUMBER, SHIP_FROM, use_cache=False)
+
+    refill_rate_limiter()
+    start = time.perf_counter()
+    for code, description in services:
+        payload = ups_service.build_rate_payload(1, boxes, SHIP_TO, SHIP_FROM, settings.UPS_ACCOUNT_NUMBER,
+                                                 code, description)
+        try:
+            ups_service.rate_with_cache(payload, 1, use_cache=False)
+        except ValueError:
+            pass
+    sequential = time.perf_counter() - start
+
+    refill_rate_limiter()
+    start = time.perf_counter()
+    result = ups_service.rate_shop(1, boxes, SHIP_TO, "Ground", settings.UPS_ACCOUNT_NUMBER, SHIP_FROM,
+                                   use_production=True, use_cache=False)
+    shop = time.perf_counter() - start
+    cheapest = result["rates"][0] if result["rates"] else None
+    print(f"shop   {len(services)} services one by one {ms(sequential)}   rate_shop {ms(shop)}  "
+          f"({len(result['rates'])} rated, {len(result['errors'])} errors, {len(result['timed_out'])} timed out; "
+          f"cheapest {cheapest['service'] if cheapest else '-'} {cheapest['charge'] if cheapest else ''})")
+    checks.expect(shop < sequential * 0.6, "rate shopping is bounded by the slowest call, not the sum")
+
+
+def bench_batch(server, checks: Checks, packs: int) -> None:
+    from backend.db.session import AppSessionLocal
+    from backend.services import bulk_rating, pack_view
+
+    def synthetic_inputs(pack_ids):
+        # Stands in for the SQL Server / OES reads; each pack gets a slightly different shipment
+        return {
+            pid: {
+                "order_no": str(290000 + pid),
+                "boxes": make_boxes(1 + pid % 4),
+                "ship_to_address": dict(SHIP_TO, ship_postal_code=f"14{pid % 1000:03d}"),
+                "service_level": ("Ground", "2nd Day Air", "Standard")[pid % 3],
+            }
+            for pid in pack_ids
+        }
+
+    pack_view.get_rate_inputs_batch = synthetic_inputs
+    refill_rate_limiter()
+    before = server.stats.snapshot()
+    with AppSessionLocal() as db:
+        start = time.perf_counter()
+        batch = bulk_rating.rate_packs(db, list(range(1, packs + 1)), use_cache=False)
+        elapsed = time.perf_counter() - start
+    after = server.stats.snapshot()
+    print(f"batch  {packs} packs in {elapsed:6.2f} s  ({packs / elapsed:6.1f} packs/s)  "
+          f"rated {batch['rated_count']}, failed {batch['failed_count']}, "
+          f"{after['rate_requests'] - before['rate_requests']} rating requests, "
+          f"{after['throttled'] - before['throttled']} 429s, {after['connections'] - before['connections']} new connections")
+    checks.expect(batch["rated_count"] + batch["failed_count"] == packs, "every pack has a stored result row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma separated suites to run")
+    parser.add_argument("--calls", type=int, default=50, help="Rating calls per pool run")
+    parser.add_argument("--packs", type=int, default=60, help="Packs in the batch run")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Fake UPS rating latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of rating calls answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of rating calls answered 429")
+    parser.add_argument("--rate-limit", type=float, help="UPS_RATE_LIMIT_PER_SECOND for the run (default: setting)")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    for suite in suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite '{suite}' (choose from {', '.join(SUITES)})")
+
+    from backend.scripts.fake_ups_server import start_server
+
+    server = start_server([
+        "--port", "0", "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.latency_ms / 5),
+        "--token-latency-ms", "100", "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate), "--unavailable", "54", "--seed", "1",
+    ])
+
+    # Settings are read at import time, so everything is pointed at the fake before importing the app
+    db_file = Path(tempfile.mkdtemp(prefix="bench_ups_")) / "app.db"
+    os.environ.update({
+        "UPS_BASE_URL": server.base_url,
+        "UPS_CLIENT_ID": "bench-client",
+        "UPS_CLIENT_SECRET": "bench-secret",
+        "UPS_ACCOUNT_NUMBER": "BENCH1",
+        "UPS_RATE_CACHE_TTL_SECONDS": "0",
+        "APP_DATABASE_URL": f"sqlite:///{db_file}",
+        "OES_DATABASE_URL": "sqlite://",
+    })
+    if args.rate_limit is not None:
+        os.environ["UPS_RATE_LIMIT_PER_SECOND"] = str(args.rate_limit)
+
+    from backend.core.config import get_settings
+    get_settings.cache_clear()
+    settings = get_settings()
+
+    from backend.db.models import RateBatch, RateBatchResult, ShipmentQuote
+    from backend.db.session import AppBase, app_engine
+    AppBase.metadata.create_all(bind=app_engine, tables=[
+        RateBatch.__table__, RateBatchResult.__table__, ShipmentQuote.__table__,
+    ])
+    print(f"fake UPS at {server.base_url}: rating {args.latency_ms:.0f}ms, errors {args.error_rate:.0%}, "
+          f"429s {args.throttle_rate:.0%}; rate limit {settings.UPS_RATE_LIMIT_PER_SECOND}/s, "
+          f"{settings.UPS_RATE_SHOP_WORKERS} workers, pool {settings.CARRIER_HTTP_POOL_SIZE}")
+
+    checks = Checks()
+    if "token" in suites:
+        bench_token(server, checks)
+    if "pool" in suites:
+        bench_pool(server, checks, args.calls)
+    if "shop" in suites:
+        bench_shop(server, checks)
+    if "batch" in suites:
+        bench_batch(server, checks, args.packs)
+
+    from backend.services.carrier_http import carrier_http
+    for name, stats in carrier_http.metrics().items():
+        print(f"metrics {name:<10} calls {stats['calls']:>5}  retries {stats['retries']:>3}  "
+              f"p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  statuses {stats['statuses']}")
+
+    server.shutdown()
+    if checks.failed:
+        print(f"{len(checks.failed)} expectation(s) failed")
+        sys.exit(1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Self-check: an authenticated request checks out at most one App DB connection.
+
+Authentication and the handler share the request's session (deps.get_app_db
+is the handlers' get_app_session), so a request must not hold two pooled
+connections. Both ways get_current_user authorizes are covered:
+
+  claims    - a token from /api/auth/login (uid / role / auth_epoch claims,
+              epoch known in memory): no query for the user at all
+  fallback  - a token without those claims, user cache cleared: the user is
+              looked up on the request's session
+
+Runs the real app in-process (TestClient) against a throwaway SQLite file and
+counts checkouts with session.pool_metrics(). Exits non-zero if a request
+checks out more than one connection.
+Usage: python -m backend.scripts.check_db_checkouts [--requests 5]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Endpoints that read the App DB in the handler as well as in auth
+ENDPOINTS = ("/api/users/", "/api/stations", "/api/cartons")
+
+
+class Checks:
+    def __init__(self):
+        self.failed = []
+
+    def expect(self, ok: bool, message: str) -> None:
+        print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+        if not ok:
+            self.failed.append(message)
+
+
+def setup_app():
+    """The app on a fresh SQLite database with one supervisor; returns (client, claims token, fallback token)."""
+    from fastapi.testclient import TestClient
+
+    from backend.core.auth import create_access_token, hash_password
+    from backend.db.models import CartonType, Role, StationSetting, User
+    from backend.db.session import AppBase, AppSessionLocal, app_engine
+    from backend.main import app
+
+    AppBase.metadata.create_all(bind=app_engine, tables=[
+        User.__table__, StationSetting.__table__, CartonType.__table__,
+    ])
+    with AppSessionLocal() as db:
+        db.add(User(username="checker", password_hash=hash_password("checker-pw"), role=Role.supervisor, active=1))
+        db.commit()
+
+    client = TestClient(app)
+    login = client.post("/api/auth/login", json={"username": "checker", "password": "checker-pw"})
+    login.raise_for_status()
+    claims_token = login.json()["access_token"]
+    # What tokens looked like before the uid / role / auth_epoch claims
+    fallback_token = create_access_token({"sub": "checker", "user_id": 1, "role": "supervisor"})
+    return client, claims_token, fallback_token
+
+
+def check_path(client, name: str, token: str, requests: int, checks: Checks) -> None:
+    from backend.core.auth import decode_token
+    from backend.db.session import pool_metrics
+    from backend.services.auth_epochs import auth_epochs
+    from backend.services.user_cache import user_cache
+
+    if name == "claims":
+        checks.expect(auth_epochs.lookup(1) is not None, "claims: user's auth epoch is known, no user lookup needed")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    issued_at = decode_token(token).get("iat")
+    for url in ENDPOINTS:
+        worst = 0
+        for _ in range(requests):
+            if name == "fallback":
+                user_cache.clear()  # force the DB lookup every time
+            before = pool_metrics()["app"]["checkouts"]
+            response = client.get(url, headers=headers)
+            used = pool_metrics()["app"]["checkouts"] - before
+            if response.status_code != 200:
+                checks.expect(False, f"{name}: GET {url} -> {response.status_code} {response.text[:200]}")
+                break
+            worst = max(worst, used)
+            if name == "fallback" and user_cache.get("checker", issued_at) is None:
+                checks.expect(False, f"fallback: GET {url} did not look the user up")
+                break
+        else:
+            checks.expect(worst <= 1, f"{name}: GET {url} checks out {worst} connection(s) per request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per endpoint and auth path")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the database is chosen before importing the app
+    db_file = Path(tempfile.mkdtemp(prefix="check_db_checkouts_")) / "app.db"
+    os.environ.update({
+        "APP_DATABASE_URL": f"sqlite:///{db_file}",
+        "OES_DATABASE_URL": "sqlite://",
+        "BCRYPT_ROUNDS": "4",
+    })
+
+    # One line per request would swamp the report
+    logging.getLogger("httpx").setLevel(logging.ERROR)
+
+    checks = Checks()
+    client, claims_token, fallback_token = setup_app()
+    check_path(client, "claims", claims_token, args.requests, checks)
+    check_path(client, "fallback", fallback_token, args.requests, checks)
+
+    from backend.db.session import pool_metrics
+    print(pool_metrics())
+
+    if checks.failed:
+        print(f"{len(checks.failed)} expectation(s) failed")
+        sys.exit(1)
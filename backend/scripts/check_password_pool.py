@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Self-check for services/password_pool.py: queued password checks that are
+cancelled (client disconnected, request timed out, pool shut down) must give
+their queue slot back, or the pool ends up answering every login with 503.
+
+Runs on a private one-worker pool; no database needed. Exits non-zero if an
+expectation fails.
+Usage: python -m backend.scripts.check_password_pool [--max-pending 3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# bcrypt at the production cost keeps the single worker busy while the rest is queued
+os.environ.setdefault("BCRYPT_ROUNDS", "12")
+
+
+class Checks:
+    def __init__(self):
+        self.failed = []
+
+    def expect(self, ok: bool, message: str) -> None:
+        print(f"  [{'ok' if ok else 'FAIL'}] {message}")
+        if not ok:
+            self.failed.append(message)
+
+
+async def check_cancel_releases(pool, checks: Checks) -> None:
+    running = asyncio.ensure_future(pool.hash_async("busy-worker"))
+    await asyncio.sleep(0.05)  # let it start, so the next ones queue behind it
+    queued = [asyncio.ensure_future(pool.hash_async(f"queued-{i}")) for i in range(pool.max_pending - 1)]
+    await asyncio.sleep(0)
+    checks.expect(pool.metrics()["pending"] == pool.max_pending, f"{pool.max_pending} checks pending while queued")
+
+    for task in queued:
+        task.cancel()
+    await asyncio.gather(*queued, return_exceptions=True)
+    await running
+    await asyncio.sleep(0.05)
+    metrics = pool.metrics()
+    checks.expect(metrics["pending"] == 0, f"cancelled checks released their slots (pending {metrics['pending']})")
+    checks.expect(metrics["cancelled"] == len(queued), f"{metrics['cancelled']} recorded as cancelled")
+
+
+async def check_full_then_recovers(pool, checks: Checks) -> None:
+    from backend.services.password_pool import PasswordPoolBusy
+
+    tasks = [asyncio.ensure_future(pool.hash_async(f"fill-{i}")) for i in range(pool.max_pending)]
+    await asyncio.sleep(0)
+    try:
+        await pool.verify_async("one-too-many", "$2b$12$invalid")
+        rejected = False
+    except PasswordPoolBusy:
+        rejected = True
+    checks.expect(rejected, "a full queue turns the next login away")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.5)  # the one already running finishes
+    try:
+        ok = isinstance(await pool.hash_async("after-cancel"), str)
+    except PasswordPoolBusy:
+        ok = False
+    checks.expect(ok, "after cancelling, new logins are accepted again")
+
+
+def check_shutdown_releases(pool, checks: Checks) -> None:
+    futures = [pool._submit(lambda: None) for _ in range(3)]
+    pool.shutdown()
+    for future in futures:
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+    metrics = pool.metrics()
+    checks.expect(metrics["pending"] == 0, f"shutdown(cancel_futures=True) leaves nothing pending ({metrics['pending']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-pending", type=int, default=3, help="Queue limit of the pool under test")
+    args = parser.parse_args()
+
+    from backend.services.password_pool import PasswordPool
+
+    checks = Checks()
+    pool = PasswordPool(workers=1, max_pending=args.max_pending)
+    asyncio.run(check_cancel_releases(pool, checks))
+    asyncio.run(check_full_then_recovers(pool, checks))
+    check_shutdown_releases(pool, checks)
+    print(pool.metrics())
+
+    if checks.failed:
+        print(f"{len(checks.failed)} expectation(s) failed")
+        sys.exit(1)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Fake CUPS server (IPP over HTTP) for testing Linux printing without a print
+server. It accepts Print-Job and Create-Job/Send-Document, saves every
+document to --out-dir with a job id, and answers the printer queries `lp`
+makes first, so both CUPS_SUBMIT_METHOD=ipp and =lp (with CUPS_SERVER) work:
+
+    CUPS_SERVER=127.0.0.1:8631 CUPS_SUBMIT_METHOD=ipp uvicorn backend.main:app
+    echo hello | lp -h 127.0.0.1:8631 -d Zebra -
+
+Usage: python -m backend.scripts.fake_cups [--host 127.0.0.1] [--port 8631] [--out-dir /tmp/fake_cups]
+                                           [--printers "Zebra,Office"] [--reject] [--self-test]
+"""
+import argparse
+import itertools
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.cups_backend import (
+    encode_ipp, decode_ipp, find_attribute,
+    OP_PRINT_JOB, OP_CREATE_JOB, OP_SEND_DOCUMENT, OP_GET_JOBS, OP_GET_PRINTER_ATTRIBUTES,
+    OP_CUPS_GET_DEFAULT, OP_CUPS_GET_PRINTERS,
+    TAG_OPERATION, TAG_JOB, TAG_PRINTER,
+    TAG_INTEGER, TAG_BOOLEAN, TAG_ENUM, TAG_TEXT, TAG_NAME, TAG_KEYWORD, TAG_URI, TAG_CHARSET, TAG_LANGUAGE,
+    TAG_MIME, STATUS_OK,
+)
+
+STATUS_NOT_FOUND = 0x0406
+STATUS_NOT_ACCEPTING = 0x0506
+STATUS_OPERATION_NOT_SUPPORTED = 0x0501
+
+EXTENSIONS = {
+    "application/pdf": "pdf",
+    "application/postscript": "ps",
+    "application/vnd.cups-raw": "raw",
+    "text/plain": "txt",
+}
+
+_job_ids = itertools.count(1)
+_jobs = {}  # job id -> {"printer", "name", "format"}
+_jobs_lock = threading.Lock()
+
+
+def _header(message: str = "successful-ok"):
+    return (TAG_OPERATION, [
+        (TAG_CHARSET, "attributes-charset", "utf-8"),
+        (TAG_LANGUAGE, "attributes-natural-language", "en"),
+        (TAG_TEXT, "status-message", message),
+    ])
+
+
+def _printer_group(server, name: str):
+    uri = f"ipp://{server.server_address[0]}:{server.server_address[1]}/printers/{name}"
+    return (TAG_PRINTER, [
+        (TAG_URI, "printer-uri-supported", uri),
+        (TAG_NAME, "printer-name", name),
+        (TAG_ENUM, "printer-state", 3),  # idle
+        (TAG_BOOLEAN, "printer-is-accepting-jobs", not server.options.reject),
+        (TAG_INTEGER, "printer-type", 0),
+        (TAG_KEYWORD, "printer-state-reasons", "none"),
+        (TAG_MIME, "document-format-supported", list(EXTENSIONS)),
+        (TAG_KEYWORD, "operations-supported", "all"),
+    ])
+
+
+class CupsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if "chunked" in (self.headers.get("Transfer-Encoding") or "").lower():
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _reply(self, status: int, request_id: int, groups=(), message: str = "successful-ok"):
+        body = encode_ipp(status, request_id, [_header(message), *groups])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/ipp")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _printer_name(self, request) -> str:
+        uri = find_attribute(request, "printer-uri") or self.path
+        return unquote(str(uri).rstrip("/").rsplit("/", 1)[-1])
+
+    def _save(self, job_id: int, data: bytes) -> Path:
+        job = _jobs[job_id]
+        ext = EXTENSIONS.get(job["format"], "bin")
+        out = Path(self.server.options.out_dir) / f"{job['printer']}-{job_id}.{ext}"
+        out.write_bytes(data)
+        print(f"{datetime.now():%H:%M:%S} job {job['printer']}-{job_id} '{job['name']}': "
+              f"{len(data)} bytes {job['format']} -> {out}")
+        return out
+
+    def do_POST(self):
+        request = decode_ipp(self._read_body())
+        op, request_id = request["code"], request["request_id"]
+        opts = self.server.options
+        printers = opts.printer_list
+
+        if op in (OP_CUPS_GET_PRINTERS, OP_CUPS_GET_DEFAULT):
+            names = printers if op == OP_CUPS_GET_PRINTERS else printers[:1]
+            return self._reply(STATUS_OK, request_id, [_printer_group(self.server, n) for n in names])
+
+        if op == OP_GET_JOBS:
+            return self._reply(STATUS_OK, request_id)
+
+        printer = self._printer_name(request)
+        if op == OP_SEND_DOCUMENT:
+            job_id = find_attribute(request, "job-id")
+            if job_id not in _jobs:
+                return self._reply(STATUS_NOT_FOUND, request_id, message=f"job {job_id} not found")
+            self._save(job_id, request["data"])
+            return self._reply(STATUS_OK, request_id, [(TAG_JOB, [
+                (TAG_INTEGER, "job-id", job_id),
+                (TAG_ENUM, "job-state", 5),
+            ])])
+
+        if printer not in printers:
+            return self._reply(STATUS_NOT_FOUND, request_id, message=f"printer {printer} not found")
+        if op == OP_GET_PRINTER_ATTRIBUTES:
+            return self._reply(STATUS_OK, request_id, [_printer_group(self.server, printer)])
+        if op not in (OP_PRINT_JOB, OP_CREATE_JOB):
+            return self._reply(STATUS_OPERATION_NOT_SUPPORTED, request_id, message=f"operation 0x{op:04x}")
+        if opts.reject:
+            return self._reply(STATUS_NOT_ACCEPTING, request_id, message=f"{printer} is not accepting jobs")
+
+        with _jobs_lock:
+            job_id = next(_job_ids)
+            _jobs[job_id] = {
+                "printer": printer,
+                "name": find_attribute(request, "job-name") or "untitled",
+                "format": find_attribute(request, "document-format") or "application/octet-stream",
+            }
+        if op == OP_PRINT_JOB:
+            self._save(job_id, request["data"])
+        self._reply(STATUS_OK, request_id, [(TAG_JOB, [
+            (TAG_URI, "job-uri", f"ipp://{self.server.server_address[0]}:{self.server.server_address[1]}/jobs/{job_id}"),
+            (TAG_INTEGER, "job-id", job_id),
+            (TAG_ENUM, "job-state", 5 if op == OP_PRINT_JOB else 3),
+        ])])
+
+
+class CupsServer(ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def self_test(server: CupsServer) -> None:
+    """Submit a PDF-ish and a raw job through cups_backend.submit_ipp and check they arrive."""
+    import os
+
+    os.environ["CUPS_SERVER"] = f"{server.server_address[0]}:{server.server_address[1]}"
+    from backend.core.config import get_settings
+    get_settings.cache_clear()
+    from backend.services import cups_backend
+
+    printer = server.options.printer_list[0]
+    for data, fmt in ((b"%PDF-1.4 test", cups_backend.PDF), (b"^XA^FDBOX 1 OF 1^FS^XZ", cups_backend.RAW)):
+        job_id = cups_backend.submit_ipp(printer, data, fmt, title="self-test")
+        saved = Path(server.options.out_dir) / f"{job_id}.{EXTENSIONS[fmt]}"
+        assert saved.read_bytes() == data, f"{saved} does not match what was sent"
+        print(f"ok: {fmt} -> {job_id}")
+    try:
+        cups_backend.submit_ipp("NoSuchPrinter", b"x", cups_backend.PDF)
+    except cups_backend.CupsError as e:
+        print(f"ok: unknown printer rejected ({e})")
+    else:
+        raise AssertionError("unknown printer was accepted")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8631)
+    parser.add_argument("--out-dir", default="/tmp/fake_cups", help="Where received documents are written")
+    parser.add_argument("--printers", default="Zebra,Office", help="Comma-separated queue names")
+    parser.add_argument("--reject", action="store_true", help="Refuse every job (failure testing)")
+    parser.add_argument("--self-test", action="store_true", help="Submit test jobs via cups_backend and exit")
+    args = parser.parse_args()
+    args.printer_list = [p.strip() for p in args.printers.split(",") if p.strip()]
+
+    Path(args.out_dir).mkdir(parents=True, exist_ok=True)
+    with CupsServer((args.host, args.port), CupsHandler) as server:
+        server.options = args
+        if args.self_test:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self_test(server)
+            server.shutdown()
+            sys.exit(0)
+        print(f"Fake CUPS listening on {args.host}:{args.port} ({', '.join(args.printer_list)}), jobs -> {args.out_dir}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
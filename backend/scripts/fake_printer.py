@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Fake raw (port 9100) label printer for testing ZPL printing without a Zebra.
+Every connection is one job: it is saved to --out-dir and summarised (labels
+= ^XA...^XZ blocks). Point the app at it with printer_name=127.0.0.1:9100 or
+ZPL_PRINTER_HOSTS='{"Zebra ZD420": "127.0.0.1:9100"}'.
+Usage: python -m backend.scripts.fake_printer [--host 127.0.0.1] [--port 9100] [--out-dir /tmp/fake_printer]
+                                              [--delay 0] [--drop]
+"""
+import argparse
+import re
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+_job_counter = 0
+_job_lock = threading.Lock()
+
+
+def summarize_zpl(payload: bytes) -> str:
+    """One-line description of a ZPL job: label count and the BOX N OF M fields it carries."""
+    text = payload.decode("utf-8", errors="replace")
+    labels = len(re.findall(r"\^XA", text))
+    boxes = re.findall(r"\^FDBOX ([^\^]*)\^FS", text)
+    return f"{labels} label(s)" + (f" [{', '.join(b.strip() for b in boxes)}]" if boxes else "")
+
+
+class PrinterHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        global _job_counter
+        opts = self.server.options
+        if opts.delay:
+            time.sleep(opts.delay)
+        if opts.drop:
+            print(f"{datetime.now():%H:%M:%S} dropping connection from {self.client_address[0]}")
+            return
+
+        payload = self.rfile.read()
+        with _job_lock:
+            _job_counter += 1
+            job_no = _job_counter
+        out = Path(opts.out_dir) / f"job_{job_no:04d}.zpl"
+        out.write_bytes(payload)
+        print(f"{datetime.now():%H:%M:%S} job {job_no} from {self.client_address[0]}: "
+              f"{len(payload)} bytes, {summarize_zpl(payload)} -> {out}")
+
+
+class PrinterServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--out-dir", default="/tmp/fake_printer", help="Where received jobs are written")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds to wait before reading each job")
+    parser.add_argument("--drop", action="store_true", help="Close connections without reading (failure testing)")
+    args = parser.parse_args()
+
+    Path(args.out_dir).mkdir(parents=True, exist_ok=True)
+    with PrinterServer((args.host, args.port), PrinterHandler) as server:
+        server.options = args
+        print(f"Fake printer listening on {args.host}:{args.port}, jobs -> {args.out_dir}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
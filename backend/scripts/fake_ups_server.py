@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Fake UPS OAuth + Rating server for exercising ups_service offline.
+
+Implements the two endpoints the app calls:
+  POST /security/v1/oauth/token      client_credentials; Basic auth required
+  POST /api/rating/<version>/Rate    RateResponse priced from the packages
+                                     (billable weight, per-service base and
+                                     per-lb rates, ~28% negotiated discount)
+plus GET /stats (request / connection counters) and POST /stats/reset.
+
+Latency and failures are configurable, so retries, 429 handling, token
+refresh and rate shopping timeouts can be reproduced. Point the app at it
+with UPS_BASE_URL:
+
+    UPS_BASE_URL=http://127.0.0.1:8089 UPS_CLIENT_ID=x UPS_CLIENT_SECRET=y uvicorn backend.main:app
+
+Usage: python -m backend.scripts.fake_ups_server [--host 127.0.0.1] [--port 8089]
+                                                 [--latency-ms 150] [--jitter-ms 50] [--token-latency-ms 100]
+                                                 [--error-rate 0.0] [--throttle-rate 0.0] [--token-ttl 14399]
+                                                 [--unavailable 54,65] [--slow 14:2000]
+"""
+import argparse
+import base64
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# service code -> (description, base charge, per billable lb, business days in transit)
+SERVICES = {
+    "01": ("UPS Next Day Air", 38.50, 2.95, 1),
+    "02": ("UPS 2nd Day Air", 24.10, 1.80, 2),
+    "03": ("UPS Ground", 11.25, 0.78, 4),
+    "12": ("UPS 3 Day Select", 18.40, 1.25, 3),
+    "13": ("UPS Next Day Air Saver", 34.20, 2.60, 1),
+    "14": ("UPS Next Day Air Early", 72.00, 3.40, 1),
+    "07": ("UPS Worldwide Express", 61.00, 4.10, 2),
+    "08": ("UPS Worldwide Expedited", 47.50, 3.20, 3),
+    "11": ("UPS Standard", 16.90, 0.95, 5),
+    "54": ("UPS Worldwide Express Plus", 95.00, 4.90, 1),
+    "65": ("UPS Worldwide Saver", 55.00, 3.70, 2),
+}
+NEGOTIATED_DISCOUNT = 0.28
+DIM_DIVISOR = 139  # UPS daily-rates dimensional weight divisor (cubic inches per lb)
+
+
+def _error_body(code: str, message: str) -> dict:
+    return {"response": {"errors": [{"code": code, "message": message}]}}
+
+
+def _money(currency: str, amount: float) -> dict:
+    return {"CurrencyCode": currency, "MonetaryValue": f"{amount:.2f}"}
+
+
+def price_shipment(shipment: dict) -> dict:
+    """RatedShipment for a RateRequest Shipment, shaped like UPS Rating v2409 output."""
+    code = (shipment.get("Service") or {}).get("Code", "03")
+    description, base, per_lb, days = SERVICES.get(code, SERVICES["03"])
+    origin = ((shipment.get("Shipper") or {}).get("Address") or {}).get("CountryCode", "US")
+    currency = "CAD" if origin == "CA" else "USD"
+    packages = shipment.get("Package") or []
+    if isinstance(packages, dict):
+        packages = [packages]
+
+    rated_packages, billable_total, total = [], 0.0, 0.0
+    for package in packages:
+        dims = package.get("Dimensions") or {}
+        actual = float((package.get("PackageWeight") or {}).get("Weight") or 0)
+        dim_weight = math.ceil(
+            float(dims.get("Length") or 0) * float(dims.get("Width") or 0) * float(dims.get("Height") or 0) / DIM_DIVISOR
+        )
+        billable = max(math.ceil(actual), dim_weight, 1)
+        charge = round(base / max(len(packages), 1) + per_lb * billable, 2)
+        billable_total += billable
+        total += charge
+        rated_packages.append({
+            "TransportationCharges": _money(currency, charge),
+            "ServiceOptionsCharges": _money(currency, 0),
+            "TotalCharges": _money(currency, charge),
+            "Weight": f"{actual:.1f}",
+            "BillingWeight": {"UnitOfMeasurement": {"Code": "LBS", "Description": "Pounds"}, "Weight": f"{billable:.1f}"},
+        })
+
+    total = round(total, 2)
+    return {
+        "Service": {"Code": code, "Description": ""},
+        "RatedShipmentAlert": [
+            {"Code": "110971", "Description": "Your invoice may vary from the displayed reference rates"},
+        ],
+        "BillingWeight": {"UnitOfMeasurement": {"Code": "LBS", "Description": "Pounds"}, "Weight": f"{billable_total:.1f}"},
+        "TransportationCharges": _money(currency, total),
+        "BaseServiceCharge": _money(currency, total),
+        "ServiceOptionsCharges": _money(currency, 0),
+        "TotalCharges": _money(currency, total),
+        "NegotiatedRateCharges": {"TotalCharge": _money(currency, round(total * (1 - NEGOTIATED_DISCOUNT), 2))},
+        "GuaranteedDelivery": {"BusinessDaysInTransit": str(days)},
+        "RatedPackage": rated_packages,
+    }
+
+
+class Stats:
+    KEYS = ("connections", "token_requests", "rate_requests", "errors_injected", "throttled", "unauthorized", "unavailable")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.KEYS, 0)
+
+    def reset(self):
+        with self._lock:
+            self.counts = dict.fromkeys(self.KEYS, 0)
+
+    def bump(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+class UpsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out separately; don't add delayed-ACK stalls
+
+    def log_message(self, fmt, *args):
+        if self.server.options.verbose:
+            super().log_message(fmt, *args)
+
+    def setup(self):
+        super().setup()
+        self.server.stats.bump("connections")
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _sleep(self, ms: float):
+        opts = self.server.options
+        jitter = random.uniform(-opts.jitter_ms, opts.jitter_ms) if opts.jitter_ms else 0
+        time.sleep(max(ms + jitter, 0) / 1000)
+
+    def _inject_failure(self) -> bool:
+        """Randomly answer 429 / 500 as configured; True if a failure was sent."""
+        opts = self.server.options
+        roll = random.random()
+        if roll < opts.throttle_rate:
+            self.server.stats.bump("throttled")
+            self._reply(429, _error_body("10429", "Too Many Requests"), {"Retry-After": "1"})
+            return True
+        if roll < opts.throttle_rate + opts.error_rate:
+            self.server.stats.bump("errors_injected")
+            self._reply(500, _error_body("10500", "Internal server error (injected)"))
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            return self._reply(200, self.server.stats.snapshot())
+        self._reply(404, _error_body("404", f"No route for GET {self.path}"))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/stats/reset":
+            self.server.stats.reset()
+            return self._reply(200, {"ok": True})
+        if path == "/security/v1/oauth/token":
+            return self._token(body)
+        if path.startswith("/api/rating/") and path.endswith("/Rate"):
+            return self._rate(body)
+        self._reply(404, _error_body("404", f"No route for POST {self.path}"))
+
+    def _token(self, body: bytes):
+        opts = self.server.options
+        self.server.stats.bump("token_requests")
+        self._sleep(opts.token_latency_ms)
+        auth = self.headers.get("Authorization") or ""
+        try:
+            client_id, _, secret = base64.b64decode(auth.split(" ", 1)[1]).decode().partition(":")
+        except Exception:
+            client_id, secret = "", ""
+        grant = parse_qs(body.decode(errors="replace")).get("grant_type", [""])[0]
+        if not auth.startswith("Basic ") or not client_id or not secret or grant != "client_credentials":
+            self.server.stats.bump("unauthorized")
+            return self._reply(401, _error_body("10401", "ClientId is Invalid"))
+        token = uuid.uuid4().hex + uuid.uuid4().hex
+        with self.server.tokens_lock:
+            self.server.tokens[token] = time.time() + opts.token_ttl
+        self._reply(200, {
+            "token_type": "Bearer",
+            "issued_at": str(int(time.time() * 1000)),
+            "client_id": client_id,
+            "access_token": token,
+            "expires_in": str(opts.token_ttl),
+            "status": "approved",
+        })
+
+    def _rate(self, body: bytes):
+        opts = self.server.options
+        self.server.stats.bump("rate_requests")
+        token = (self.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        with self.server.tokens_lock:
+            expires = self.server.tokens.get(token)
+        if expires is None or expires < time.time():
+            self.server.stats.bump("unauthorized")
+            return self._reply(401, _error_body("250002", "Invalid Authentication Information."))
+
+        try:
+            request = json.loads(body)["RateRequest"]
+            shipment = request["Shipment"]
+        except (ValueError, KeyError, TypeError):
+            return self._reply(400, _error_body("111100", "The request is not well-formed."))
+        code = (shipment.get("Service") or {}).get("Code", "03")
+        self._sleep(opts.slow.get(code, opts.latency_ms))
+        if self._inject_failure():
+            return
+        if code in opts.unavailable or code not in SERVICES:
+            self.server.stats.bump("unavailable")
+            return self._reply(400, _error_body(
+                "111210", "The requested service is unavailable between the selected locations."
+            ))
+
+        context = (request.get("Request") or {}).get("TransactionReference", {}).get("CustomerContext", "")
+        self._reply(200, {"RateResponse": {
+            "Response": {
+                "ResponseStatus": {"Code": "1", "Description": "Success"},
+                "Alert": [{"Code": "110971", "Description": "Your invoice may vary from the displayed reference rates"}],
+                "TransactionReference": {"CustomerContext": context},
+            },
+            "RatedShipment": price_shipment(shipment),
+        }})
+
+
+class FakeUpsServer(ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128  # load tests open dozens of connections at once; the default backlog is 5
+
+    def __init__(self, address, options):
+        super().__init__(address, UpsHandler)
+        self.options = options
+        self.stats = Stats()
+        self.tokens = {}
+        self.tokens_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Rating response time")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="+/- random jitter on every response")
+    parser.add_argument("--token-latency-ms", type=float, default=100, help="OAuth response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of rating calls answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of rating calls answered 429")
+    parser.add_argument("--token-ttl", type=int, default=14399, help="expires_in of issued tokens (seconds)")
+    parser.add_argument("--unavailable", default="", help="Service codes answered 'service unavailable'")
+    parser.add_argument("--slow", default="", help="Per-service latency overrides, e.g. 14:2000,54:3000")
+    parser.add_argument("--seed", type=int, help="Seed the failure injection for repeatable runs")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser
+
+
+def normalize_options(args: argparse.Namespace) -> argparse.Namespace:
+    args.unavailable = {c.strip() for c in (args.unavailable or "").split(",") if c.strip()}
+    if isinstance(args.slow, str):
+        args.slow = {
+            code.strip(): float(ms)
+            for code, _, ms in (pair.partition(":") for pair in args.slow.split(",") if pair.strip())
+        }
+    if args.seed is not None:
+        random.seed(args.seed)
+    return args
+
+
+def start_server(argv=None) -> FakeUpsServer:
+    """Start a server in a background thread (for benchmarks); argv as on the command line."""
+    options = normalize_options(build_parser().parse_args(argv or []))
+    server = FakeUpsServer((options.host, options.port), options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    args = normalize_options(build_parser().parse_args())
+    with FakeUpsServer((args.host, args.port), args) as server:
+        print(f"Fake UPS listening on {server.base_url} (rating {args.latency_ms:.0f}ms "
+              f"+/-{args.jitter_ms:.0f}ms, errors {args.error_rate:.0%}, 429s {args.throttle_rate:.0%})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
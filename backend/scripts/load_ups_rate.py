@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load test: does UPS rating slow down scanning?
+
+Drives the real FastAPI app in-process (httpx ASGI transport) against
+scripts/fake_ups_server.py with a slow rating latency. Scans
+(POST /api/pack/{id}/assign-one, with the DB work replaced by a short sleep)
+are timed three ways:
+
+  idle   - scans only
+  sync   - while `--inflight` rating requests are held open on a copy of the
+           old thread-per-request rating endpoint
+  async  - while `--inflight` requests are held open on /api/pack/{id}/ups-rate
+
+The worker threadpool is shrunk to `--threadpool` threads (Starlette's
+default is 40) so the difference shows with a modest number of requests.
+Requests authenticate with a real login token (on a throwaway SQLite file);
+pack and OES reads are stubbed, so no SQL Server or UPS credentials are
+needed. Exits non-zero if scan p99 under async rating load is more than
+`--max-p99-increase-ms` above the idle p99.
+
+Async rating takes no worker thread - auth runs on the event loop
+(require_supervisor_async), pack / OES reads and cache writes on the DB
+executor - so the remaining difference is CPU / GIL contention: the fake UPS
+server runs in this process. Measured on a 1-CPU box over 5 runs: idle p99
+17-64 ms, async p99 27-71 ms, at most +38 ms apart (the sync endpoint adds
+0.4-2.5 s); hence the 50 ms default. A larger increase means something is
+blocking the loop or taking pool threads again.
+Usage: python -m backend.scripts.load_ups_rate [--inflight 20] [--seconds 6] [--latency-ms 1500]
+                                               [--scan-ms 5] [--scanners 4] [--threadpool 16]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+SHIP_FROM_ENV = {
+    "UPS_SHIP_FROM_NAME": "Load Test Shipper",
+    "UPS_SHIP_FROM_ADDRESS1": "1 Example Rd",
+    "UPS_SHIP_FROM_CITY": "Windsor",
+    "UPS_SHIP_FROM_PROVINCE": "ON",
+    "UPS_SHIP_FROM_POSTAL_CODE": "N9A6J3",
+    "UPS_SHIP_FROM_COUNTRY": "CA",
+}
+LOAD_PASSWORD = "load-test-pw"
+SHIP_TO = {
+    "ship_name": "ACME Site Office", "ship_address1": "200 Jobsite Ave", "ship_address2": None,
+    "ship_city": "Buffalo", "ship_province": "NY", "ship_postal_code": "14201", "ship_country": "US",
+}
+
+
+def pct(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def build_app(scan_ms: float):
+    """The app with pack and OES reads stubbed, plus the old sync rating endpoint for comparison."""
+    from fastapi import Depends
+
+    from backend.api import packs
+    from backend.deps import require_supervisor
+    from backend.main import app
+    from backend.services import pack_view, ups_service
+
+    def fake_assign_one(db, pack_id, order_line_id, box_id):
+        time.sleep(scan_ms / 1000)  # stands in for the scan's queries
+
+    def fake_rate_inputs(pack_id):
+        time.sleep(0.005)  # pack + OES reads
+        boxes = [{"box_no": 1, "custom_l_in": 24, "custom_w_in": 12, "custom_h_in": 8, "weight_lbs": 15 + pack_id % 20}]
+        return boxes, SHIP_TO, "Ground", ups_service.ship_from_address()
+
+    # One line per request would swamp the report
+    for name in ("httpx", "backend.carrier", "urllib3.connectionpool"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    pack_view.assign_one = fake_assign_one
+    packs._completed_pack_rate_inputs = fake_rate_inputs
+
+    def sync_ups_rate(pack_id: int, current_user=Depends(require_supervisor)):
+        # What /ups-rate did before it was async: sync auth, and a worker thread held for the whole UPS call
+        from backend.core.config import get_settings
+
+        settings = get_settings()
+        boxes, ship_to, service_level, ship_from = packs._completed_pack_rate_inputs(pack_id)
+        return ups_service.get_ups_rate(pack_id, boxes, ship_to, service_level, settings.UPS_ACCOUNT_NUMBER,
+                                        ship_from, use_production=settings.UPS_USE_PRODUCTION, use_cache=False)
+
+    app.add_api_route("/loadtest/sync-ups-rate/{pack_id}", sync_ups_rate, methods=["POST"])
+    return app
+
+
+async def run_phase(client, mode: str, args) -> dict:
+    rate_url = {
+        "sync": "/loadtest/sync-ups-rate/{}",
+        "async": "/api/pack/{}/ups-rate?refresh=true",
+    }.get(mode)
+    stop = asyncio.Event()
+    scan_ms, rate_ms, rate_errors = [], [], []
+
+    async def rater(n: int):
+        pack_id = n
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.post(rate_url.format(pack_id))
+            if response.status_code != 200:
+                rate_errors.append(response.status_code)
+            rate_ms.append((time.perf_counter() - start) * 1000)
+            pack_id += args.inflight
+
+    async def scanner():
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.post("/api/pack/1/assign-one", json={"order_line_id": 1, "box_id": 1})
+            response.raise_for_status()
+            scan_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    raters = [asyncio.create_task(rater(n)) for n in range(1, args.inflight + 1)] if rate_url else []
+    if raters:
+        await asyncio.sleep(0.5)  # let the rating requests get in flight first
+    scanners = [asyncio.create_task(scanner()) for _ in range(args.scanners)]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*scanners, *raters)
+    return {"scan": scan_ms, "rate": rate_ms, "rate_errors": rate_errors}
+
+
+async def main(args) -> int:
+    import anyio.to_thread
+    import httpx
+
+    app = build_app(args.scan_ms)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+
+    failed = False
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                 timeout=120) as client:
+        login = await client.post("/api/auth/login", json={"username": "loadtest", "password": LOAD_PASSWORD})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        # Warm up: OAuth token, lazy imports, first connections
+        warmup = await client.post("/api/pack/1/ups-rate?refresh=true")
+        if warmup.status_code != 200:
+            print(f"rating warm-up failed: {warmup.status_code} {warmup.text}")
+            return 1
+        results = {}
+        for mode in ("idle", "sync", "async"):
+            results[mode] = await run_phase(client, mode, args)
+            scan = results[mode]["scan"]
+            rate = results[mode]["rate"]
+            line = (f"{mode:<6} scans {len(scan):>5}  p50 {statistics.median(scan):7.1f} ms  "
+                    f"p99 {pct(scan, 0.99):7.1f} ms  max {max(scan):7.1f} ms")
+            if rate:
+                line += (f" | {args.inflight} rating in flight: {len(rate)} done, "
+                         f"p50 {statistics.median(rate):7.1f} ms, {len(results[mode]['rate_errors'])} errors")
+            print(line)
+        from backend.services.carrier_http import async_carrier_http
+        await async_carrier_http.aclose()
+
+    idle_p99 = pct(results["idle"]["scan"], 0.99)
+    async_p99 = pct(results["async"]["scan"], 0.99)
+    ok = async_p99 <= idle_p99 + args.max_p99_increase_ms
+    print(f"  [{'ok' if ok else 'FAIL'}] scan p99 with async rating load {async_p99:.1f} ms "
+          f"(idle {idle_p99:.1f} ms, allowed +{args.max_p99_increase_ms:.0f} ms)")
+    failed = failed or not ok
+    if results["async"]["rate_errors"]:
+        print(f"  [FAIL] {len(results['async']['rate_errors'])} async rating requests failed")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inflight", type=int, default=20, help="Rating requests kept in flight")
+    parser.add_argument("--seconds", type=float, default=6, help="Length of each phase")
+    parser.add_argument("--latency-ms", type=float, default=1500, help="Fake UPS rating latency")
+    parser.add_argument("--scan-ms", type=float, default=5, help="Simulated DB time per scan")
+    parser.add_argument("--scanners", type=int, default=4, help="Concurrent scanning stations")
+    parser.add_argument("--threadpool", type=int, default=16, help="Worker threads for sync endpoints")
+    parser.add_argument("--max-p99-increase-ms", type=float, default=50,
+                        help="Allowed scan p99 increase under async load (the sync endpoint adds seconds)")
+    args = parser.parse_args()
+
+    from backend.scripts.fake_ups_server import start_server
+
+    server = start_server([
+        "--port", "0", "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.latency_ms / 10),
+        "--token-latency-ms", "100", "--seed", "1",
+    ])
+
+    # Settings are read at import time, so everything is pointed at the fake before importing the app
+    db_file = Path(tempfile.mkdtemp(prefix="load_ups_rate_")) / "app.db"
+    os.environ.update({
+        "UPS_BASE_URL": server.base_url,
+        "UPS_CLIENT_ID": "load-client",
+        "UPS_CLIENT_SECRET": "load-secret",
+        "UPS_ACCOUNT_NUMBER": "LOAD01",
+        "UPS_RATE_CACHE_TTL_SECONDS": "0",
+        "UPS_RATE_LIMIT_PER_SECOND": "0",  # measure the endpoint, not the pacing
+        "APP_DATABASE_URL": f"sqlite:///{db_file}",
+        "OES_DATABASE_URL": "sqlite://",
+        **SHIP_FROM_ENV,
+    })
+
+    from backend.core.config import get_settings
+    get_settings.cache_clear()
+
+    from backend.core.auth import hash_password
+    from backend.db.models import RateQuoteCache, Role, ShipmentQuote, User
+    from backend.db.session import AppBase, AppSessionLocal, app_engine
+    AppBase.metadata.create_all(bind=app_engine, tables=[
+        User.__table__, RateQuoteCache.__table__, ShipmentQuote.__table__,
+    ])
+    with AppSessionLocal() as db:
+        db.add(User(username="loadtest", password_hash=hash_password(LOAD_PASSWORD), role=Role.supervisor, active=1))
+        db.commit()
+
+    print(f"fake UPS at {server.base_url}: rating {args.latency_ms:.0f}ms; {args.inflight} rating requests in flight, "
+          f"{args.scanners} scanners, threadpool {args.threadpool}")
+    code = asyncio.run(main(args))
+    server.shutdown()
+    sys.exit(code)
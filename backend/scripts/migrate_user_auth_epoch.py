@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+One-off migration: add the `auth_epoch` column to the existing `user` table.
+
+The user table is managed by hand (startup create_all only creates missing
+tables, it never alters one), and every query of User selects auth_epoch, so
+run this once against an existing install before starting the new backend.
+Safe to run again: it does nothing if the column is already there.
+Usage: python -m backend.scripts.migrate_user_auth_epoch [--print-sql]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import inspect, text
+
+from backend.db.session import app_engine
+
+# The same statement for running by hand (SQL Server)
+MSSQL_SQL = "ALTER TABLE [user] ADD auth_epoch INT NOT NULL CONSTRAINT DF_user_auth_epoch DEFAULT 0"
+GENERIC_SQL = 'ALTER TABLE "user" ADD COLUMN auth_epoch INTEGER NOT NULL DEFAULT 0'
+
+
+def alter_sql(dialect_name: str) -> str:
+    return MSSQL_SQL if dialect_name == "mssql" else GENERIC_SQL
+
+
+def migrate() -> bool:
+    """Add user.auth_epoch if missing; True if the column exists afterwards."""
+    columns = {c["name"] for c in inspect(app_engine).get_columns("user")}
+    if "auth_epoch" in columns:
+        print("user.auth_epoch already exists, nothing to do")
+        return True
+
+    sql = alter_sql(app_engine.dialect.name)
+    try:
+        with app_engine.begin() as conn:
+            conn.execute(text(sql))
+    except Exception as e:
+        print(f"Error adding user.auth_epoch: {e}")
+        return False
+    print(f"Added user.auth_epoch: {sql}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--print-sql", action="store_true", help="Only print the ALTER statement for this database")
+    args = parser.parse_args()
+
+    if args.print_sql:
+        print(alter_sql(app_engine.dialect.name))
+        sys.exit(0)
+    sys.exit(0 if migrate() else 1)
@@ -0,0 +1,108 @@
+"""
+In-memory copy of every user's auth epoch, for authorizing from token claims.
+
+Access tokens carry the user's `auth_epoch` (see api/auth.login). Changing a
+user's role, name, password or active flag bumps the epoch, which revokes the
+tokens issued before. The registry keeps {user id: (epoch, active)} for the
+whole (small) user table, reloads it on a background thread every
+AUTH_EPOCH_REFRESH_SECONDS - so changes made by another worker process take
+effect within that interval - and is updated immediately by this process's
+own user management endpoints.
+"""
+from __future__ import annotations
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from backend.core.config import get_settings
+from backend.db.models import User
+from backend.db.session import AppSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class AuthEpochRegistry:
+    def __init__(self, refresh_seconds: float = 30):
+        self.refresh_seconds = refresh_seconds
+        self._epochs: Dict[int, Tuple[int, int]] = {}  # user id -> (auth_epoch, active)
+        self._last_refreshed: Optional[datetime] = None
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        """Reload every user's epoch; on failure the previous map is kept."""
+        with self._refresh_lock:
+            try:
+                with AppSessionLocal() as db:
+                    rows = db.execute(select(User.id, User.auth_epoch, User.active)).all()
+            except Exception as e:
+                logger.warning(f"Auth epoch refresh failed, keeping previous map: {e}")
+                with self._lock:
+                    self._last_error = str(e)
+                return
+            with self._lock:
+                epochs = {r.id: (r.auth_epoch or 0, r.active) for r in rows}
+                # A bump published by set() while the query ran is newer than the rows read
+                for user_id, entry in epochs.items():
+                    current = self._epochs.get(user_id)
+                    if current is not None and current[0] > entry[0]:
+                        epochs[user_id] = current
+                self._epochs = epochs
+                self._last_refreshed = datetime.utcnow()
+                self._last_error = None
+
+    def lookup(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """(auth_epoch, active) of a user, or None if unknown (never loaded, or created since)."""
+        with self._lock:
+            return self._epochs.get(user_id)
+
+    def set(self, user_id: int, auth_epoch: Optional[int], active: int) -> None:
+        """Publish a user's epoch; ignored if an epoch newer than this one is already known."""
+        with self._lock:
+            current = self._epochs.get(user_id)
+            if current is not None and current[0] > (auth_epoch or 0):
+                return  # read before a revocation that has since been published
+            self._epochs[user_id] = (auth_epoch or 0, active)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._epochs.pop(user_id, None)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "users": len(self._epochs),
+                "last_refreshed": self._last_refreshed,
+                "refresh_seconds": self.refresh_seconds,
+                "last_error": self._last_error,
+                "background_refresh": self._thread is not None and self._thread.is_alive(),
+            }
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Auth epoch refresh crashed")
+            if self._stop.wait(self.refresh_seconds):
+                break
+
+    def start(self) -> None:
+        """Start the background refresh thread (first refresh happens immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="auth-epochs", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+auth_epochs = AuthEpochRegistry(refresh_seconds=get_settings().AUTH_EPOCH_REFRESH_SECONDS)
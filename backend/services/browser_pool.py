@@ -0,0 +1,126 @@
+"""
+Pool of headless Chromium browsers for HTML -> PDF rendering.
+
+Launching Chromium costs far more than printing a page, so browsers are
+started once and reused. Playwright's sync API is bound to the thread that
+started it, so every browser lives on its own worker thread and render jobs
+are handed over a queue. Callers wait at most BROWSER_RENDER_TIMEOUT_SECONDS
+(BrowserRenderTimeout), and the same limit is Playwright's page timeout, so
+a hung page frees its worker too.
+"""
+from __future__ import annotations
+import logging
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+from backend.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserRenderTimeout(TimeoutError):
+    """An HTML -> PDF render did not finish in time."""
+
+
+class BrowserPool:
+    """Fixed number of Chromium workers; `render_pdf` blocks until a worker is free."""
+
+    def __init__(self, size: int = 2, timeout_seconds: float = 60):
+        self.size = max(1, size)
+        self.timeout_seconds = timeout_seconds
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                t = threading.Thread(target=self._worker, name=f"browser-pool-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _fail_jobs(self, error: Exception) -> None:
+        """Worker could not start a browser: fail its jobs instead of leaving callers waiting."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future = job[2]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _worker(self) -> None:
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError as e:
+            logger.error("Browser pool: playwright is not installed")
+            self._fail_jobs(RuntimeError(f"Playwright not installed: {e}"))
+            return
+
+        try:
+            self._serve(sync_playwright)
+        except Exception as e:
+            logger.exception("Browser pool: worker could not launch Chromium")
+            self._fail_jobs(e)
+
+    def _serve(self, sync_playwright) -> None:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                while True:
+                    job = self._jobs.get()
+                    if job is None:
+                        break
+                    html, pdf_options, future = job
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    # Relaunch if Chromium died under us
+                    if not browser.is_connected():
+                        logger.warning("Browser pool: Chromium disconnected, relaunching")
+                        browser = p.chromium.launch(headless=True)
+
+                    try:
+                        page = browser.new_page()
+                        try:
+                            page.set_default_timeout(self.timeout_seconds * 1000)
+                            page.set_content(html, wait_until='networkidle')
+                            future.set_result(page.pdf(**pdf_options))
+                        finally:
+                            page.close()
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                browser.close()
+
+    def render_pdf(self, html: str, pdf_options: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> bytes:
+        """
+        Render HTML to PDF bytes on a pooled browser.
+        Raises BrowserRenderTimeout after `timeout` (default: the pool's timeout_seconds).
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._jobs.put((html, dict(pdf_options or {}), future))
+        timeout = self.timeout_seconds if timeout is None else timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()  # still queued: the worker skips it
+            raise BrowserRenderTimeout(f"PDF render did not finish within {timeout:g}s")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for _ in self._threads:
+                self._jobs.put(None)
+            self._threads = []
+
+
+browser_pool = BrowserPool(
+    size=get_settings().BROWSER_POOL_SIZE,
+    timeout_seconds=get_settings().BROWSER_RENDER_TIMEOUT_SECONDS,
+)
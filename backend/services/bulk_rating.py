@@ -0,0 +1,174 @@
+"""
+Bulk UPS rating of completed packs.
+
+Shipment inputs for the whole batch come from three queries
+(pack_view.get_rate_inputs_batch) rather than a snapshot and OES read per
+pack. The quotes then run concurrently on ups_service's rating pool, paced
+by its token bucket, so a busy afternoon is rated in seconds without
+tripping UPS's rate limit. Every run is stored as a RateBatch with one
+RateBatchResult row per pack.
+"""
+from __future__ import annotations
+import logging
+import time
+from concurrent.futures import as_completed
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.core.config import get_settings
+from backend.db.models import RateBatch, RateBatchResult
+from backend.services import pack_view, ups_service
+
+logger = logging.getLogger(__name__)
+
+
+def _money(value: Optional[float]) -> Optional[Decimal]:
+    return Decimal(str(value)).quantize(Decimal("0.01")) if value is not None else None
+
+
+def _rate_one(pack_id: int, inputs: Dict[str, Any], ship_from: Dict[str, Any],
+              use_production: bool, use_cache: bool) -> Dict[str, Any]:
+    """Quote one pack at its OES service level; errors become the row's `error`."""
+    settings = get_settings()
+    row: Dict[str, Any] = {
+        "pack_id": pack_id,
+        "order_no": inputs["order_no"],
+        "service_code": None,
+        "service": None,
+        "box_count": len(inputs["boxes"]),
+    }
+    try:
+        destination_country, origin_country = ups_service.shipment_countries(inputs["ship_to_address"], ship_from)
+        code, description = ups_service.map_service_level_to_ups_code(
+            inputs["service_level"], destination_country, origin_country
+        )
+        row["service_code"], row["service"] = code, description
+        payload = ups_service.build_rate_payload(
+            pack_id, inputs["boxes"], inputs["ship_to_address"], ship_from,
+            settings.UPS_ACCOUNT_NUMBER, code, description,
+        )
+        rate_response = ups_service.rate_with_cache(payload, pack_id, use_production, use_cache)
+    except Exception as e:
+        row["error"] = str(e)
+        return row
+    summary = ups_service.summarize_rate_response(rate_response)
+    row.update({
+        "total_charge": summary["total_charge"],
+        "negotiated_charge": summary["negotiated_charge"],
+        "currency": summary["currency"],
+        "cache_hit": bool((rate_response.get("cache") or {}).get("hit")),
+        "error": None,
+    })
+    return row
+
+
+def rate_packs(db: Session, pack_ids: List[int], completion_date: Optional[date] = None,
+               user_id: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Rate many completed packs at their OES service level and store the run.
+
+    Returns:
+        dict: the stored batch (see batch_dict), rows in pack_ids order
+
+    Raises:
+        ValueError: If UPS is not configured
+    """
+    settings = get_settings()
+    if not settings.UPS_CLIENT_ID or not settings.UPS_CLIENT_SECRET:
+        raise ValueError("UPS API credentials not configured")
+    if not settings.UPS_ACCOUNT_NUMBER:
+        raise ValueError("UPS account number not configured")
+
+    start = time.perf_counter()
+    inputs = pack_view.get_rate_inputs_batch(pack_ids)
+    ship_from = ups_service.ship_from_address()
+
+    rows: Dict[int, Dict[str, Any]] = {
+        pid: {"pack_id": pid, "order_no": None, "box_count": 0, "error": "Pack or its OES order not found"}
+        for pid in pack_ids if pid not in inputs
+    }
+    futures = [
+        ups_service.rate_executor.submit(
+            _rate_one, pid, pack_inputs, ship_from, settings.UPS_USE_PRODUCTION, use_cache
+        )
+        for pid, pack_inputs in inputs.items()
+    ]
+    for future in as_completed(futures):
+        row = future.result()
+        rows[row["pack_id"]] = row
+    elapsed_ms = round((time.perf_counter() - start) * 1000)
+
+    results = [
+        RateBatchResult(
+            pack_id=pid,
+            order_no=rows[pid].get("order_no"),
+            service_code=rows[pid].get("service_code"),
+            service=rows[pid].get("service"),
+            box_count=rows[pid].get("box_count") or 0,
+            total_charge=_money(rows[pid].get("total_charge")),
+            negotiated_charge=_money(rows[pid].get("negotiated_charge")),
+            currency=rows[pid].get("currency"),
+            cache_hit=bool(rows[pid].get("cache_hit")),
+            error=(rows[pid].get("error") or "")[:1000] or None,
+        )
+        for pid in pack_ids
+    ]
+    rated = [r for r in results if r.error is None]
+    charges = [r.negotiated_charge if r.negotiated_charge is not None else r.total_charge for r in rated]
+    batch = RateBatch(
+        completion_date=completion_date,
+        pack_count=len(results),
+        rated_count=len(rated),
+        failed_count=len(results) - len(rated),
+        total_charge=sum((c for c in charges if c is not None), Decimal("0.00")),
+        elapsed_ms=elapsed_ms,
+        created_by=user_id,
+    )
+    db.add(batch)
+    db.flush()
+    for r in results:
+        r.batch_id = batch.id
+    db.add_all(results)
+    db.commit()
+    logger.info(f"Rated {batch.rated_count}/{batch.pack_count} packs in {elapsed_ms}ms (batch {batch.id})")
+    return batch_dict(db, batch)
+
+
+def batch_dict(db: Session, batch: RateBatch) -> Dict[str, Any]:
+    results = db.execute(
+        select(RateBatchResult).where(RateBatchResult.batch_id == batch.id).order_by(RateBatchResult.id)
+    ).scalars().all()
+    return {
+        "batch_id": batch.id,
+        "completion_date": batch.completion_date.isoformat() if batch.completion_date else None,
+        "pack_count": batch.pack_count,
+        "rated_count": batch.rated_count,
+        "failed_count": batch.failed_count,
+        "total_charge": float(batch.total_charge) if batch.total_charge is not None else None,
+        "elapsed_ms": batch.elapsed_ms,
+        "created_at": batch.created_at,
+        "rows": [
+            {
+                "pack_id": r.pack_id,
+                "order_no": r.order_no,
+                "service_code": r.service_code,
+                "service": r.service,
+                "box_count": r.box_count,
+                "total_charge": float(r.total_charge) if r.total_charge is not None else None,
+                "negotiated_charge": float(r.negotiated_charge) if r.negotiated_charge is not None else None,
+                "currency": r.currency,
+                "cache_hit": r.cache_hit,
+                "error": r.error,
+            }
+            for r in results
+        ],
+    }
+
+
+def get_batch(db: Session, batch_id: int) -> Optional[Dict[str, Any]]:
+    batch = db.get(RateBatch, batch_id)
+    return batch_dict(db, batch) if batch is not None else None
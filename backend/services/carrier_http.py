@@ -0,0 +1,315 @@
+"""
+Shared HTTP client for carrier APIs (UPS).
+
+One `requests.Session` with a pooled, keep-alive connection adapter, so
+repeat calls skip the TCP/TLS handshake. Every call gets explicit
+connect/read timeouts and is retried with exponential backoff on connection
+errors, 429 and 5xx (honouring Retry-After). Latency, status and retry counts
+are recorded per endpoint for /api/metrics. `TokenBucket` paces bulk callers
+so a batch stays under the carrier's request rate instead of tripping 429s.
+`async_carrier_http` offers the same over httpx for async endpoints.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Samples kept per endpoint for the latency percentiles
+LATENCY_WINDOW = 500
+
+
+class CallStats:
+    """Rolling latency / outcome statistics for one endpoint."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: Dict[str, int] = {}
+        self.samples: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.max_ms = 0.0
+        self.last_ms: Optional[float] = None
+
+    def record(self, elapsed_ms: float, status: Optional[int], retries: int) -> None:
+        self.calls += 1
+        self.retries += retries
+        key = str(status) if status is not None else "error"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+        self.samples.append(elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_ms = elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+        }
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second with bursts of up to
+    `burst`. acquire() blocks until a token is free (acquire_async() awaits
+    instead, for async endpoints); pause() stops handing out
+    tokens for a while (e.g. after a 429 with Retry-After). rate <= 0 disables.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    def _take(self, start: float) -> float:
+        """Take a token if one is free (returns 0.0), else the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now >= self._paused_until and self._tokens >= 1:
+                self._tokens -= 1
+                waited = now - start
+                if waited > 0.001:
+                    self.waited_seconds += waited
+                    self.throttled += 1
+                return 0.0
+            return max(self._paused_until - now, (1 - self._tokens) / self.rate)
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        start = time.monotonic()
+        while True:
+            delay = self._take(start)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """acquire() for coroutines: waits on the event loop, not a thread."""
+        if self.rate <= 0:
+            return
+        start = time.monotonic()
+        while True:
+            delay = self._take(start)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 2),
+            }
+
+
+class CarrierHttpClient:
+    def __init__(self):
+        self._session: Optional[requests.Session] = None
+        self._stats: Dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self) -> requests.Session:
+        settings = get_settings()
+        retry = Retry(
+            total=settings.CARRIER_HTTP_RETRIES,
+            connect=settings.CARRIER_HTTP_RETRIES,
+            read=0,  # a read timeout may mean UPS is still working; don't pile on
+            status=settings.CARRIER_HTTP_RETRIES,
+            backoff_factor=settings.CARRIER_HTTP_BACKOFF_SECONDS,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # rating and token requests are safe to repeat
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand the last response back; callers raise_for_status()
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=settings.CARRIER_HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def request(self, method: str, url: str, metric: str, **kwargs) -> requests.Response:
+        """
+        Send a request on the shared session.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            metric: Name the call is recorded under (e.g. "ups.rate")
+            **kwargs: Passed to requests (json, data, headers, ...); `timeout`
+                defaults to (CARRIER_HTTP_CONNECT_TIMEOUT, CARRIER_HTTP_READ_TIMEOUT)
+
+        Raises:
+            requests.exceptions.RequestException: connection failure / timeout
+                after retries (HTTP error statuses are returned, not raised)
+        """
+        settings = get_settings()
+        kwargs.setdefault("timeout", (settings.CARRIER_HTTP_CONNECT_TIMEOUT, settings.CARRIER_HTTP_READ_TIMEOUT))
+        start = time.perf_counter()
+        status: Optional[int] = None
+        retries = 0
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            history = getattr(getattr(response.raw, "retries", None), "history", None)
+            retries = len(history) if history else 0
+            return response
+        finally:
+            self.record(metric, method, url, start, status, retries)
+
+    def record(self, metric: str, method: str, url: str, start: float, status: Optional[int], retries: int) -> None:
+        """Add a finished call (started at perf_counter() `start`) to the endpoint's stats."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats.setdefault(metric, CallStats()).record(elapsed_ms, status, retries)
+        logger.debug(f"{metric} {method} {url} -> {status} in {elapsed_ms:.0f}ms ({retries} retries)")
+
+    def post(self, url: str, metric: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, metric, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in sorted(self._stats.items())}
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+
+class AsyncCarrierHttpClient:
+    """
+    The async counterpart of CarrierHttpClient, for endpoints that await
+    carrier calls instead of holding a worker thread: one pooled
+    httpx.AsyncClient with the same timeouts and retry policy, recording into
+    the same per-endpoint stats. httpx is only needed once it is used.
+    """
+
+    def __init__(self, stats: CarrierHttpClient):
+        self._client = None
+        self._stats = stats
+
+    def _build_client(self):
+        import httpx
+
+        settings = get_settings()
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.CARRIER_HTTP_READ_TIMEOUT, connect=settings.CARRIER_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.CARRIER_HTTP_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CARRIER_HTTP_POOL_SIZE,
+            ),
+            # Connection failures only; status retries are handled in request()
+            transport=httpx.AsyncHTTPTransport(retries=settings.CARRIER_HTTP_RETRIES),
+        )
+
+    @property
+    def client(self):
+        # Only touched from the event loop thread, so no lock is needed
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    async def request(self, method: str, url: str, metric: str, **kwargs):
+        """
+        Send a request on the shared async client.
+
+        429 and 5xx responses are retried up to CARRIER_HTTP_RETRIES times with
+        exponential backoff (or Retry-After); the last response is returned.
+
+        Raises:
+            httpx.HTTPError: connection failure / timeout
+        """
+        settings = get_settings()
+        start = time.perf_counter()
+        status: Optional[int] = None
+        retries = 0
+        try:
+            while True:
+                response = await self.client.request(method, url, **kwargs)
+                status = response.status_code
+                if status not in RETRY_STATUSES or retries >= settings.CARRIER_HTTP_RETRIES:
+                    return response
+                try:
+                    delay = float(response.headers.get("Retry-After"))
+                except (TypeError, ValueError):
+                    delay = settings.CARRIER_HTTP_BACKOFF_SECONDS * 2 ** retries
+                await response.aclose()
+                retries += 1
+                await asyncio.sleep(delay)
+        finally:
+            self._stats.record(metric, method, url, start, status, retries)
+
+    async def post(self, url: str, metric: str, **kwargs):
+        return await self.request("POST", url, metric, **kwargs)
+
+    def open(self) -> None:
+        """Build the client now (called at startup): loading the TLS context takes ~100 ms,
+        which would otherwise stall the event loop on the first carrier call."""
+        if self._client is None:
+            self._client = self._build_client()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+carrier_http = CarrierHttpClient()
+async_carrier_http = AsyncCarrierHttpClient(carrier_http)
@@ -0,0 +1,155 @@
+"""
+Structured, low-cost logging for carrier API calls.
+
+Every call logs one compact line (carrier operation, pack, service, package
+count, status, latency) through the "backend.carrier" logger. Full request /
+response bodies are never logged at INFO: with capture switched on
+(CARRIER_DEBUG_CAPTURE, or at runtime via /api/carrier-debug) they are
+redacted - names, address lines, phone numbers, e-mail, account numbers,
+postal codes cut to the prefix - and kept in a size-capped in-memory ring
+buffer. Nothing is serialized or copied unless capture or DEBUG logging is on.
+"""
+from __future__ import annotations
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.core.config import get_settings
+
+logger = logging.getLogger("backend.carrier")
+
+# Keys whose values are replaced outright / partially kept
+_REDACT_KEYS = {
+    "name", "attentionname", "addressline", "phone", "number", "emailaddress",
+    "email", "taxidentificationnumber", "authorization", "access_token",
+}
+_MASK_KEYS = {"accountnumber", "shippernumber", "postalcode"}
+
+
+def _mask(value: Any) -> str:
+    text = str(value or "")
+    return text[:3] + "***" if len(text) > 3 else "***"
+
+
+def redact(obj: Any) -> Any:
+    """Copy of a carrier payload with personal and account data removed."""
+    if isinstance(obj, dict):
+        out = {}
+        for key, value in obj.items():
+            k = key.lower()
+            if k in _REDACT_KEYS and not isinstance(value, dict):
+                out[key] = "[REDACTED]"
+            elif k in _MASK_KEYS and not isinstance(value, (dict, list)):
+                out[key] = _mask(value)
+            else:
+                out[key] = redact(value)
+        return out
+    if isinstance(obj, list):
+        return [redact(v) for v in obj]
+    return obj
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    text = str(value)
+    return f'"{text}"' if " " in text else text
+
+
+class DebugSink:
+    """Ring buffer of redacted carrier exchanges, off unless switched on."""
+
+    def __init__(self, max_entries: int, max_entry_bytes: int, enabled: bool = False):
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self.max_entry_bytes = max_entry_bytes
+        self._enabled = enabled
+        self._until: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled and self._until is not None and datetime.utcnow() >= self._until:
+            self._enabled, self._until = False, None
+        return self._enabled
+
+    def enable(self, minutes: Optional[float] = None) -> None:
+        """Start capturing; stops by itself after `minutes` if given."""
+        with self._lock:
+            self._enabled = True
+            self._until = datetime.utcnow() + timedelta(minutes=minutes) if minutes else None
+
+    def disable(self) -> None:
+        with self._lock:
+            self._enabled, self._until = False, None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _clip(self, body: Any) -> Any:
+        blob = json.dumps(body, default=str, separators=(",", ":"))
+        if len(blob) <= self.max_entry_bytes:
+            return body
+        return {"truncated": True, "bytes": len(blob), "head": blob[:self.max_entry_bytes]}
+
+    def record(self, summary: Dict[str, Any], request: Any = None, response: Any = None) -> None:
+        entry = dict(summary)
+        entry["at"] = datetime.utcnow().isoformat()
+        entry["request"] = self._clip(redact(request)) if request is not None else None
+        entry["response"] = self._clip(redact(response)) if response is not None else None
+        with self._lock:
+            self._entries.append(entry)
+
+    def state(self) -> Dict[str, Any]:
+        enabled = self.enabled
+        with self._lock:
+            return {
+                "enabled": enabled,
+                "until": self._until.isoformat() if self._until else None,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxlen,
+                "max_entry_bytes": self.max_entry_bytes,
+            }
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Captured exchanges, newest first."""
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit else items
+
+
+debug_sink = DebugSink(
+    max_entries=get_settings().CARRIER_DEBUG_BUFFER_SIZE,
+    max_entry_bytes=get_settings().CARRIER_DEBUG_MAX_ENTRY_BYTES,
+    enabled=get_settings().CARRIER_DEBUG_CAPTURE,
+)
+
+
+def log_call(operation: str, started: float, status: Optional[int], level: int = logging.INFO,
+             request: Any = None, response: Any = None, **fields: Any) -> None:
+    """
+    Log one carrier call as a single key=value line and, if capture is on,
+    keep its redacted request / response in the debug sink.
+
+    Args:
+        operation: e.g. "ups.rate"
+        started: time.perf_counter() taken before the call
+        status: HTTP status (None if the call never got a response)
+        request / response: full bodies; only touched when capture or DEBUG is on
+        **fields: summary fields (pack_id, service, packages, error, ...)
+    """
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    summary = {"op": operation, **{k: v for k, v in fields.items() if v is not None},
+               "status": status, "ms": round(elapsed_ms, 1)}
+    if logger.isEnabledFor(level):
+        logger.log(level, " ".join(f"{k}={_fmt(v)}" for k, v in summary.items()), extra={"carrier": summary})
+    if debug_sink.enabled:
+        debug_sink.record(summary, request, response)
+    if logger.isEnabledFor(logging.DEBUG) and (request is not None or response is not None):
+        logger.debug(f"{operation} request={json.dumps(redact(request), default=str)} "
+                     f"response={json.dumps(redact(response), default=str)}")
@@ -0,0 +1,235 @@
+"""
+CUPS job submission for Linux print queues.
+
+Documents (PDF from the browser pool, raw ZPL, PostScript) are handed to
+CUPS either with `lp` reading the job from stdin - no shell, no temp file -
+or as an IPP Print-Job request straight to the CUPS server
+(CUPS_SUBMIT_METHOD). Both return the CUPS job id so it can be stored with
+the print job. The small IPP encoder/decoder here is also used by
+scripts/fake_cups.py.
+"""
+from __future__ import annotations
+import getpass
+import http.client
+import itertools
+import re
+import struct
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from backend.core.config import get_settings
+
+SUBMIT_METHODS = ("lp", "ipp")
+
+PDF = "application/pdf"
+POSTSCRIPT = "application/postscript"
+RAW = "application/vnd.cups-raw"
+
+# IPP operations / tags (RFC 8011, RFC 8010)
+OP_PRINT_JOB = 0x0002
+OP_CREATE_JOB = 0x0005
+OP_SEND_DOCUMENT = 0x0006
+OP_GET_JOBS = 0x000A
+OP_GET_PRINTER_ATTRIBUTES = 0x000B
+OP_CUPS_GET_DEFAULT = 0x4001
+OP_CUPS_GET_PRINTERS = 0x4002
+
+TAG_OPERATION = 0x01
+TAG_JOB = 0x02
+TAG_END = 0x03
+TAG_PRINTER = 0x04
+TAG_UNSUPPORTED = 0x05
+
+TAG_INTEGER = 0x21
+TAG_BOOLEAN = 0x22
+TAG_ENUM = 0x23
+TAG_TEXT = 0x41
+TAG_NAME = 0x42
+TAG_KEYWORD = 0x44
+TAG_URI = 0x45
+TAG_CHARSET = 0x47
+TAG_LANGUAGE = 0x48
+TAG_MIME = 0x49
+
+STATUS_OK = 0x0000
+
+_request_ids = itertools.count(1)
+
+Attribute = Tuple[int, str, Any]  # (value tag, name, value or list of values)
+
+
+class CupsError(Exception):
+    """CUPS refused the job or could not be reached."""
+
+
+# ---------------------------------------------------------------------
+# IPP wire format
+# ---------------------------------------------------------------------
+def _encode_value(tag: int, value: Any) -> bytes:
+    if tag in (TAG_INTEGER, TAG_ENUM):
+        return struct.pack(">i", int(value))
+    if tag == TAG_BOOLEAN:
+        return b"\x01" if value else b"\x00"
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+def encode_ipp(code: int, request_id: int, groups: List[Tuple[int, List[Attribute]]],
+               data: bytes = b"", version: Tuple[int, int] = (2, 0)) -> bytes:
+    """Build an IPP message; `code` is the operation id (request) or status code (response)."""
+    out = bytearray(struct.pack(">BBHI", version[0], version[1], code, request_id))
+    for group_tag, attributes in groups:
+        out.append(group_tag)
+        for tag, name, value in attributes:
+            values = value if isinstance(value, list) else [value]
+            for i, v in enumerate(values):
+                # Additional values of a multi-valued attribute have an empty name
+                raw_name = name.encode("ascii") if i == 0 else b""
+                raw_value = _encode_value(tag, v)
+                out += struct.pack(">BH", tag, len(raw_name)) + raw_name
+                out += struct.pack(">H", len(raw_value)) + raw_value
+    out.append(TAG_END)
+    return bytes(out) + data
+
+
+def _decode_value(tag: int, raw: bytes) -> Any:
+    if tag in (TAG_INTEGER, TAG_ENUM) and len(raw) == 4:
+        return struct.unpack(">i", raw)[0]
+    if tag == TAG_BOOLEAN and len(raw) == 1:
+        return raw != b"\x00"
+    if 0x40 <= tag <= 0x5F:
+        return raw.decode("utf-8", errors="replace")
+    return raw
+
+
+def decode_ipp(body: bytes) -> Dict[str, Any]:
+    """
+    Parse an IPP message.
+
+    Returns:
+        dict: version, code (operation or status), request_id, groups
+            (list of (group tag, {name: value or [values]})) and data
+            (the document following the attributes, if any)
+    """
+    if len(body) < 9:
+        raise CupsError("Truncated IPP message")
+    major, minor, code, request_id = struct.unpack(">BBHI", body[:8])
+    groups: List[Tuple[int, Dict[str, Any]]] = []
+    pos, current, last_name = 8, None, None
+    while pos < len(body):
+        tag = body[pos]
+        pos += 1
+        if tag == TAG_END:
+            break
+        if tag < 0x10:  # delimiter: start of a new attribute group
+            current = {}
+            groups.append((tag, current))
+            continue
+        name_len = struct.unpack(">H", body[pos:pos + 2])[0]
+        name = body[pos + 2:pos + 2 + name_len].decode("ascii", errors="replace")
+        pos += 2 + name_len
+        value_len = struct.unpack(">H", body[pos:pos + 2])[0]
+        value = _decode_value(tag, body[pos + 2:pos + 2 + value_len])
+        pos += 2 + value_len
+        if current is None:
+            current = {}
+            groups.append((TAG_OPERATION, current))
+        if name:
+            current[name] = value
+            last_name = name
+        elif last_name is not None:  # additional value
+            existing = current[last_name]
+            current[last_name] = (existing if isinstance(existing, list) else [existing]) + [value]
+    return {
+        "version": (major, minor),
+        "code": code,
+        "request_id": request_id,
+        "groups": groups,
+        "data": body[pos:],
+    }
+
+
+def find_attribute(message: Dict[str, Any], name: str, group_tag: Optional[int] = None) -> Any:
+    for tag, attributes in message["groups"]:
+        if (group_tag is None or tag == group_tag) and name in attributes:
+            return attributes[name]
+    return None
+
+
+# ---------------------------------------------------------------------
+# Submission
+# ---------------------------------------------------------------------
+def _server() -> Tuple[str, int]:
+    server = get_settings().CUPS_SERVER or "localhost:631"
+    host, _, port = server.partition(":")
+    return host, int(port) if port else 631
+
+
+def submit_ipp(printer_name: str, data: bytes, document_format: str, title: str = "Print job") -> str:
+    """Send the document as one IPP Print-Job request; returns the CUPS job id."""
+    host, port = _server()
+    path = f"/printers/{quote(printer_name, safe='')}"
+    request = encode_ipp(OP_PRINT_JOB, next(_request_ids), [
+        (TAG_OPERATION, [
+            (TAG_CHARSET, "attributes-charset", "utf-8"),
+            (TAG_LANGUAGE, "attributes-natural-language", "en"),
+            (TAG_URI, "printer-uri", f"ipp://{host}:{port}{path}"),
+            (TAG_NAME, "requesting-user-name", getpass.getuser()),
+            (TAG_NAME, "job-name", title[:255]),
+            (TAG_MIME, "document-format", document_format),
+        ]),
+    ], data)
+
+    conn = http.client.HTTPConnection(host, port, timeout=get_settings().CUPS_SUBMIT_TIMEOUT_SECONDS)
+    try:
+        conn.request("POST", path, body=request, headers={"Content-Type": "application/ipp"})
+        response = conn.getresponse()
+        body = response.read()
+    except OSError as e:
+        raise CupsError(f"CUPS server {host}:{port} unreachable: {e}") from e
+    finally:
+        conn.close()
+    if response.status != 200:
+        raise CupsError(f"CUPS server returned HTTP {response.status} for {printer_name}")
+
+    reply = decode_ipp(body)
+    if reply["code"] > 0x00FF:  # successful-ok* status codes are 0x0000-0x00FF
+        message = find_attribute(reply, "status-message") or f"IPP status 0x{reply['code']:04x}"
+        raise CupsError(f"{printer_name} rejected the job: {message}")
+    job_id = find_attribute(reply, "job-id", TAG_JOB)
+    return f"{printer_name}-{job_id}" if job_id is not None else ""
+
+
+def submit_lp(printer_name: str, data: bytes, document_format: str, title: str = "Print job") -> str:
+    """Pipe the document into `lp`; returns the request id it reports (e.g. "Zebra-42")."""
+    settings = get_settings()
+    cmd = ["lp"]
+    if settings.CUPS_SERVER:
+        cmd += ["-h", settings.CUPS_SERVER]
+    cmd += ["-d", printer_name, "-t", title[:255]]
+    if document_format == RAW:
+        cmd += ["-o", "raw"]
+    cmd.append("-")
+
+    try:
+        result = subprocess.run(cmd, input=data, capture_output=True,
+                                timeout=settings.CUPS_SUBMIT_TIMEOUT_SECONDS)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise CupsError(f"lp failed for {printer_name}: {e}") from e
+    if result.returncode != 0:
+        raise CupsError(f"lp failed for {printer_name}: {result.stderr.decode(errors='replace').strip()}")
+
+    match = re.search(r"request id is (\S+)", result.stdout.decode(errors="replace"))
+    return match.group(1) if match else ""
+
+
+def submit(printer_name: str, data: bytes, document_format: str, title: str = "Print job") -> str:
+    """Submit a document to a CUPS queue with the configured method; returns the CUPS job id."""
+    method = get_settings().CUPS_SUBMIT_METHOD
+    if method == "ipp":
+        return submit_ipp(printer_name, data, document_format, title)
+    if method == "lp":
+        return submit_lp(printer_name, data, document_format, title)
+    raise CupsError(f"Unknown CUPS_SUBMIT_METHOD '{method}'. Use one of: {', '.join(SUBMIT_METHODS)}")
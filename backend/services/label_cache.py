@@ -0,0 +1,184 @@
+"""
+Per-box cache of rendered box labels (HTML, ZPL, PDF).
+
+Entries are keyed by (box_id, content hash of the label data, template
+version): identical data rendered with the same template is served from
+memory, while a change to the box, its order header or the template simply
+misses. Pack edits drop the affected boxes explicitly as well.
+
+A lookup by box id alone (`get`) skips reading the label data, so it cannot
+see changes made outside this app - the order's ship-to or attention edited
+in OES. It only trusts an entry whose data was read within
+LABEL_CACHE_FAST_PATH_SECONDS; after that the data is read again and hashed,
+and the label is re-rendered if it changed. Use invalidate_pack() (POST
+/api/pack/{id}/refresh-labels) to pick up an OES edit right away.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.core.config import get_settings
+
+FORMATS = ("html", "zpl", "pdf")
+
+_TEMPLATE_FILES = (
+    os.path.join(os.path.dirname(__file__), "..", "templates", "box_label.html"),
+    os.path.join(os.path.dirname(__file__), "zpl_label.py"),
+)
+
+# The files are stat'ed at most this often, not on every lookup
+_VERSION_TTL_SECONDS = get_settings().LABEL_CACHE_FAST_PATH_SECONDS
+_version: Tuple[float, str] = (float("-inf"), "")  # (checked at (monotonic), version)
+
+
+def template_version() -> str:
+    """Changes when the label template or the ZPL layout is edited (noticed within the fast path TTL)."""
+    global _version
+    checked_at, version = _version
+    now = time.monotonic()
+    if now - checked_at < _VERSION_TTL_SECONDS:
+        return version
+    parts = []
+    for path in _TEMPLATE_FILES:
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append("-")
+    version = hashlib.sha1("|".join(parts).encode("ascii")).hexdigest()[:12]
+    _version = (now, version)
+    return version
+
+
+def content_hash(data: Dict) -> str:
+    """Stable hash of a box's label data (as returned by get_box_label_data)."""
+    blob = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LabelCache:
+    """Thread-safe LRU of rendered labels; one current entry per (box_id, format)."""
+
+    def __init__(self, max_entries: int = 512, fast_path_seconds: float = 30):
+        self.max_entries = max_entries
+        self.fast_path_seconds = fast_path_seconds
+        # (box_id, fmt) -> (pack_id, content_hash, template_version, value, data checked at (monotonic))
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[int, str, str, Any, float]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, pack_id: int) -> int:
+        """Current generation of a pack; bumped on every invalidation."""
+        with self._lock:
+            return self._generations.get(pack_id, 0)
+
+    def get(self, pack_id: int, box_id: int, fmt: str) -> Optional[Any]:
+        """
+        Rendered label for a box if one is cached for the current template and
+        its data was checked within fast_path_seconds.
+        """
+        version = template_version()
+        with self._lock:
+            entry = self._entries.get((box_id, fmt))
+            if (entry is None or entry[0] != pack_id or entry[2] != version
+                    or time.monotonic() - entry[4] > self.fast_path_seconds):
+                self.misses += 1
+                return None
+            self._entries.move_to_end((box_id, fmt))
+            self.hits += 1
+            return entry[3]
+
+    def get_or_render(self, data: Dict, fmt: str, render: Callable[[Dict], Any],
+                      generation: Optional[int] = None) -> Any:
+        """
+        Return the cached label for `data` or render it with `render(data)` and
+        store it. If `generation` is given and the pack has been invalidated
+        since, the fresh render is returned but not stored.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown label format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+        key = (data["box_id"], fmt)
+        digest, version = content_hash(data), template_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == digest and entry[2] == version:
+                # `data` was just read and still matches: the fast path may trust it again
+                self._entries[key] = entry[:4] + (time.monotonic(),)
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+
+        value = render(data)
+
+        pack_id = data["pack_id"]
+        with self._lock:
+            if generation is None or generation == self._generations.get(pack_id, 0):
+                self._entries[key] = (pack_id, digest, version, value, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate_box(self, pack_id: int, box_id: int) -> None:
+        """Drop every format of one box (its items or weight changed)."""
+        with self._lock:
+            self._generations[pack_id] = self._generations.get(pack_id, 0) + 1
+            for k in [k for k in self._entries if k[0] == box_id]:
+                del self._entries[k]
+
+    def invalidate_pack(self, pack_id: int) -> None:
+        """Drop every box of a pack (boxes added/removed change numbering and 'of N', order edited in OES)."""
+        with self._lock:
+            self._generations[pack_id] = self._generations.get(pack_id, 0) + 1
+            for k in [k for k, v in self._entries.items() if v[0] == pack_id]:
+                del self._entries[k]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+label_cache = LabelCache(
+    max_entries=get_settings().LABEL_CACHE_MAX_ENTRIES,
+    fast_path_seconds=get_settings().LABEL_CACHE_FAST_PATH_SECONDS,
+)
+
+
+def _renderer(fmt: str) -> Callable[[Dict], Any]:
+    if fmt == "zpl":
+        from backend.services.zpl_label import render_box_label_zpl
+        return render_box_label_zpl
+    if fmt == "pdf":
+        from backend.services.printer_service import render_box_label_pdf
+        return render_box_label_pdf
+    from backend.services.printer_service import render_box_label_html
+    return render_box_label_html
+
+
+def render_label(data: Dict, fmt: str = "html", generation: Optional[int] = None) -> Any:
+    """Render (or reuse) the label for box label data in the given format."""
+    return label_cache.get_or_render(data, fmt, _renderer(fmt), generation)
+
+
+def box_label(pack_id: int, box_id: int, fmt: str = "html") -> Any:
+    """
+    Rendered label for one box: straight from the cache when the box is
+    unchanged and its data was checked recently, otherwise built from
+    get_box_label_data() (a cache hit again if the data hasn't changed).
+    Raises ValueError if the box does not exist in the pack.
+    """
+    cached = label_cache.get(pack_id, box_id, fmt)
+    if cached is not None:
+        return cached
+    from backend.services.pack_view import get_box_label_data
+
+    generation = label_cache.generation(pack_id)
+    return render_label(get_box_label_data(pack_id, box_id), fmt, generation)
@@ -3,13 +3,14 @@ import math
 
 from typing import Dict, List, Optional
 
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func, text, bindparam
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime
 from backend.db import models
 from backend.services.barcode_helper import generate_barcode_base64
 from backend.db.session import oes_engine, app_engine
+from backend.services.label_cache import label_cache
 
 
 class DuplicateBoxError(Exception):
@@ -356,6 +357,7 @@ def assign_one(db: Session, pack_id: int, order_line_id: int, box_id: int) -> No
         db.add(models.PackBoxItem(pack_box_id=box_id, order_line_id=order_line_id, qty=1))
 
     db.commit()
+    label_cache.invalidate_box(pack_id, box_id)
 
 
 def set_qty(db: Session, pack_id: int, box_id: int, order_line_id: int, qty: int) -> None:
@@ -411,6 +413,7 @@ def set_qty(db: Session, pack_id: int, box_id: int, order_line_id: int, qty: int
         db.add(models.PackBoxItem(pack_box_id=box_id, order_line_id=order_line_id, qty=qty))
 
     db.commit()
+    label_cache.invalidate_box(pack_id, box_id)
 
 def validate_box_weight(weight_entered: float, max_weight: int | None) -> int:
     if weight_entered is None:
@@ -451,6 +454,7 @@ def set_box_weight(db: Session, pack_id: int, box_id: int, weight: float | None)
         box.weight_lbs = weight_lbs
 
     db.commit()
+    label_cache.invalidate_box(pack_id, box_id)
 
 # ---------------------------------------------------------------------
 # Delete box if empty
@@ -480,6 +484,8 @@ def delete_box_if_empty(db: Session, pack_id: int, box_id: int):
     db.flush()
     _renumber_boxes(db, pack_id)
     db.commit()
+    # Later boxes were renumbered and every label's "of N" changed
+    label_cache.invalidate_pack(pack_id)
 
 # ---------------------------------------------------------------------
 # Remove Items from Box
@@ -525,6 +531,7 @@ def remove_item_from_box(
         item.qty -= qty
 
     db.commit()
+    label_cache.invalidate_box(pack_id, box_id)
 
 
 def _next_box_no(db: Session, pack_id: int) -> int:
@@ -643,6 +650,7 @@ def duplicate_box(db: Session, pack_id: int, box_id: int):
         db.add(new_item)
 
     db.commit()
+    label_cache.invalidate_pack(pack_id)
 
     # Return updated snapshot
     return get_pack_snapshot(db, pack_id)
@@ -651,6 +659,93 @@ def duplicate_box(db: Session, pack_id: int, box_id: int):
 # ---------------------------------------------------------------------
 # Data assembler for packing slip report
 # ---------------------------------------------------------------------
+_SLIP_HEADER_SELECT = """
+    SELECT
+        CAST(so.SalesOrderID AS NVARCHAR(50)) AS order_no,
+        sot.Name AS lead_time_plan,
+        so.CustomerPONo AS po_number,
+        CONVERT(VARCHAR(10), so.OrderDate, 120) AS order_date,
+        CONVERT(VARCHAR(10), so.DueDate, 120) AS due_date,
+        so.Project AS project_name,
+        so.Tag AS tag,
+        so.ClientName AS customer_name,
+        so.ClientAddress AS customer_address1,
+        so.ClientAddress2 AS customer_address2,
+        so.ClientCity AS customer_city,
+        so.ClientProvince AS customer_province,
+        so.ClientPostalCode AS customer_postal_code,
+        so.ClientCountry AS customer_country,
+        so.ClientPhone AS customer_phone,
+        so.contactName AS sales_rep_name,
+        so.ContactEmail AS client_email,
+        so.ShippingName AS ship_name,
+        so.ShippingAddress AS ship_address1,
+        so.ShippingAddress2 AS ship_address2,
+        so.ShippingCity AS ship_city,
+        so.ShippingProvince AS ship_province,
+        so.ShippingPostalCode AS ship_postal_code,
+        so.ShippingCountry AS ship_country,
+        so.ShippingPhone AS ship_phone,
+        so.ShippingAttention AS ship_attention,
+        so.ContactEmail AS ship_email,
+        CONCAT(so.shipby,' - ',so.ServiceLevel,' - ',so.ShippingDefaultTerm,' - Account #: ',so.ShippingAccountNo) AS ship_by,
+        CONVERT(VARCHAR(10), so.ActualShipDate, 120) AS ship_by_date,
+        so.OrderStatus,
+        so.ShippingNotes
+    FROM SalesOrders so
+    LEFT JOIN SalesOrderTypes sot ON so.SalesOrderTypeID = sot.SalesOrderTypeID
+"""
+
+_SLIP_ITEMS_SELECT = """
+    SELECT
+        pb.pack_id,
+        pb.box_no,
+        ISNULL(ct.name,
+            CONCAT('Custom ', pb.custom_l_in, 'x', pb.custom_w_in, 'x', pb.custom_h_in)
+        ) AS carton_type,
+        pb.weight_lbs AS weight_lb,
+        ol.product_code,
+        ol.length_in,
+        ol.height_in,
+        ol.finish,
+        ol.qty_ordered,
+        pbi.qty AS qty_shipped,
+        ol.build_note,
+        ol.product_tag
+    FROM pack_box_item AS pbi
+    INNER JOIN pack_box AS pb ON pbi.pack_box_id = pb.id
+    INNER JOIN [order_line] AS ol ON pbi.order_line_id = ol.id
+    LEFT JOIN carton_type AS ct ON pb.carton_type_id = ct.id
+"""
+
+_SLIP_BOXES_SELECT = """
+    SELECT 
+        pb.pack_id,
+        pb.box_no,
+        ISNULL(ct.name,
+            CONCAT('Custom ', pb.custom_l_in, 'x', pb.custom_w_in, 'x', pb.custom_h_in)
+        ) AS carton_type,
+        pb.weight_lbs
+    FROM pack_box AS pb
+    LEFT JOIN carton_type AS ct ON pb.carton_type_id = ct.id
+"""
+
+
+def _build_slip(pack_id: int, order_info, items: List[Dict], boxes: List[Dict]) -> Dict:
+    """Merge OES header + app DB rows into the packing slip data structure."""
+    ship_date = order_info.get("ship_by_date") or datetime.now().strftime("%Y-%m-%d")
+
+    slip = dict(order_info)
+    slip["ship_by_date"] = ship_date
+    slip["boxes"] = boxes
+    slip["items"] = items
+    slip["pack_id"] = pack_id
+    slip["generated_by"] = "system"  # or current user
+    slip["generated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    slip["notes"] = order_info.get("ShippingNotes") or ""
+    return slip
+
+
 def get_packing_slip_data(pack_id: int):
     """Fetch packing slip data for a completed pack."""
     # --- 0. Get order_no from local pack + order tables (app DB) ---
@@ -667,41 +762,7 @@ def get_packing_slip_data(pack_id: int):
         raise ValueError(f"Pack {pack_id} not found or missing linked order.")
 
     # --- 1. Get order and customer info from OES using order_no ---
-    query_header = text("""
-        SELECT
-            CAST(so.SalesOrderID AS NVARCHAR(50)) AS order_no,
-            sot.Name AS lead_time_plan,
-            so.CustomerPONo AS po_number,
-            CONVERT(VARCHAR(10), so.OrderDate, 120) AS order_date,
-            CONVERT(VARCHAR(10), so.DueDate, 120) AS due_date,
-            so.Project AS project_name,
-            so.Tag AS tag,
-            so.ClientName AS customer_name,
-            so.ClientAddress AS customer_address1,
-            so.ClientAddress2 AS customer_address2,
-            so.ClientCity AS customer_city,
-            so.ClientProvince AS customer_province,
-            so.ClientPostalCode AS customer_postal_code,
-            so.ClientCountry AS customer_country,
-            so.ClientPhone AS customer_phone,
-            so.contactName AS sales_rep_name,
-            so.ContactEmail AS client_email,
-            so.ShippingName AS ship_name,
-            so.ShippingAddress AS ship_address1,
-            so.ShippingAddress2 AS ship_address2,
-            so.ShippingCity AS ship_city,
-            so.ShippingProvince AS ship_province,
-            so.ShippingPostalCode AS ship_postal_code,
-            so.ShippingCountry AS ship_country,
-            so.ShippingPhone AS ship_phone,
-            so.ShippingAttention AS ship_attention,
-            so.ContactEmail AS ship_email,
-            CONCAT(so.shipby,' - ',so.ServiceLevel,' - ',so.ShippingDefaultTerm,' - Account #: ',so.ShippingAccountNo) AS ship_by,
-            CONVERT(VARCHAR(10), so.ActualShipDate, 120) AS ship_by_date,
-            so.OrderStatus,
-            so.ShippingNotes
-        FROM SalesOrders so
-        LEFT JOIN SalesOrderTypes sot ON so.SalesOrderTypeID = sot.SalesOrderTypeID
+    query_header = text(_SLIP_HEADER_SELECT + """
         WHERE CAST(so.SalesOrderID AS NVARCHAR(50)) = :order_no
     """)
     with oes_engine.connect() as conn:
@@ -710,28 +771,8 @@ def get_packing_slip_data(pack_id: int):
     if not order_info:
         raise ValueError(f"OES order {order_no} not found.")
 
-    ship_date = order_info.get("ship_by_date") or datetime.now().strftime("%Y-%m-%d")
-
     # --- 2. Get packing items (from app DB) ---
-    query_items_local = text("""
-        SELECT
-            pb.box_no,
-            ISNULL(ct.name,
-                CONCAT('Custom ', pb.custom_l_in, 'x', pb.custom_w_in, 'x', pb.custom_h_in)
-            ) AS carton_type,
-            pb.weight_lbs AS weight_lb,
-            ol.product_code,
-            ol.length_in,
-            ol.height_in,
-            ol.finish,
-            ol.qty_ordered,
-            pbi.qty AS qty_shipped,
-            ol.build_note,
-            ol.product_tag
-        FROM pack_box_item AS pbi
-        INNER JOIN pack_box AS pb ON pbi.pack_box_id = pb.id
-        INNER JOIN [order_line] AS ol ON pbi.order_line_id = ol.id
-        LEFT JOIN carton_type AS ct ON pb.carton_type_id = ct.id
+    query_items_local = text(_SLIP_ITEMS_SELECT + """
         WHERE pb.pack_id = :pack_id
         ORDER BY pb.box_no, ol.product_code
     """)
@@ -740,15 +781,7 @@ def get_packing_slip_data(pack_id: int):
         items = [dict(row) for row in conn.execute(query_items_local, {"pack_id": pack_id}).mappings()]
 
     # --- 3. Get box info (from app DB) ---
-    query_boxes = text("""
-        SELECT 
-            pb.box_no,
-            ISNULL(ct.name,
-                CONCAT('Custom ', pb.custom_l_in, 'x', pb.custom_w_in, 'x', pb.custom_h_in)
-            ) AS carton_type,
-            pb.weight_lbs
-        FROM pack_box AS pb
-        LEFT JOIN carton_type AS ct ON pb.carton_type_id = ct.id
+    query_boxes = text(_SLIP_BOXES_SELECT + """
         WHERE pb.pack_id = :pack_id
         ORDER BY pb.box_no
     """)
@@ -756,105 +789,321 @@ def get_packing_slip_data(pack_id: int):
     with app_engine.connect() as conn:
         boxes = [dict(row) for row in conn.execute(query_boxes, {"pack_id": pack_id}).mappings()]
 
+    for row in items + boxes:
+        row.pop("pack_id", None)
+
     # --- 4. Merge into final data structure ---
-    slip = dict(order_info)
-    slip["ship_by_date"] = ship_date
-    slip["boxes"] = boxes
-    slip["items"] = items
-    slip["pack_id"] = pack_id
-    slip["generated_by"] = "system"  # or current user
-    slip["generated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    slip["notes"] = order_info.get("ShippingNotes") or ""
+    return _build_slip(pack_id, order_info, items, boxes)
 
-    return slip
+
+def get_packing_slip_data_batch(pack_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Fetch packing slip data for many packs at once.
+
+    Same output per pack as `get_packing_slip_data`, but with one OES header
+    query and one app DB round trip per table for the whole batch. Packs that
+    are missing (or whose order is missing in OES) are left out of the result.
+    """
+    if not pack_ids:
+        return {}
+
+    query_packs = text("""
+        SELECT pack.id AS pack_id, ord.order_no
+        FROM pack
+        LEFT JOIN dbo.[order] AS ord ON pack.order_id = ord.id
+        WHERE pack.id IN :pack_ids
+    """).bindparams(bindparam("pack_ids", expanding=True))
+
+    query_items = text(_SLIP_ITEMS_SELECT + """
+        WHERE pb.pack_id IN :pack_ids
+        ORDER BY pb.pack_id, pb.box_no, ol.product_code
+    """).bindparams(bindparam("pack_ids", expanding=True))
+
+    query_boxes = text(_SLIP_BOXES_SELECT + """
+        WHERE pb.pack_id IN :pack_ids
+        ORDER BY pb.pack_id, pb.box_no
+    """).bindparams(bindparam("pack_ids", expanding=True))
+
+    items_by_pack: Dict[int, List[Dict]] = {pid: [] for pid in pack_ids}
+    boxes_by_pack: Dict[int, List[Dict]] = {pid: [] for pid in pack_ids}
+
+    with app_engine.connect() as conn:
+        order_no_by_pack = {
+            int(r["pack_id"]): r["order_no"]
+            for r in conn.execute(query_packs, {"pack_ids": list(pack_ids)}).mappings()
+            if r["order_no"]
+        }
+        for row in conn.execute(query_items, {"pack_ids": list(pack_ids)}).mappings():
+            item = dict(row)
+            items_by_pack[int(item.pop("pack_id"))].append(item)
+        for row in conn.execute(query_boxes, {"pack_ids": list(pack_ids)}).mappings():
+            box = dict(row)
+            boxes_by_pack[int(box.pop("pack_id"))].append(box)
+
+    if not order_no_by_pack:
+        return {}
+
+    query_headers = text(_SLIP_HEADER_SELECT + """
+        WHERE CAST(so.SalesOrderID AS NVARCHAR(50)) IN :order_nos
+    """).bindparams(bindparam("order_nos", expanding=True))
+
+    with oes_engine.connect() as conn:
+        headers = {
+            str(r["order_no"]): r
+            for r in conn.execute(
+                query_headers, {"order_nos": sorted({str(o) for o in order_no_by_pack.values()})}
+            ).mappings()
+        }
+
+    slips: Dict[int, Dict] = {}
+    for pid in pack_ids:
+        order_info = headers.get(str(order_no_by_pack.get(pid)))
+        if order_info is None:
+            continue
+        slips[pid] = _build_slip(pid, order_info, items_by_pack[pid], boxes_by_pack[pid])
+    return slips
 
 
 # --- 8. Box label data assembler
 # ---------------------------------------------------------------------
-def get_box_label_data(pack_id: int, box_id: int):
-    """
-    Fetch all data needed to render a box label for a specific box.
-    
-    Returns dict with:
-    - Order info: order_no, project_name, tag, po_number
-    - Shipping info: ship_name, ship_address1, ship_address2, ship_city, 
-                     ship_province, ship_postal_code, ship_country, ship_attention
-    - Box info: box_no
-    - Items: list of {qty, product_code, length_in, height_in} for this box
-    """
-    # --- 0. Get order_no from local pack + order tables (app DB) ---
+_LABEL_HEADER_SELECT = """
+    SELECT
+        CAST(so.SalesOrderID AS NVARCHAR(50)) AS order_no,
+        so.Project AS project_name,
+        so.Tag AS tag,
+        so.CustomerPONo AS po_number,
+        so.ShippingName AS ship_name,
+        so.ShippingAddress AS ship_address1,
+        so.ShippingAddress2 AS ship_address2,
+        so.ShippingCity AS ship_city,
+        so.ShippingProvince AS ship_province,
+        so.ShippingPostalCode AS ship_postal_code,
+        so.ShippingCountry AS ship_country,
+        so.ShippingAttention AS ship_attention,
+        so.ShippingPhone AS ship_phone
+    FROM SalesOrders so
+    WHERE CAST(so.SalesOrderID AS NVARCHAR(50)) = :order_no
+"""
+
+_LABEL_ITEMS_SELECT = """
+    SELECT
+        pbi.pack_box_id,
+        pbi.qty,
+        ol.product_code,
+        ol.length_in,
+        ol.height_in
+    FROM pack_box_item AS pbi
+    INNER JOIN [order_line] AS ol ON pbi.order_line_id = ol.id
+"""
+
+
+def _pack_order_no(conn, pack_id: int) -> str:
     query_pack = text("""
         SELECT ord.order_no
         FROM pack
         LEFT JOIN dbo.[order] AS ord ON pack.order_id = ord.id
         WHERE pack.id = :pack_id
     """)
-    with app_engine.connect() as conn:
-        order_no = conn.execute(query_pack, {"pack_id": pack_id}).scalar_one_or_none()
-
+    order_no = conn.execute(query_pack, {"pack_id": pack_id}).scalar_one_or_none()
     if not order_no:
         raise ValueError(f"Pack {pack_id} not found or missing linked order.")
+    return order_no
 
-    # --- 1. Get order and shipping info from OES ---
-    query_header = text("""
-        SELECT
-            CAST(so.SalesOrderID AS NVARCHAR(50)) AS order_no,
-            so.Project AS project_name,
-            so.Tag AS tag,
-            so.CustomerPONo AS po_number,
-            so.ShippingName AS ship_name,
-            so.ShippingAddress AS ship_address1,
-            so.ShippingAddress2 AS ship_address2,
-            so.ShippingCity AS ship_city,
-            so.ShippingProvince AS ship_province,
-            so.ShippingPostalCode AS ship_postal_code,
-            so.ShippingCountry AS ship_country,
-            so.ShippingAttention AS ship_attention,
-            so.ShippingPhone AS ship_phone
-        FROM SalesOrders so
-        WHERE CAST(so.SalesOrderID AS NVARCHAR(50)) = :order_no
-    """)
-    with oes_engine.connect() as conn:
-        order_info = conn.execute(query_header, {"order_no": order_no}).mappings().first()
 
+def _label_header(order_no: str):
+    with oes_engine.connect() as conn:
+        order_info = conn.execute(text(_LABEL_HEADER_SELECT), {"order_no": order_no}).mappings().first()
     if not order_info:
         raise ValueError(f"OES order {order_no} not found.")
+    return order_info
+
 
-    # --- 2. Get box info from app DB ---
+def get_box_label_data(pack_id: int, box_id: int):
+    """
+    Fetch all data needed to render a box label for a specific box.
+    
+    Returns dict with:
+    - Order info: order_no, project_name, tag, po_number
+    - Shipping info: ship_name, ship_address1, ship_address2, ship_city, 
+                     ship_province, ship_postal_code, ship_country, ship_attention
+    - Box info: box_no, total_boxes (boxes in the pack, for "Box N of M")
+    - Items: list of {qty, product_code, length_in, height_in} for this box
+    """
     query_box = text("""
         SELECT 
-            pb.box_no
+            pb.box_no,
+            (SELECT COUNT(*) FROM pack_box AS pb2 WHERE pb2.pack_id = pb.pack_id) AS total_boxes
         FROM pack_box AS pb
         WHERE pb.id = :box_id AND pb.pack_id = :pack_id
     """)
-    
-    with app_engine.connect() as conn:
-        box_info = conn.execute(query_box, {"box_id": box_id, "pack_id": pack_id}).mappings().first()
-
-    if not box_info:
-        raise ValueError(f"Box {box_id} not found in Pack {pack_id}")
-
-    # --- 3. Get items in this box (from app DB) ---
-    query_items = text("""
-        SELECT
-            pbi.qty,
-            ol.product_code,
-            ol.length_in,
-            ol.height_in
-        FROM pack_box_item AS pbi
-        INNER JOIN [order_line] AS ol ON pbi.order_line_id = ol.id
+    query_items = text(_LABEL_ITEMS_SELECT + """
         WHERE pbi.pack_box_id = :box_id
         ORDER BY ol.product_code
     """)
-    
+
+    # --- App DB: order_no, box and its items on one connection ---
     with app_engine.connect() as conn:
+        order_no = _pack_order_no(conn, pack_id)
+        box_info = conn.execute(query_box, {"box_id": box_id, "pack_id": pack_id}).mappings().first()
+        if not box_info:
+            raise ValueError(f"Box {box_id} not found in Pack {pack_id}")
         items = [dict(row) for row in conn.execute(query_items, {"box_id": box_id}).mappings()]
 
-    # --- 4. Merge into final data structure ---
+    # --- Order and shipping info from OES ---
+    order_info = _label_header(order_no)
+
+    # --- Merge into final data structure ---
+    for item in items:
+        item.pop("pack_box_id", None)
     label_data = dict(order_info)
     label_data["box_no"] = box_info["box_no"]
+    label_data["total_boxes"] = box_info["total_boxes"]
     label_data["items"] = items
     label_data["pack_id"] = pack_id
     label_data["box_id"] = box_id
 
-    return label_data
\ No newline at end of file
+    return label_data
+
+
+def get_pack_label_data(pack_id: int, include_empty: bool = False) -> List[Dict]:
+    """
+    Label data for every box of a pack, in box_no order.
+    
+    Same dict shape as get_box_label_data(), built with one app-DB
+    connection (pack, boxes, one items query for all boxes) and a single OES
+    header read, instead of four round trips per box.
+    
+    Args:
+        pack_id: Pack ID
+        include_empty: Also return boxes without items (skipped by default,
+            as there is nothing to label)
+    """
+    query_boxes = text("""
+        SELECT pb.id AS box_id, pb.box_no
+        FROM pack_box AS pb
+        WHERE pb.pack_id = :pack_id
+        ORDER BY pb.box_no, pb.id
+    """)
+    query_items = text(_LABEL_ITEMS_SELECT + """
+        INNER JOIN pack_box AS pb ON pbi.pack_box_id = pb.id
+        WHERE pb.pack_id = :pack_id
+        ORDER BY ol.product_code
+    """)
+
+    with app_engine.connect() as conn:
+        order_no = _pack_order_no(conn, pack_id)
+        boxes = list(conn.execute(query_boxes, {"pack_id": pack_id}).mappings())
+        items_by_box: Dict[int, List[Dict]] = {}
+        for row in conn.execute(query_items, {"pack_id": pack_id}).mappings():
+            item = dict(row)
+            items_by_box.setdefault(item.pop("pack_box_id"), []).append(item)
+
+    if not boxes:
+        return []
+
+    header = dict(_label_header(order_no))
+    total_boxes = len(boxes)
+    labels = []
+    for box in boxes:
+        items = items_by_box.get(box["box_id"], [])
+        if not items and not include_empty:
+            continue
+        label_data = dict(header)
+        label_data["box_no"] = box["box_no"]
+        label_data["total_boxes"] = total_boxes
+        label_data["items"] = items
+        label_data["pack_id"] = pack_id
+        label_data["box_id"] = box["box_id"]
+        labels.append(label_data)
+
+    return labels
+
+
+# --- 9. UPS rating inputs (bulk)
+# ---------------------------------------------------------------------
+def get_rate_inputs_batch(pack_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Everything UPS rating needs for many packs, in three queries: boxes with
+    carton type dimensions filled in (app DB), order numbers (app DB) and
+    ship-to address plus service level (one OES query for all orders).
+
+    Returns:
+        {pack_id: {"order_no", "boxes", "ship_to_address", "service_level"}}
+        Boxes have the shape ups_service.build_rate_payload() expects. Packs
+        that are missing, or whose order is missing in OES, are left out.
+    """
+    if not pack_ids:
+        return {}
+
+    query_packs = text("""
+        SELECT pack.id AS pack_id, ord.order_no
+        FROM pack
+        LEFT JOIN dbo.[order] AS ord ON pack.order_id = ord.id
+        WHERE pack.id IN :pack_ids
+    """).bindparams(bindparam("pack_ids", expanding=True))
+
+    query_boxes = text("""
+        SELECT
+            pb.pack_id,
+            pb.box_no,
+            COALESCE(pb.custom_l_in, ct.length_in) AS custom_l_in,
+            COALESCE(pb.custom_w_in, ct.width_in) AS custom_w_in,
+            COALESCE(pb.custom_h_in, ct.height_in) AS custom_h_in,
+            pb.weight_lbs,
+            pb.weight_entered
+        FROM pack_box AS pb
+        LEFT JOIN carton_type AS ct ON pb.carton_type_id = ct.id
+        WHERE pb.pack_id IN :pack_ids
+        ORDER BY pb.pack_id, pb.box_no
+    """).bindparams(bindparam("pack_ids", expanding=True))
+
+    boxes_by_pack: Dict[int, List[Dict]] = {pid: [] for pid in pack_ids}
+    with app_engine.connect() as conn:
+        order_no_by_pack = {
+            int(r["pack_id"]): r["order_no"]
+            for r in conn.execute(query_packs, {"pack_ids": list(pack_ids)}).mappings()
+            if r["order_no"]
+        }
+        for row in conn.execute(query_boxes, {"pack_ids": list(pack_ids)}).mappings():
+            box = dict(row)
+            boxes_by_pack[int(box.pop("pack_id"))].append(box)
+
+    if not order_no_by_pack:
+        return {}
+
+    query_headers = text("""
+        SELECT
+            CAST(so.SalesOrderID AS NVARCHAR(50)) AS order_no,
+            so.ShippingName AS ship_name,
+            so.ShippingAddress AS ship_address1,
+            so.ShippingAddress2 AS ship_address2,
+            so.ShippingCity AS ship_city,
+            so.ShippingProvince AS ship_province,
+            so.ShippingPostalCode AS ship_postal_code,
+            so.ShippingCountry AS ship_country,
+            so.ServiceLevel AS service_level
+        FROM SalesOrders so
+        WHERE CAST(so.SalesOrderID AS NVARCHAR(50)) IN :order_nos
+    """).bindparams(bindparam("order_nos", expanding=True))
+
+    with oes_engine.connect() as conn:
+        headers = {
+            str(r["order_no"]): dict(r)
+            for r in conn.execute(
+                query_headers, {"order_nos": sorted({str(o) for o in order_no_by_pack.values()})}
+            ).mappings()
+        }
+
+    inputs: Dict[int, Dict] = {}
+    for pid in pack_ids:
+        header = headers.get(str(order_no_by_pack.get(pid)))
+        if header is None:
+            continue
+        # Packs on the same order share `header`: copy, never pop from it
+        inputs[pid] = {
+            "order_no": header["order_no"],
+            "boxes": boxes_by_pack[pid],
+            "ship_to_address": {k: v for k, v in header.items() if k not in ("order_no", "service_level")},
+            "service_level": header["service_level"],
+        }
+    return inputs
@@ -0,0 +1,111 @@
+"""
+Bounded pool for bcrypt password hashing and verification.
+
+bcrypt is deliberately slow (~250 ms of CPU at cost 12). Run inline, a shift
+change's worth of logins fills the request threadpool and scanning stalls.
+Here it runs on PASSWORD_HASH_WORKERS threads (bcrypt releases the GIL, so
+they run in parallel and nothing else waits on them). At most
+PASSWORD_HASH_MAX_PENDING logins queue up; further ones are turned away with
+PasswordPoolBusy (the login endpoint answers 503 + Retry-After) instead of
+piling up behind the pool.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.auth import hash_password, verify_password
+from backend.core.config import get_settings
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Too many password checks are already queued."""
+
+
+class PasswordPool:
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _run(self, submitted: float, fn: Callable, args: tuple) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._completed += 1
+                self._wait_seconds += started - submitted
+                self._max_wait_seconds = max(self._max_wait_seconds, started - submitted)
+                self._run_seconds += finished - started
+
+    def _submit(self, fn: Callable, *args: Any, bounded: bool = True) -> Future:
+        with self._lock:
+            if bounded and self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordPoolBusy(f"{self._pending} password checks already queued")
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        try:
+            future = self._executor.submit(self._run, time.perf_counter(), fn, args)
+        except RuntimeError:  # pool shut down
+            self._release(None)
+            raise
+        # Runs on completion *and* on cancellation (client gone before its turn), so a
+        # queued login that never runs still gives its slot back
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future is not None and future.cancelled():
+                self._cancelled += 1
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password() on the pool. Raises PasswordPoolBusy when the queue is full."""
+        return await asyncio.wrap_future(self._submit(verify_password, plain_password, hashed_password))
+
+    async def hash_async(self, plain_password: str) -> str:
+        """hash_password() on the pool. Raises PasswordPoolBusy when the queue is full."""
+        return await asyncio.wrap_future(self._submit(hash_password, plain_password))
+
+    def hash(self, plain_password: str) -> str:
+        """hash_password() on the pool for sync callers (user management); never rejected."""
+        return self._submit(hash_password, plain_password, bounded=False).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "peak_pending": self._peak_pending,
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled,
+                "avg_wait_ms": round(self._wait_seconds / self._completed * 1000, 1) if self._completed else None,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 1),
+                "avg_run_ms": round(self._run_seconds / self._completed * 1000, 1) if self._completed else None,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(
+    workers=get_settings().PASSWORD_HASH_WORKERS,
+    max_pending=get_settings().PASSWORD_HASH_MAX_PENDING,
+)
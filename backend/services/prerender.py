@@ -0,0 +1,105 @@
+"""
+Background pre-rendering of a pack's packing slip and box labels.
+
+When a pack is completed the operator immediately asks for the slip and the
+labels, so we render them right away on a small worker pool and keep the
+results in `render_cache` (single box labels in `label_cache`). Endpoints
+check the cache first and, if a pre-render for the pack is still running,
+wait briefly (PRERENDER_WAIT_SECONDS) for it instead of rendering the same
+artifact a second time. The wait holds a request thread, so it is kept
+short: a stalled pre-render must not make the endpoint slower than
+rendering inline.
+"""
+from __future__ import annotations
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+from backend.core.config import get_settings
+from backend.services.render_cache import render_cache, SLIP_PDF, LABELS_HTML
+from backend.services.label_cache import label_cache, render_label
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_executor = ThreadPoolExecutor(max_workers=settings.PRERENDER_WORKERS, thread_name_prefix="prerender")
+_pending: Dict[int, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def _prerender_pack(pack_id: int, generation: int) -> None:
+    from backend.services.pack_view import get_packing_slip_data, get_pack_label_data
+    from backend.services.report_html import render_packing_slip_pdf
+    from backend.services.printer_service import generate_multi_page_label_html
+
+    # --- Packing slip ---
+    data = get_packing_slip_data(pack_id)
+    render_cache.put(pack_id, SLIP_PDF, render_packing_slip_pdf(data), generation)
+
+    # --- Box labels ---
+    # Single labels go to the per-box label cache (previews and reprints)
+    label_generation = label_cache.generation(pack_id)
+    all_box_data = get_pack_label_data(pack_id)
+    for box_data in all_box_data:
+        render_label(box_data, "html", label_generation)
+
+    if all_box_data:
+        render_cache.put(
+            pack_id, LABELS_HTML, (generate_multi_page_label_html(all_box_data), len(all_box_data)), generation
+        )
+
+
+def _run(pack_id: int, generation: int) -> None:
+    try:
+        _prerender_pack(pack_id, generation)
+        logger.info(f"Pre-rendered packing slip and labels for pack {pack_id}")
+    except Exception:
+        logger.exception(f"Pre-render failed for pack {pack_id}")
+
+
+def _clear_pending(pack_id: int, future: Future) -> None:
+    with _pending_lock:
+        if _pending.get(pack_id) is future:
+            del _pending[pack_id]
+
+
+def schedule_prerender(pack_id: int) -> Optional[Future]:
+    """Queue a background render of the pack's slip and labels."""
+    if not settings.PRERENDER_ON_COMPLETE:
+        return None
+    generation = render_cache.generation(pack_id)
+    with _pending_lock:
+        future = _executor.submit(_run, pack_id, generation)
+        _pending[pack_id] = future
+    future.add_done_callback(lambda f: _clear_pending(pack_id, f))
+    return future
+
+
+def invalidate(pack_id: int) -> None:
+    """Drop cached artifacts for a pack; an in-flight pre-render won't store its results."""
+    render_cache.invalidate_pack(pack_id)
+    with _pending_lock:
+        _pending.pop(pack_id, None)
+
+
+def get_cached(pack_id: int, key) -> Optional[object]:
+    """
+    Return a cached artifact, waiting up to PRERENDER_WAIT_SECONDS for an
+    in-flight pre-render of the pack first. Returns None on a miss; the
+    caller renders on its own then.
+    """
+    with _pending_lock:
+        future = _pending.get(pack_id)
+    if future is not None and not future.done() and settings.PRERENDER_WAIT_SECONDS > 0:
+        try:
+            future.result(timeout=settings.PRERENDER_WAIT_SECONDS)
+        except FutureTimeout:
+            pass
+    return render_cache.get(pack_id, key)
+
+
+def shutdown() -> None:
+    """Stop the pre-render workers; queued pre-renders are dropped."""
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,331 @@
+"""
+Persistent print spooler.
+
+Print requests are stored as `print_job` rows (payload included) and the
+caller gets a job id straight away. One dispatcher thread per printer claims
+queued jobs and runs up to PRINT_QUEUE_WORKERS_PER_PRINTER of them at once;
+failures are retried with exponential backoff until PRINT_JOB_MAX_ATTEMPTS,
+and an identical job (same printer, format and payload) that is still
+queued or printing is reused instead of printed twice.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update, or_
+
+from backend.core.config import get_settings
+from backend.db.models import PrintJob
+from backend.db.session import AppSessionLocal
+from backend.services.printer_service import PrintError, print_html, send_raw
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("html", "zpl")
+ACTIVE_STATUSES = ("queued", "printing")
+
+
+def _job_dict(job: PrintJob, deduplicated: bool = False) -> Dict:
+    return {
+        "job_id": job.id,
+        "printer": job.printer_name,
+        "format": job.format,
+        "status": job.status,
+        "description": job.description,
+        "pack_id": job.pack_id,
+        "label_count": job.label_count,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+        "next_attempt_at": job.next_attempt_at,
+        "printer_job_id": job.printer_job_id,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "deduplicated": deduplicated,
+    }
+
+
+def _execute(fmt: str, payload: bytes, printer_name: str, title: str) -> Optional[str]:
+    """Hand the job to the printer; returns the spooler's job id when there is one (CUPS)."""
+    if fmt == "zpl":
+        return send_raw(payload, printer_name, title)
+    return print_html(payload.decode("utf-8"), printer_name, title)
+
+
+def _backoff_seconds(attempts: int) -> float:
+    settings = get_settings()
+    return min(settings.PRINT_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), settings.PRINT_RETRY_MAX_SECONDS)
+
+
+# ---------------------------------------------------------------------
+# Job state transitions (each in its own short session)
+# ---------------------------------------------------------------------
+def _claim_next(printer_name: str) -> Optional[int]:
+    """Mark the oldest due queued job for `printer_name` as printing and return its id."""
+    now = datetime.utcnow()
+    with AppSessionLocal() as db:
+        candidates = db.execute(
+            select(PrintJob.id)
+            .where(PrintJob.printer_name == printer_name, PrintJob.status == "queued")
+            .where(or_(PrintJob.next_attempt_at.is_(None), PrintJob.next_attempt_at <= now))
+            .order_by(PrintJob.id)
+            .limit(5)
+        ).scalars().all()
+        for job_id in candidates:
+            # Conditional update so another process/dispatcher can't claim the same job
+            claimed = db.execute(
+                update(PrintJob)
+                .where(PrintJob.id == job_id, PrintJob.status == "queued")
+                .values(status="printing", updated_at=now)
+            ).rowcount
+            db.commit()
+            if claimed:
+                return job_id
+    return None
+
+
+def _run_job(job_id: int) -> None:
+    with AppSessionLocal() as db:
+        job = db.get(PrintJob, job_id)
+        if job is None or job.status != "printing":
+            return
+        fmt, payload, printer_name = job.format, job.payload, job.printer_name
+        title = job.description or f"Print job {job_id}"
+
+    error: Optional[str] = None
+    printer_job_id: Optional[str] = None
+    try:
+        printer_job_id = _execute(fmt, payload, printer_name, title)
+    except PrintError as e:
+        error = str(e)
+    except Exception as e:
+        logger.exception(f"Print job {job_id}: unexpected error")
+        error = f"Unexpected error: {e}"
+
+    now = datetime.utcnow()
+    with AppSessionLocal() as db:
+        job = db.get(PrintJob, job_id)
+        if job is None:
+            return
+        job.attempts += 1
+        job.updated_at = now
+        if error is None:
+            job.status = "done"
+            job.last_error = None
+            job.completed_at = now
+            job.printer_job_id = printer_job_id or None
+            logger.info(
+                f"Print job {job_id} ({job.description}) printed on {printer_name}"
+                + (f" as {printer_job_id}" if printer_job_id else "")
+            )
+        elif job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.last_error = error[:1000]
+            job.completed_at = now
+            logger.error(f"Print job {job_id} failed after {job.attempts} attempts: {error}")
+        else:
+            delay = _backoff_seconds(job.attempts)
+            job.status = "queued"
+            job.last_error = error[:1000]
+            job.next_attempt_at = now + timedelta(seconds=delay)
+            logger.warning(f"Print job {job_id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+        db.commit()
+
+
+# ---------------------------------------------------------------------
+# Dispatchers
+# ---------------------------------------------------------------------
+class PrinterDispatcher:
+    """Feeds one printer's queued jobs to a bounded worker pool."""
+
+    def __init__(self, printer_name: str, concurrency: int):
+        self.printer_name = printer_name
+        self._slots = threading.Semaphore(max(1, concurrency))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        slug = re.sub(r"[^\w.-]+", "_", printer_name)[:32]
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix=f"print-{slug}")
+        self._thread = threading.Thread(target=self._run, name=f"print-dispatch-{slug}", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _job_finished(self, _future) -> None:
+        self._slots.release()
+        self._wake.set()
+
+    def _run(self) -> None:
+        poll = get_settings().PRINT_QUEUE_POLL_SECONDS
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                while self._slots.acquire(blocking=False):
+                    job_id = _claim_next(self.printer_name)
+                    if job_id is None:
+                        self._slots.release()
+                        break
+                    self._executor.submit(_run_job, job_id).add_done_callback(self._job_finished)
+            except Exception:
+                logger.exception(f"Print dispatcher for {self.printer_name} failed to claim jobs")
+            # Woken by new jobs / finished jobs; the timeout picks up retries as they come due
+            self._wake.wait(poll)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_dispatchers: Dict[str, PrinterDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+_enqueue_lock = threading.Lock()
+
+
+def _dispatcher(printer_name: str) -> PrinterDispatcher:
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(printer_name)
+        if dispatcher is None:
+            dispatcher = PrinterDispatcher(printer_name, get_settings().PRINT_QUEUE_WORKERS_PER_PRINTER)
+            _dispatchers[printer_name] = dispatcher
+        return dispatcher
+
+
+# ---------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------
+def enqueue(printer_name: str, payload: bytes | str, fmt: str = "html", description: Optional[str] = None,
+            pack_id: Optional[int] = None, label_count: int = 1, user_id: Optional[int] = None) -> Dict:
+    """
+    Queue a print job and return its status dict (with `job_id`) immediately.
+
+    If an identical job for the same printer is still queued or printing,
+    that job is returned instead (`deduplicated: True`).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown print format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+
+    digest = hashlib.sha256()
+    for part in (printer_name.encode("utf-8"), fmt.encode("ascii"), payload):
+        digest.update(part)
+        digest.update(b"\0")
+    payload_hash = digest.hexdigest()
+
+    with _enqueue_lock, AppSessionLocal() as db:
+        existing = db.execute(
+            select(PrintJob)
+            .where(PrintJob.payload_hash == payload_hash, PrintJob.status.in_(ACTIVE_STATUSES))
+            .order_by(PrintJob.id)
+            .limit(1)
+        ).scalar_one_or_none()
+        if existing is not None:
+            return _job_dict(existing, deduplicated=True)
+
+        job = PrintJob(
+            printer_name=printer_name,
+            format=fmt,
+            payload=payload,
+            payload_hash=payload_hash,
+            description=description,
+            pack_id=pack_id,
+            label_count=label_count,
+            status="queued",
+            attempts=0,
+            max_attempts=get_settings().PRINT_JOB_MAX_ATTEMPTS,
+            created_by=user_id,
+            created_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        result = _job_dict(job)
+
+    _dispatcher(printer_name).wake()
+    return result
+
+
+def get_job(job_id: int) -> Optional[Dict]:
+    with AppSessionLocal() as db:
+        job = db.get(PrintJob, job_id)
+        return _job_dict(job) if job else None
+
+
+def list_jobs(status: Optional[str] = None, printer_name: Optional[str] = None,
+              pack_id: Optional[int] = None, limit: int = 100) -> List[Dict]:
+    with AppSessionLocal() as db:
+        query = select(PrintJob).order_by(PrintJob.id.desc()).limit(limit)
+        if status:
+            query = query.where(PrintJob.status == status)
+        if printer_name:
+            query = query.where(PrintJob.printer_name == printer_name)
+        if pack_id is not None:
+            query = query.where(PrintJob.pack_id == pack_id)
+        return [_job_dict(job) for job in db.execute(query).scalars()]
+
+
+def cancel_job(job_id: int) -> Dict:
+    """Cancel a job that has not started printing."""
+    with AppSessionLocal() as db:
+        job = db.get(PrintJob, job_id)
+        if job is None:
+            raise ValueError(f"Print job {job_id} not found")
+        if job.status != "queued":
+            raise ValueError(f"Print job {job_id} is {job.status} and can no longer be cancelled")
+        job.status = "cancelled"
+        job.updated_at = job.completed_at = datetime.utcnow()
+        db.commit()
+        return _job_dict(job)
+
+
+def retry_job(job_id: int) -> Dict:
+    """Put a failed or cancelled job back in the queue with a fresh set of attempts."""
+    with AppSessionLocal() as db:
+        job = db.get(PrintJob, job_id)
+        if job is None:
+            raise ValueError(f"Print job {job_id} not found")
+        if job.status not in ("failed", "cancelled"):
+            raise ValueError(f"Print job {job_id} is {job.status}; only failed or cancelled jobs can be retried")
+        job.status = "queued"
+        job.attempts = 0
+        job.next_attempt_at = None
+        job.completed_at = None
+        job.updated_at = datetime.utcnow()
+        db.commit()
+        result = _job_dict(job)
+    _dispatcher(result["printer"]).wake()
+    return result
+
+
+def start() -> None:
+    """
+    Resume the queue after a restart: jobs interrupted mid-print go back to
+    queued, and every printer with queued jobs gets its dispatcher.
+    """
+    with AppSessionLocal() as db:
+        db.execute(
+            update(PrintJob)
+            .where(PrintJob.status == "printing")
+            .values(status="queued", updated_at=datetime.utcnow())
+        )
+        db.commit()
+        printers = db.execute(
+            select(PrintJob.printer_name).where(PrintJob.status == "queued").distinct()
+        ).scalars().all()
+    for printer_name in printers:
+        _dispatcher(printer_name).wake()
+    if printers:
+        logger.info(f"Print queue resumed for {len(printers)} printer(s)")
+
+
+def shutdown() -> None:
+    with _dispatchers_lock:
+        for dispatcher in _dispatchers.values():
+            dispatcher.stop()
+        _dispatchers.clear()
@@ -0,0 +1,111 @@
+"""
+Cached printer discovery.
+
+`printer_service.discover_system_printers()` shells out to PowerShell /
+lpstat (or walks EnumPrinters), which is far too slow to run on every label.
+The registry keeps the list in memory, refreshes it on a background thread
+every PRINTER_REFRESH_SECONDS, and answers name validation from the cache.
+A failed discovery keeps the last real list (discovery raises rather than
+inventing placeholder printers), so jobs can't be accepted for printers that
+don't exist.
+"""
+from __future__ import annotations
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.core.config import get_settings
+from backend.services.printer_service import discover_system_printers
+
+logger = logging.getLogger(__name__)
+
+
+class PrinterRegistry:
+    def __init__(self, refresh_seconds: float = 300):
+        self.refresh_seconds = refresh_seconds
+        self._printers: List[Dict] = []
+        self._last_refreshed: Optional[datetime] = None
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> List[Dict]:
+        """
+        Re-query the OS printer list now. On failure the previous list is kept;
+        if there is none yet, only the configured network Zebras are listed.
+        """
+        with self._refresh_lock:
+            error = None
+            try:
+                printers = discover_system_printers()
+            except Exception as e:
+                logger.warning(f"Printer refresh failed, keeping previous list: {e}")
+                error = str(e)
+                with self._lock:
+                    self._last_error = error
+                    if self._last_refreshed is not None:
+                        return list(self._printers)
+                printers = []
+
+            # Network Zebras configured for raw printing are selectable too
+            known = {p["name"] for p in printers}
+            for name in get_settings().ZPL_PRINTER_HOSTS:
+                if name not in known:
+                    printers.append({"name": name, "id": name.lower().replace(' ', '_')})
+
+            with self._lock:
+                self._printers = printers
+                self._last_refreshed = datetime.utcnow()
+                self._last_error = error
+                return list(printers)
+
+    def printers(self) -> List[Dict]:
+        """Cached printer list (refreshed synchronously only if it was never loaded)."""
+        with self._lock:
+            if self._last_refreshed is not None:
+                return list(self._printers)
+        return self.refresh()
+
+    def names(self) -> List[str]:
+        return [p["name"] for p in self.printers()]
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "count": len(self._printers),
+                "last_refreshed": self._last_refreshed,
+                "refresh_seconds": self.refresh_seconds,
+                "last_error": self._last_error,
+                "background_refresh": self._thread is not None and self._thread.is_alive(),
+            }
+
+    @property
+    def last_refreshed(self) -> Optional[datetime]:
+        with self._lock:
+            return self._last_refreshed
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Printer registry refresh crashed")
+            if self._stop.wait(self.refresh_seconds):
+                break
+
+    def start(self) -> None:
+        """Start the background refresh thread (first refresh happens immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="printer-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+printer_registry = PrinterRegistry(refresh_seconds=get_settings().PRINTER_REFRESH_SECONDS)
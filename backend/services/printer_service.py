@@ -6,206 +6,230 @@ from typing import Optional
 from pathlib import Path
 import platform
 
-def get_system_printers() -> list[dict]:
+def discover_system_printers() -> list[dict]:
     """
-    Get list of available printers on the system.
+    Query the OS for its printers (EnumPrinters / PowerShell / lpstat).
     Returns a list of printer dictionaries with name and id.
+    
+    Raises:
+        subprocess.CalledProcessError, FileNotFoundError: If discovery fails
     """
     printers = []
     
-    try:
-        if platform.system() == "Windows":
-            # Windows: Use pywin32 to get actual printer list
-            try:
-                import win32print
+    if platform.system() == "Windows":
+        # Windows: Use pywin32 to get actual printer list
+        try:
+            import win32print
+            
+            # Get all printers (local and network)
+            printer_list = win32print.EnumPrinters(
+                win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS
+            )
+            
+            for printer_info in printer_list:
+                # printer_info is a tuple: (server_name, printer_name, share_name, description)
+                printer_name = printer_info[1]
                 
-                # Get all printers (local and network)
-                printer_list = win32print.EnumPrinters(
-                    win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS
-                )
+                # Clean up printer name - remove extra info after commas
+                if ',' in printer_name:
+                    printer_name = printer_name.split(',')[0].strip()
                 
-                for printer_info in printer_list:
-                    # printer_info is a tuple: (server_name, printer_name, share_name, description)
-                    printer_name = printer_info[1]
-                    
-                    # Clean up printer name - remove extra info after commas
-                    if ',' in printer_name:
-                        printer_name = printer_name.split(',')[0].strip()
-                    
-                    # Generate clean ID
-                    printer_id = printer_name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace('.', '').replace('/', '_')
-                    
-                    printers.append({
-                        "name": printer_name,
-                        "id": printer_id
-                    })
-                    
-            except ImportError:
-                # Fallback to PowerShell if pywin32 not available
-                powershell_script = """
-                Get-Printer | ForEach-Object {
-                    $printer = $_
-                    $printerName = $printer.Name
-                    # Remove extra info after commas
-                    if ($printerName -match ',') {
-                        $printerName = $printerName -split ',' | Select-Object -First 1
-                    }
-                    $printerId = $printerName.ToLower() -replace '[^a-z0-9]', '_'
-                    Write-Output "$printerName|$printerId"
-                }
-                """
+                # Generate clean ID
+                printer_id = printer_name.lower().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace('.', '').replace('/', '_')
                 
-                result = subprocess.run([
-                    "powershell", "-Command", powershell_script
-                ], capture_output=True, text=True, check=True)
+                printers.append({
+                    "name": printer_name,
+                    "id": printer_id
+                })
                 
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip() and '|' in line:
-                        printer_name, printer_id = line.strip().split('|', 1)
-                        printers.append({
-                            "name": printer_name,
-                            "id": printer_id
-                        })
-        
-        elif platform.system() == "Darwin":  # macOS
-            # macOS: Use lpstat to get printer list
-            result = subprocess.run(
-                ["lpstat", "-p"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+        except ImportError:
+            # Fallback to PowerShell if pywin32 not available
+            powershell_script = """
+            Get-Printer | ForEach-Object {
+                $printer = $_
+                $printerName = $printer.Name
+                # Remove extra info after commas
+                if ($printerName -match ',') {
+                    $printerName = $printerName -split ',' | Select-Object -First 1
+                }
+                $printerId = $printerName.ToLower() -replace '[^a-z0-9]', '_'
+                Write-Output "$printerName|$printerId"
+            }
+            """
             
-            for line in result.stdout.split('\n'):
-                if line.startswith('printer '):
-                    printer_name = line.split()[1]
-                    printers.append({
-                        "name": printer_name,
-                        "id": printer_name.lower().replace(' ', '_')
-                    })
-        
-        else:  # Linux
-            # Linux: Use lpstat to get printer list
-            result = subprocess.run(
-                ["lpstat", "-p"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            result = subprocess.run([
+                "powershell", "-Command", powershell_script
+            ], capture_output=True, text=True, check=True)
             
-            for line in result.stdout.split('\n'):
-                if line.startswith('printer '):
-                    printer_name = line.split()[1]
+            for line in result.stdout.strip().split('\n'):
+                if line.strip() and '|' in line:
+                    printer_name, printer_id = line.strip().split('|', 1)
                     printers.append({
                         "name": printer_name,
-                        "id": printer_name.lower().replace(' ', '_')
+                        "id": printer_id
                     })
     
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # Fallback to mock printers if system commands fail
-        printers = [
-            {"name": "Default Printer", "id": "default"},
-            {"name": "HP LaserJet Pro", "id": "hp_laserjet"},
-            {"name": "Canon PIXMA", "id": "canon_pixma"},
-            {"name": "Brother MFC-L2750DW", "id": "brother_mfc"},
-            {"name": "Zebra ZD420", "id": "zebra_zd420"},
-            {"name": "DYMO LabelWriter 450", "id": "dymo_450"},
-        ]
+    elif platform.system() == "Darwin":  # macOS
+        # macOS: Use lpstat to get printer list
+        result = subprocess.run(
+            ["lpstat", "-p"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        
+        for line in result.stdout.split('\n'):
+            if line.startswith('printer '):
+                printer_name = line.split()[1]
+                printers.append({
+                    "name": printer_name,
+                    "id": printer_name.lower().replace(' ', '_')
+                })
+    
+    else:  # Linux
+        # Linux: Use lpstat to get printer list
+        result = subprocess.run(
+            ["lpstat", "-p"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        
+        for line in result.stdout.split('\n'):
+            if line.startswith('printer '):
+                printer_name = line.split()[1]
+                printers.append({
+                    "name": printer_name,
+                    "id": printer_name.lower().replace(' ', '_')
+                })
     
     return printers
 
 
-def print_html_to_printer(html_content: str, printer_name: str) -> bool:
+class PrintError(Exception):
+    """A print job could not be handed to the printer."""
+
+
+# Page setup when HTML is rendered to PDF for a CUPS queue; the document's @page rule wins
+HTML_PRINT_PDF_OPTIONS = {
+    'print_background': True,
+    'prefer_css_page_size': True,
+}
+
+
+def _print_html_cups(html_content: str, printer_name: str, title: str) -> str:
     """
-    Print HTML content directly to the specified printer.
+    Render HTML to PDF on the browser pool and submit it to CUPS.
+    Falls back to html2ps (PostScript) when no browser is available.
+    """
+    from backend.services import cups_backend
+    from backend.services.browser_pool import browser_pool
+
+    try:
+        document = browser_pool.render_pdf(html_content, HTML_PRINT_PDF_OPTIONS)
+        document_format = cups_backend.PDF
+    except Exception as e:
+        print(f"PDF render for {printer_name} failed ({e}); falling back to html2ps")
+        try:
+            html2ps = subprocess.run(["html2ps"], input=html_content.encode("utf-8"), capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as e2:
+            raise PrintError(f"Failed to print HTML to {printer_name}: no PDF renderer and html2ps failed: {e2}") from e2
+        if html2ps.returncode != 0:
+            raise PrintError(f"html2ps failed: {html2ps.stderr.decode(errors='replace').strip()}")
+        document, document_format = html2ps.stdout, cups_backend.POSTSCRIPT
+
+    try:
+        return cups_backend.submit(printer_name, document, document_format, title)
+    except cups_backend.CupsError as e:
+        raise PrintError(f"Failed to print HTML to {printer_name}: {e}") from e
+
+
+def print_html(html_content: str, printer_name: str, title: str = "Box labels") -> Optional[str]:
+    """
+    Print HTML content to the specified printer.
+    
+    Blocks until the job is handed off (Windows: until the browser has had
+    PRINT_HTML_CLEANUP_DELAY_SECONDS to load the page), then removes the
+    temporary HTML file. On Linux the HTML is rendered to PDF and submitted
+    to CUPS (see cups_backend). Meant to run on a print queue worker.
     
     Args:
         html_content: HTML content as string
         printer_name: Name of the printer
+        title: Job name shown in the printer queue
         
     Returns:
-        bool: True if successful, False otherwise
+        str | None: CUPS job id on Linux, None elsewhere
+        
+    Raises:
+        PrintError: if the print command fails
     """
+    from backend.core.config import get_settings
+
+    if platform.system() not in ("Windows", "Darwin"):
+        return _print_html_cups(html_content, printer_name, title)
+
+    if platform.system() == "Windows":
+        # Windows: open the HTML in the default browser with an auto print script
+        html_content = html_content.replace(
+            '</body>', 
+            '''
+            <script>
+            window.onload = function() {
+                window.print();
+                setTimeout(function() {
+                    window.close();
+                }, 1000);
+            };
+            </script>
+            </body>
+            '''
+        )
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
+        temp_file.write(html_content)
+        temp_html_path = temp_file.name
+
     try:
         if platform.system() == "Windows":
-            # Windows: Save HTML and open in default browser with print dialog
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
-                # Add JavaScript to auto-print and close
-                auto_print_html = html_content.replace(
-                    '</body>', 
-                    '''
-                    <script>
-                    window.onload = function() {
-                        window.print();
-                        setTimeout(function() {
-                            window.close();
-                        }, 1000);
-                    };
-                    </script>
-                    </body>
-                    '''
-                )
-                temp_file.write(auto_print_html)
-                temp_html_path = temp_file.name
-            
-            # Open HTML file in default browser
-            subprocess.run([
-                "start", temp_html_path
-            ], check=True, shell=True)
-            
-            # Clean up after a delay
-            import threading
-            def cleanup():
-                import time
-                time.sleep(5)  # Wait 5 seconds before cleanup
-                try:
-                    os.unlink(temp_html_path)
-                except OSError:
-                    pass
-            
-            threading.Thread(target=cleanup, daemon=True).start()
-            
-        elif platform.system() == "Darwin":  # macOS
+            subprocess.run(["start", "", temp_html_path], check=True, shell=True)
+            # The browser reads the file asynchronously; keep it until it has loaded
+            import time
+            time.sleep(get_settings().PRINT_HTML_CLEANUP_DELAY_SECONDS)
+
+        else:  # macOS
             # macOS: Use open command to print HTML
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
-                temp_file.write(html_content)
-                temp_html_path = temp_file.name
-            
-            # Use open command to print HTML
-            subprocess.run([
-                "open", "-a", "Safari", temp_html_path
-            ], check=True)
-            
-            # Clean up
-            try:
-                os.unlink(temp_html_path)
-            except OSError:
-                pass
-            
-        else:  # Linux
-            # Linux: Use html2ps and lpr
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
-                temp_file.write(html_content)
-                temp_html_path = temp_file.name
-            
-            # Convert HTML to PostScript and print
-            subprocess.run([
-                "html2ps", temp_html_path, "|", "lpr", "-P", printer_name
-            ], check=True, shell=True)
-            
-            # Clean up
-            try:
-                os.unlink(temp_html_path)
-            except OSError:
-                pass
+            subprocess.run(["open", "-a", "Safari", temp_html_path], check=True, capture_output=True)
+
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors='replace').strip() if e.stderr else ''
+        raise PrintError(f"Failed to print HTML to {printer_name}: {stderr or e}") from e
+    except OSError as e:
+        raise PrintError(f"Failed to print HTML to {printer_name}: {e}") from e
+    finally:
+        try:
+            os.unlink(temp_html_path)
+        except OSError:
+            pass
+    return None
+
+
+def print_html_to_printer(html_content: str, printer_name: str) -> bool:
+    """
+    Print HTML content directly to the specified printer.
+    
+    Args:
+        html_content: HTML content as string
+        printer_name: Name of the printer
         
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        print_html(html_content, printer_name)
         return True
-    
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to print HTML to {printer_name}: {e}")
-        return False
-    except Exception as e:
-        print(f"Unexpected error printing HTML to {printer_name}: {e}")
+    except PrintError as e:
+        print(str(e))
         return False
 
 
@@ -350,6 +374,85 @@ def print_box_label_direct(html_content: str, printer_name: str) -> bool:
         return False
 
 
+def render_box_label_html(template_data: dict) -> str:
+    """
+    Render the box_label.html template for a single box.
+    
+    Args:
+        template_data: Dictionary containing box label data
+        
+    Returns:
+        str: Rendered HTML label
+    """
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    import os
+    
+    # Setup Jinja2 environment
+    templates_dir = os.path.join(
+        os.path.dirname(__file__), 
+        "..", 
+        "templates"
+    )
+    
+    env = Environment(
+        loader=FileSystemLoader(templates_dir),
+        autoescape=select_autoescape(['html', 'xml'])
+    )
+    
+    # Add custom filters
+    def format_dimension(value):
+        if value is None:
+            return ''
+        try:
+            num = float(value)
+            formatted = f"{num:.3f}".rstrip('0').rstrip('.')
+            return formatted
+        except (ValueError, TypeError):
+            return str(value)
+    
+    def format_phone(value):
+        if not value:
+            return ''
+        digits = ''.join(filter(str.isdigit, str(value)))
+        if len(digits) == 10:
+            return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+        elif len(digits) == 11 and digits[0] == '1':
+            return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
+        return str(value)
+    
+    env.filters['format_dim'] = format_dimension
+    env.filters['format_phone'] = format_phone
+    
+    # Load and render template
+    template = env.get_template('box_label.html')
+    return template.render(**template_data)
+
+
+# Page setup for a box label rendered to PDF (matches @page in box_label.html)
+LABEL_PDF_OPTIONS = {
+    'width': '4in',
+    'height': '4.75in',
+    'print_background': True,
+    'prefer_css_page_size': True,
+    'margin': {'top': '0', 'right': '0', 'bottom': '0', 'left': '0'},
+}
+
+
+def render_box_label_pdf(template_data: dict) -> bytes:
+    """
+    Render the box_label.html template for a single box to PDF.
+    
+    Args:
+        template_data: Dictionary containing box label data
+        
+    Returns:
+        bytes: One-page PDF label
+    """
+    from backend.services.browser_pool import browser_pool
+
+    return browser_pool.render_pdf(render_box_label_html(template_data), LABEL_PDF_OPTIONS)
+
+
 def print_box_label_from_template(template_data: dict, printer_name: str) -> bool:
     """
     Print a box label using template data.
@@ -362,48 +465,7 @@ def print_box_label_from_template(template_data: dict, printer_name: str) -> boo
         bool: True if successful, False otherwise
     """
     try:
-        from jinja2 import Environment, FileSystemLoader, select_autoescape
-        import os
-        
-        # Setup Jinja2 environment
-        templates_dir = os.path.join(
-            os.path.dirname(__file__), 
-            "..", 
-            "templates"
-        )
-        
-        env = Environment(
-            loader=FileSystemLoader(templates_dir),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
-        
-        # Add custom filters
-        def format_dimension(value):
-            if value is None:
-                return ''
-            try:
-                num = float(value)
-                formatted = f"{num:.3f}".rstrip('0').rstrip('.')
-                return formatted
-            except (ValueError, TypeError):
-                return str(value)
-        
-        def format_phone(value):
-            if not value:
-                return ''
-            digits = ''.join(filter(str.isdigit, str(value)))
-            if len(digits) == 10:
-                return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
-            elif len(digits) == 11 and digits[0] == '1':
-                return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
-            return str(value)
-        
-        env.filters['format_dim'] = format_dimension
-        env.filters['format_phone'] = format_phone
-        
-        # Load and render template
-        template = env.get_template('box_label.html')
-        html_content = template.render(**template_data)
+        html_content = render_box_label_html(template_data)
         
         # Print directly
         return print_box_label_direct(html_content, printer_name)
@@ -411,3 +473,88 @@ def print_box_label_from_template(template_data: dict, printer_name: str) -> boo
     except Exception as e:
         print(f"Error in print_box_label_from_template: {e}")
         return False
+
+
+def raw_printer_address(printer_name: str) -> Optional[tuple[str, int]]:
+    """
+    Resolve a printer name to a (host, port) for raw socket printing, if it is one.
+
+    Either a name configured in ZPL_PRINTER_HOSTS or a literal "host:port".
+    Anything else is a system (CUPS / Windows) queue.
+    """
+    from backend.core.config import get_settings
+
+    settings = get_settings()
+    target = settings.ZPL_PRINTER_HOSTS.get(printer_name)
+    if target is None:
+        if not re.fullmatch(r"[\w.-]+:\d{1,5}", printer_name or ""):
+            return None
+        target = printer_name
+
+    host, _, port = target.partition(":")
+    return host, int(port) if port else settings.RAW_PRINT_PORT
+
+
+def send_raw(payload: bytes, printer_name: str, title: str = "Box labels") -> Optional[str]:
+    """
+    Send printer-native data (ZPL) to a printer unchanged, as a single job.
+
+    Network printers (see raw_printer_address) get it over a raw TCP socket
+    (port 9100); system queues get it through CUPS as a raw job (`lp -o raw`
+    or IPP, see cups_backend), or the RAW datatype of the spooler on Windows.
+
+    Returns:
+        str | None: CUPS job id for CUPS queues, None otherwise
+
+    Raises:
+        PrintError: if the printer could not be reached or rejected the job
+    """
+    from backend.core.config import get_settings
+    import socket
+
+    timeout = get_settings().RAW_PRINT_TIMEOUT_SECONDS
+    try:
+        address = raw_printer_address(printer_name)
+        if address is not None:
+            with socket.create_connection(address, timeout=timeout) as sock:
+                sock.sendall(payload)
+                sock.shutdown(socket.SHUT_WR)
+
+        elif platform.system() == "Windows":
+            import win32print
+
+            handle = win32print.OpenPrinter(printer_name)
+            try:
+                win32print.StartDocPrinter(handle, 1, (title, None, "RAW"))
+                try:
+                    win32print.StartPagePrinter(handle)
+                    win32print.WritePrinter(handle, payload)
+                    win32print.EndPagePrinter(handle)
+                finally:
+                    win32print.EndDocPrinter(handle)
+            finally:
+                win32print.ClosePrinter(handle)
+
+        else:  # macOS / Linux (CUPS)
+            from backend.services import cups_backend
+
+            return cups_backend.submit(printer_name, payload, cups_backend.RAW, title)
+
+    except Exception as e:
+        raise PrintError(f"Failed to send raw job to {printer_name}: {e}") from e
+    return None
+
+
+def send_raw_to_printer(payload: bytes, printer_name: str) -> bool:
+    """
+    Send printer-native data (ZPL) to a printer; see send_raw().
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        send_raw(payload, printer_name)
+        return True
+    except PrintError as e:
+        print(str(e))
+        return False
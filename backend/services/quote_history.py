@@ -0,0 +1,139 @@
+"""
+History of UPS quotes (the `shipment_quote` table).
+
+Every quote rate_with_cache() hands back - fresh from UPS or from the rate
+cache - is recorded for its pack with its charges, billing weight and
+shipment fingerprint, so shipping cost reports and re-displaying a pack's
+rates don't have to ask UPS again. Cache hits are flagged `from_cache`; the
+summary counts only quotes fetched from UPS, since a rate shop view replays
+one cached row per service every time it is opened.
+"""
+from __future__ import annotations
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from backend.db.models import ShipmentQuote
+from backend.db.session import AppSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _decimal(value: Optional[float], places: str = "0.01") -> Optional[Decimal]:
+    return Decimal(str(value)).quantize(Decimal(places)) if value is not None else None
+
+
+def _float(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def record(pack_id: int, payload: Dict[str, Any], rate_response: Dict[str, Any], fingerprint: str,
+           use_production: bool = True) -> None:
+    """Add a quote to the history. Failures are logged, never raised - the caller has its quote."""
+    from backend.services.ups_service import summarize_rate_response
+
+    try:
+        shipment = payload["RateRequest"]["Shipment"]
+        packages = shipment.get("Package") or []
+        summary = summarize_rate_response(rate_response)
+        quote = ShipmentQuote(
+            pack_id=pack_id,
+            service_code=summary["service_code"] or (shipment.get("Service") or {}).get("Code"),
+            total_charge=_decimal(summary["total_charge"]),
+            negotiated_charge=_decimal(summary["negotiated_charge"]),
+            currency=summary["currency"],
+            billing_weight_lbs=_decimal(summary["billing_weight"], "0.1"),
+            package_count=len(packages) if isinstance(packages, list) else 1,
+            fingerprint=fingerprint,
+            environment="production" if use_production else "cie",
+            from_cache=bool((rate_response.get("cache") or {}).get("hit")),
+            quoted_at=datetime.utcnow(),
+        )
+        with AppSessionLocal() as db:
+            db.add(quote)
+            db.commit()
+    except Exception as e:
+        logger.warning(f"Could not record UPS quote for pack {pack_id}: {e}")
+
+
+def _quote_dict(q: ShipmentQuote) -> Dict[str, Any]:
+    return {
+        "quote_id": q.id,
+        "pack_id": q.pack_id,
+        "service_code": q.service_code,
+        "total_charge": _float(q.total_charge),
+        "negotiated_charge": _float(q.negotiated_charge),
+        "currency": q.currency,
+        "billing_weight_lbs": _float(q.billing_weight_lbs),
+        "package_count": q.package_count,
+        "fingerprint": q.fingerprint,
+        "environment": q.environment,
+        "from_cache": q.from_cache,
+        "quoted_at": q.quoted_at,
+    }
+
+
+def _filters(pack_id: Optional[int], date_from: Optional[date], date_to: Optional[date],
+             service_code: Optional[str]) -> list:
+    conditions = []
+    if pack_id is not None:
+        conditions.append(ShipmentQuote.pack_id == pack_id)
+    if date_from is not None:
+        conditions.append(ShipmentQuote.quoted_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to is not None:
+        conditions.append(ShipmentQuote.quoted_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if service_code:
+        conditions.append(ShipmentQuote.service_code == service_code)
+    return conditions
+
+
+def list_quotes(pack_id: Optional[int] = None, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                service_code: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """Recorded quotes, newest first; dates are inclusive (UTC)."""
+    with AppSessionLocal() as db:
+        rows = db.execute(
+            select(ShipmentQuote)
+            .where(*_filters(pack_id, date_from, date_to, service_code))
+            .order_by(ShipmentQuote.quoted_at.desc(), ShipmentQuote.id.desc())
+            .limit(limit)
+        ).scalars().all()
+        return [_quote_dict(q) for q in rows]
+
+
+def summary(date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Per service and currency: quote / pack counts and negotiated charge totals and range.
+    Only quotes fetched from UPS count; cache hits (from_cache) are left out."""
+    with AppSessionLocal() as db:
+        rows = db.execute(
+            select(
+                ShipmentQuote.service_code,
+                ShipmentQuote.currency,
+                func.count(ShipmentQuote.id).label("quotes"),
+                func.count(func.distinct(ShipmentQuote.pack_id)).label("packs"),
+                func.sum(ShipmentQuote.negotiated_charge).label("negotiated_total"),
+                func.avg(ShipmentQuote.negotiated_charge).label("negotiated_avg"),
+                func.min(ShipmentQuote.negotiated_charge).label("negotiated_min"),
+                func.max(ShipmentQuote.negotiated_charge).label("negotiated_max"),
+                func.sum(ShipmentQuote.total_charge).label("published_total"),
+            )
+            .where(ShipmentQuote.from_cache == False, *_filters(None, date_from, date_to, None))  # noqa: E712
+            .group_by(ShipmentQuote.service_code, ShipmentQuote.currency)
+            .order_by(ShipmentQuote.service_code, ShipmentQuote.currency)
+        ).all()
+    return [
+        {
+            "service_code": r.service_code,
+            "currency": r.currency,
+            "quotes": r.quotes,
+            "packs": r.packs,
+            "negotiated_total": round(float(r.negotiated_total), 2) if r.negotiated_total is not None else None,
+            "negotiated_avg": round(float(r.negotiated_avg), 2) if r.negotiated_avg is not None else None,
+            "negotiated_min": _float(r.negotiated_min),
+            "negotiated_max": _float(r.negotiated_max),
+            "published_total": round(float(r.published_total), 2) if r.published_total is not None else None,
+        }
+        for r in rows
+    ]
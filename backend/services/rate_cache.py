@@ -0,0 +1,112 @@
+"""
+Persistent cache of UPS rate quotes.
+
+A quote is keyed by a fingerprint of everything UPS prices on - shipper and
+account, ship-to, service code, and every package's dimensions and weight -
+plus the environment (production / CIE). Pack ids and transaction references
+are left out, so re-rating the same shipment (or an identical one) within
+UPS_RATE_CACHE_TTL_SECONDS is answered from the `rate_quote_cache` table,
+which survives restarts.
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.core.config import get_settings
+from backend.db.models import RateQuoteCache
+from backend.db.session import AppSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(payload: Dict[str, Any], use_production: bool = True) -> str:
+    """sha256 of the RateRequest's Shipment (canonical JSON) and the environment."""
+    shipment = payload["RateRequest"]["Shipment"]
+    canonical = json.dumps(
+        {"env": "production" if use_production else "cie", "shipment": shipment},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _with_meta(response: Dict[str, Any], entry: RateQuoteCache, hit: bool) -> Dict[str, Any]:
+    result = copy.deepcopy(response)
+    result["cache"] = {
+        "hit": hit,
+        "fingerprint": entry.fingerprint,
+        "cached_at": entry.created_at.isoformat(),
+        "expires_at": entry.expires_at.isoformat(),
+        "age_seconds": int((datetime.utcnow() - entry.created_at).total_seconds()),
+    }
+    return result
+
+
+def lookup(fp: str) -> Optional[Dict[str, Any]]:
+    """Unexpired quote for a fingerprint (with cache metadata, hit=True) or None."""
+    if get_settings().UPS_RATE_CACHE_TTL_SECONDS <= 0:
+        return None
+    now = datetime.utcnow()
+    with AppSessionLocal() as db:
+        entry = db.execute(
+            select(RateQuoteCache).where(RateQuoteCache.fingerprint == fp, RateQuoteCache.expires_at > now)
+        ).scalar_one_or_none()
+        if entry is None:
+            return None
+        result = _with_meta(json.loads(entry.response_json), entry, hit=True)
+        db.execute(
+            update(RateQuoteCache)
+            .where(RateQuoteCache.id == entry.id)
+            .values(hit_count=RateQuoteCache.hit_count + 1)
+        )
+        db.commit()
+        return result
+
+
+def store(fp: str, response: Dict[str, Any], service_code: Optional[str] = None,
+          pack_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Save a fresh quote (replacing any previous one for the fingerprint) and
+    return it with cache metadata (hit=False). Storage failures are logged,
+    never raised - the caller already has the quote.
+    """
+    now = datetime.utcnow()
+    entry = RateQuoteCache(
+        fingerprint=fp,
+        service_code=service_code,
+        response_json=json.dumps(response, default=str),
+        pack_id=pack_id,
+        hit_count=0,
+        created_at=now,
+        expires_at=now + timedelta(seconds=max(get_settings().UPS_RATE_CACHE_TTL_SECONDS, 0)),
+    )
+    result = _with_meta(response, entry, hit=False)
+    if get_settings().UPS_RATE_CACHE_TTL_SECONDS > 0:
+        try:
+            with AppSessionLocal() as db:
+                db.execute(delete(RateQuoteCache).where(RateQuoteCache.fingerprint == fp))
+                db.add(entry)
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Stored concurrently by another request for the same shipment
+                    db.rollback()
+        except Exception as e:
+            logger.warning(f"Could not store UPS rate quote {fp[:12]}: {e}")
+    return result
+
+
+def purge_expired() -> int:
+    """Delete expired quotes; returns how many were removed."""
+    with AppSessionLocal() as db:
+        removed = db.execute(
+            delete(RateQuoteCache).where(RateQuoteCache.expires_at <= datetime.utcnow())
+        ).rowcount
+        db.commit()
+    return removed or 0
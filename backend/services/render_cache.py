@@ -0,0 +1,63 @@
+"""
+In-memory cache for rendered pack artifacts (packing slip PDF, box labels).
+
+Entries are grouped by pack so a whole pack can be dropped at once (e.g. when
+it is reopened). Each pack carries a generation counter: a background render
+that started before an invalidation will not store its (now stale) result.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from backend.core.config import get_settings
+
+# Artifact keys
+SLIP_PDF = "slip_pdf"
+LABELS_HTML = "labels_html"          # multi-page HTML with every box label
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered artifacts keyed by (pack_id, key)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, Hashable], Any]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, pack_id: int) -> int:
+        """Current generation of a pack; bumped on every invalidation."""
+        with self._lock:
+            return self._generations.get(pack_id, 0)
+
+    def get(self, pack_id: int, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get((pack_id, key))
+            if value is not None:
+                self._entries.move_to_end((pack_id, key))
+            return value
+
+    def put(self, pack_id: int, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        """
+        Store an artifact. If `generation` is given and the pack has been
+        invalidated since, the value is discarded and False is returned.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generations.get(pack_id, 0):
+                return False
+            self._entries[(pack_id, key)] = value
+            self._entries.move_to_end((pack_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate_pack(self, pack_id: int) -> None:
+        """Drop every cached artifact of a pack and bump its generation."""
+        with self._lock:
+            self._generations[pack_id] = self._generations.get(pack_id, 0) + 1
+            for k in [k for k in self._entries if k[0] == pack_id]:
+                del self._entries[k]
+
+
+render_cache = RenderCache(max_entries=get_settings().RENDER_CACHE_MAX_ENTRIES)
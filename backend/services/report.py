@@ -1,130 +1,273 @@
+"""
+Packing slip PDF renderer (pure Python, reportlab).
+
+Draws the same document the `PackingSlipTemplate.xlsm` "Packing Slip Form"
+sheet produced through Excel + VBA: header with Code128 barcode, Bill To /
+Project / Ship To blocks, order/ship dates and the Box Summary table. It runs
+in-process on any OS; `render_packing_slip_in_pool` spreads renders over a
+process pool so several slips can be produced at once.
+"""
+from __future__ import annotations
+import io
 import os
-import tempfile
-import xlwings as xw
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from reportlab.graphics.barcode import code128
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+
+from backend.core.config import get_settings
+
+PAGE_MARGIN = 0.5 * inch
+FOOTER_Y = 0.35 * inch
+ROW_SHADE = colors.HexColor("#EBEBEB")
+
+_styles = getSampleStyleSheet()
+STYLE_BODY = ParagraphStyle("SlipBody", parent=_styles["Normal"], fontName="Helvetica", fontSize=9, leading=11)
+STYLE_BOLD = ParagraphStyle("SlipBold", parent=STYLE_BODY, fontName="Helvetica-Bold")
+STYLE_HEADING = ParagraphStyle("SlipHeading", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=10, leading=13)
+STYLE_TITLE = ParagraphStyle("SlipTitle", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=20, leading=24)
+STYLE_CELL = ParagraphStyle("SlipCell", parent=STYLE_BODY, alignment=TA_CENTER)
+STYLE_PACKING = ParagraphStyle("SlipPacking", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=14,
+                               leading=17, alignment=TA_RIGHT)
+
+
+# ---------------------------------------------------------------------
+# Formatting helpers (same rules as the HTML/Jinja filters)
+# ---------------------------------------------------------------------
+def format_dimension(value) -> str:
+    """24.500 -> 24.5, 24.000 -> 24, 24.125 -> 24.125"""
+    if value is None or value == '':
+        return ''
+    try:
+        return f"{float(value):.3f}".rstrip('0').rstrip('.')
+    except (ValueError, TypeError):
+        return str(value)
+
+
+def format_phone(value) -> str:
+    """Format 10/11 digit phone numbers as (xxx) xxx-xxxx; anything else as-is."""
+    if not value:
+        return ''
+    digits = ''.join(filter(str.isdigit, str(value)))
+    if len(digits) == 10:
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    elif len(digits) == 11 and digits[0] == '1':
+        return f"({digits[1:4]}) {digits[4:7]}-{digits[7:]}"
+    return str(value)
+
+
+def _text(value) -> str:
+    """Escape a value for use inside a reportlab Paragraph."""
+    return escape(str(value)) if value not in (None, '') else ''
+
+
+def _lines(*parts) -> str:
+    return "<br/>".join(p for p in parts if p)
+
+
+class NumberedCanvas(pdf_canvas.Canvas):
+    """Canvas that defers page output so the footer can print 'Page X of Y'."""
+
+    footer_text = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_page_states: List[dict] = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total = len(self._saved_page_states)
+        for state in self._saved_page_states:
+            self.__dict__.update(state)
+            self.draw_footer(self._pageNumber, total)
+            super().showPage()
+        super().save()
+
+    def draw_footer(self, page: int, total: int) -> None:
+        width, _ = self._pagesize
+        self.setFont("Helvetica", 9)
+        self.drawString(PAGE_MARGIN, FOOTER_Y, f"Page {page} of {total}")
+        if self.footer_text:
+            self.drawCentredString(width / 2, FOOTER_Y, self.footer_text)
 
 
-def generate_packing_slip_via_excel(data: dict, pack_id: int) -> str:
+class SlipCanvas(NumberedCanvas):
+    footer_text = "mail@dayus.com  |  www.dayus.com  |  (519) 737-1199"
+
+
+# ---------------------------------------------------------------------
+# Slip sections
+# ---------------------------------------------------------------------
+def build_header(data: Dict, logo=None) -> Table:
+    """Title/logo on the left, barcode + 'PACKING <order_no>' on the right."""
+    order_no = str(data.get('order_no') or '')
+    barcode = code128.Code128(order_no, barHeight=0.45 * inch, barWidth=1.2, quiet=False) if order_no else ''
+    left = logo if logo is not None else Paragraph("Packing Slip", STYLE_TITLE)
+    right = [barcode, Spacer(1, 4), Paragraph(f"PACKING&nbsp;&nbsp;{_text(order_no)}", STYLE_PACKING)]
+    table = Table([[left, right]], colWidths=[3.5 * inch, 4.0 * inch])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+    ]))
+    return table
+
+
+def build_address_block(data: Dict) -> Table:
+    """Bill To | Project/PO/Tag | Ship To, then order date, ship via and shipped date."""
+    bill_to = _lines(
+        f"<b>{_text(data.get('customer_name'))}</b>",
+        _text(data.get('customer_address1')),
+        _text(data.get('customer_address2')),
+        f"{_text(data.get('customer_city'))}; {_text(data.get('customer_province'))}",
+        f"{_text(data.get('customer_country'))}; {_text(data.get('customer_postal_code'))}",
+        _text(format_phone(data.get('customer_phone'))),
+        _text(data.get('sales_rep_name')),
+    )
+    center = _lines(
+        f"<b>Project:</b> {_text(data.get('project_name'))}",
+        f"<b>PO#:</b> {_text(data.get('po_number'))}",
+        f"<b>Tag:</b> {_text(data.get('tag'))}",
+    )
+    ship_address2 = data.get('ship_address2')
+    ship_to = _lines(
+        f"<b>{_text(data.get('ship_name'))}</b>",
+        _text(data.get('ship_address1')),
+        _text(ship_address2) if ship_address2 and str(ship_address2).strip() else '',
+        f"{_text(data.get('ship_city'))}; {_text(data.get('ship_province'))}",
+        f"{_text(data.get('ship_postal_code'))} {_text(data.get('ship_country'))}",
+        f"<b>Attn:</b> {_text(data.get('ship_attention'))}",
+        _text(format_phone(data.get('ship_phone'))),
+        _text(data.get('ship_email')),
+    )
+    rows = [
+        [Paragraph("Bill To:", STYLE_HEADING), '', Paragraph("Ship to:", STYLE_HEADING)],
+        [Paragraph(bill_to, STYLE_BODY), Paragraph(center, STYLE_BODY), Paragraph(ship_to, STYLE_BODY)],
+        [Paragraph(f"<b>Order Date:</b> {_text(data.get('order_date'))}", STYLE_BODY), '', ''],
+        [Paragraph(f"<b>Ship via:</b> {_text(data.get('ship_by'))}", STYLE_BODY), '',
+         Paragraph(f"<b>Shipped Date:</b> {_text(data.get('ship_by_date'))}", STYLE_BODY)],
+    ]
+    table = Table(rows, colWidths=[2.75 * inch, 2.0 * inch, 2.75 * inch])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('SPAN', (0, 3), (1, 3)),
+        ('LINEABOVE', (0, 3), (-1, 3), 0.75, colors.black),
+        ('LINEBELOW', (0, 3), (-1, 3), 0.75, colors.black),
+        ('TOPPADDING', (0, 3), (-1, 3), 5),
+        ('BOTTOMPADDING', (0, 3), (-1, 3), 5),
+    ]))
+    return table
+
+
+def build_items_table(rows: List[List], col_widths: List[float]) -> Table:
+    """Box Summary table; header repeats on every page, odd rows shaded."""
+    header = ["Box #", "Qty\nOrdered", "Qty\nShipped", "Qty\nBackordered", "Code", "Length x Height", "Finish"]
+    table = Table([header] + rows, colWidths=col_widths, repeatRows=1)
+    style = [
+        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 9),
+        ('FONT', (0, 1), (-1, -1), 'Helvetica', 9),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+    ]
+    for i in range(1, len(rows) + 1, 2):
+        style.append(('BACKGROUND', (0, i), (-1, i), ROW_SHADE))
+    table.setStyle(TableStyle(style))
+    return table
+
+
+ITEM_COL_WIDTHS = [0.8 * inch, 0.8 * inch, 0.8 * inch, 0.95 * inch, 1.55 * inch, 1.3 * inch, 1.3 * inch]
+
+
+def _item_rows(items: List[Dict]) -> List[List]:
+    """One row per packed line, as in the workbook's line table."""
+    rows = []
+    for item in items:
+        code = _text(item.get('product_code'))
+        if item.get('product_tag'):
+            code += f"<br/><i>{_text(item.get('product_tag'))}</i>"
+        rows.append([
+            _text(item.get('box_no')),
+            _text(item.get('qty_ordered')),
+            _text(item.get('qty_shipped')),
+            '',
+            Paragraph(code, STYLE_CELL),
+            f"{format_dimension(item.get('length_in'))} x {format_dimension(item.get('height_in'))}",
+            Paragraph(_text(item.get('finish')), STYLE_CELL),
+        ])
+    return rows
+
+
+def render_packing_slip(data: Dict) -> bytes:
     """
-    Populate header + line data in Excel (cell-based write) and run Build_PackingSlip macro.
+    Render a packing slip PDF in-process.
+
+    Args:
+        data: Packing slip data dictionary from get_packing_slip_data()
+
+    Returns:
+        bytes: PDF document
     """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=0.75 * inch,
+        title=f"Packing Slip {data.get('order_no') or ''}",
+    )
+    story = [
+        build_header(data),
+        Spacer(1, 10),
+        build_address_block(data),
+        Spacer(1, 12),
+        Paragraph(f"Box Summary &nbsp;&nbsp;&nbsp; <font size=9>Lead Time Program: "
+                  f"{_text(data.get('lead_time_plan'))}</font>", STYLE_HEADING),
+        Spacer(1, 4),
+        build_items_table(_item_rows(data.get('items', [])), ITEM_COL_WIDTHS),
+    ]
+    doc.build(story, canvasmaker=SlipCanvas)
+    return buffer.getvalue()
 
-    temp_dir = tempfile.gettempdir()
-    pdf_path = os.path.join(temp_dir, f"packing_slip_{pack_id}.pdf")
 
-    app = None
-    wb = None
-    try:
-        # ------------------------------------------------------------------
-        # Open Excel
-        # ------------------------------------------------------------------
-        app = xw.App(visible=False, add_book=False)  # visible=True for debugging
-        app.display_alerts = False
-        app.screen_updating = False
-
-        template_path = os.path.join(
-            os.path.dirname(__file__), "..", "Templates", "PackingSlipTemplate.xlsm"
-        )
-        wb = app.books.open(template_path, read_only=True)
-        ws = wb.sheets["PackingSlip"]
-        ws.activate()
-
-        # ------------------------------------------------------------------
-        # HEADER TABLE (start cell A3)
-        # ------------------------------------------------------------------
-        #ws.range("A3:AD3").clear_contents()
-        header_start = ws.range("A3")
-        header_values = [
-            data.get("order_no", ""),                    # 1
-            data.get("po_number", ""),                   # 2
-            data.get("order_date", ""),                  # 3
-            data.get("due_date", ""),                    # 4
-            data.get("lead_time_plan", ""),              # 5
-            data.get("project_name", ""),                # 6
-            data.get("tag", ""),                         # 7
-            data.get("customer_name", ""),               # 8
-            data.get("customer_address1", ""),           # 9
-            data.get("customer_address2", ""),           # 10
-            data.get("customer_city", ""),               # 11
-            data.get("customer_province", ""),           # 12
-            data.get("customer_postal_code", ""),        # 13
-            data.get("customer_country", ""),            # 14
-            data.get("customer_phone", ""),              # 15
-            data.get("sales_rep_name", ""),              # 16
-            data.get("ship_name", ""),                   # 17
-            data.get("ship_address1", ""),               # 18
-            data.get("ship_address2", ""),               # 19
-            data.get("ship_city", ""),                   # 20
-            data.get("ship_province", ""),               # 21
-            data.get("ship_postal_code", ""),            # 22
-            data.get("ship_country", ""),                # 23
-            data.get("ship_attention", ""),              # 24
-            data.get("ship_phone", ""),                  # 25
-            data.get("ship_email", ""),                  # 26
-            data.get("ship_by", ""),                     # 27
-            data.get("ship_by_date", ""),                # 28
-        ]
-        # write vertically down starting at A3
-        header_start.value = header_values
-
-        # ------------------------------------------------------------------
-        # LINE TABLE (start cell A7)
-        # ------------------------------------------------------------------
-       # ws.range("A7:K1000").clear_contents()
-        line_start = ws.range("A7")
-
-        line_rows = []
-        for item in data.get("items", []):
-            line_rows.append([
-                item.get("box_no", ""),
-                item.get("carton_type", ""),
-                item.get("weight_lb", ""),
-                item.get("qty_ordered", ""),
-                item.get("qty_shipped", ""),
-                item.get("product_code", ""),
-                item.get("length_in", ""),
-                item.get("height_in", ""),
-                item.get("finish", ""),
-                item.get("build_note", ""),
-                item.get("product_tag", ""),
-            ])
-
-        if line_rows:
-            line_start.value = line_rows
-
-        # ------------------------------------------------------------------
-        # PDF path + macro call (unchanged)
-        # ------------------------------------------------------------------
-
-        # Run macro
-        wb.macro("Build_PackingSlip")()
-
-        try:
-            wb.sheets["Packing Slip Form"].range("PdfPath").value = pdf_path
-        except Exception:
-            pass
-
-
-        # Read returned path (if macro updates it)
-        try:
-            returned = wb.sheets["Packing Slip Form"].range("ReturnPath").value
-            if isinstance(returned, str) and returned.strip():
-                pdf_path = returned.strip()
-        except Exception:
-            pass
-
-        return pdf_path
-
-    finally:
-        # ------------------------------------------------------------------
-        # Cleanup
-        # ------------------------------------------------------------------
-        if wb is not None:
-            try:
-                wb.close()
-            except Exception:
-                pass
-        if app is not None:
-            try:
-                app.quit()
-            except Exception:
-                pass
+# ---------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Shared process pool for slip rendering (created on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = get_settings().PACKING_SLIP_PROCESS_WORKERS or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def render_packing_slip_in_pool(data: Dict, timeout: Optional[float] = 60) -> bytes:
+    """Render a packing slip on the shared process pool and return the PDF bytes."""
+    return get_render_pool().submit(render_packing_slip, data).result(timeout=timeout)
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
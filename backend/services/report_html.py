@@ -4,13 +4,13 @@ Uses Jinja2 for templating and Playwright for PDF generation with proper image s
 """
 
 import os
-import tempfile
 import base64
 import io
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from playwright.sync_api import sync_playwright
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from backend.core.config import get_settings
 
 try:
     from barcode import Code128
@@ -21,6 +21,15 @@ except ImportError:
     print("Warning: python-barcode library not installed. Install with: pip install python-barcode[images]")
 
 
+# Images and fonts shared with the frontend
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "Frontend", "vite-project", "src", "assets"
+)
+
+PACKING_SLIP_ENGINES = ("chromium", "native")
+
+
 def load_assets_as_base64() -> Dict[str, str]:
     """
     Load all required assets (images and fonts) as base64 data URIs.
@@ -28,9 +37,7 @@ def load_assets_as_base64() -> Dict[str, str]:
     Returns:
         Dict[str, str]: Dictionary with asset names as keys and base64 data URIs as values
     """
-    # Get the project root directory
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    assets_dir = os.path.join(project_root, "Frontend", "vite-project", "src", "assets")
+    assets_dir = ASSETS_DIR
     
     assets = {}
     
@@ -255,16 +262,32 @@ def format_dimension(value):
         return str(value)
 
 
-def generate_packing_slip_pdf(data: Dict, pack_id: int) -> str:
+# Page setup shared by every Chromium render of the packing slip
+PDF_OPTIONS = {
+    'format': 'Letter',
+    'print_background': True,
+    'margin': {
+        'top': '0.5in',
+        'right': '0.5in',
+        'bottom': '0.75in',
+        'left': '0.5in'
+    },
+    'display_header_footer': False,  # We're using our custom footer
+    'prefer_css_page_size': True,
+    'width': '8.5in',
+    'height': '11in',
+}
+
+
+def render_packing_slip_html(data: Dict) -> str:
     """
-    Generate a packing slip PDF from HTML template using Playwright.
+    Render the packing slip HTML (assets and barcode embedded) for one pack.
     
     Args:
         data: Packing slip data dictionary from get_packing_slip_data()
-        pack_id: Pack ID for filename
         
     Returns:
-        str: Path to generated PDF file
+        str: Rendered HTML document
     """
     # Setup Jinja2 environment
     templates_dir = os.path.join(
@@ -309,39 +332,32 @@ def generate_packing_slip_pdf(data: Dict, pack_id: int) -> str:
     }
     
     # Render HTML
-    html_content = template.render(**template_data)
-    
-    # Generate PDF using Playwright
-    temp_dir = tempfile.gettempdir()
-    pdf_path = os.path.join(temp_dir, f"packing_slip_{pack_id}.pdf")
-    
-    print(f"Generating PDF at: {pdf_path}")
+    return template.render(**template_data)
+
+
+def render_packing_slip_pdf(data: Dict, engine: Optional[str] = None) -> bytes:
+    """
+    Render a packing slip straight to PDF bytes.
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        
-        # Set content and wait for images to load
-        page.set_content(html_content, wait_until='networkidle')
-        
-        # Generate PDF with proper settings for Letter size
-        page.pdf(
-            path=pdf_path,
-            format='Letter',
-            print_background=True,
-            margin={
-                'top': '0.5in',
-                'right': '0.5in',
-                'bottom': '0.75in',
-                'left': '0.5in'
-            },
-            display_header_footer=False,  # We're using our custom footer
-            prefer_css_page_size=True,
-            width='8.5in',
-            height='11in'
-        )
+    Args:
+        data: Packing slip data dictionary from get_packing_slip_data()
+        engine: "chromium" (HTML template on the shared browser pool) or
+            "native" (reportlab drawing of the same layout, on the slip
+            render process pool). Defaults to settings.PACKING_SLIP_ENGINE.
         
-        browser.close()
-    
-    print(f"PDF generated successfully: {pdf_path}")
-    return pdf_path
\ No newline at end of file
+    Returns:
+        bytes: PDF document
+    """
+    engine = engine or get_settings().PACKING_SLIP_ENGINE
+    if engine not in PACKING_SLIP_ENGINES:
+        raise ValueError(f"Unknown packing slip engine '{engine}'. Use one of: {', '.join(PACKING_SLIP_ENGINES)}")
+
+    if engine == "native":
+        from backend.services.report import get_render_pool
+        from backend.services.report_native import render_packing_slip_native
+
+        return get_render_pool().submit(render_packing_slip_native, data).result(timeout=60)
+
+    from backend.services.browser_pool import browser_pool
+
+    return browser_pool.render_pdf(render_packing_slip_html(data), PDF_OPTIONS)
@@ -0,0 +1,356 @@
+"""
+Native (reportlab) renderer for the `packing_slip.html` layout.
+
+Draws the same document Chromium prints from the HTML template - logo and
+ship badge header, barcode, address block, lead time badge, grouped Box
+Summary table and the contact footer - directly to PDF, without a browser.
+Unlike the HTML path it paginates for real: the table header repeats on
+every page and the footer reads "Page X of Y".
+"""
+from __future__ import annotations
+import io
+import os
+from copy import deepcopy
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from reportlab import rl_config
+from reportlab.graphics.barcode import code128
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from backend.services.report import NumberedCanvas, STYLE_BODY, _lines, _text, format_dimension, format_phone
+from backend.services.report_html import ASSETS_DIR, group_items_for_display
+
+try:
+    from svglib.svglib import svg2rlg
+    SVGLIB_AVAILABLE = True
+except ImportError:
+    SVGLIB_AVAILABLE = False
+
+# Write image streams as raw binary: ASCII85 only inflates them and is slow without the C accelerator
+rl_config.useA85 = 0
+
+# Same page box as report_html.PDF_OPTIONS so both engines paginate alike
+MARGIN_TOP = 0.5 * inch
+MARGIN_SIDE = 0.5 * inch
+MARGIN_BOTTOM = 0.75 * inch
+CONTENT_WIDTH = letter[0] - 2 * MARGIN_SIDE
+FOOTER_Y = 0.3 * inch
+IMAGE_DPI = 200  # resolution images are embedded at
+
+HEADER_SHADE = colors.HexColor("#BFBFBF")
+ROW_SHADE = colors.HexColor("#EBEBEB")
+LINK_BLUE = colors.HexColor("#0066cc")
+SEPARATOR_RED = colors.HexColor("#dc2626")
+
+STYLE_ADDRESS = ParagraphStyle("NativeAddress", parent=STYLE_BODY, fontSize=10, leading=15)
+STYLE_H3 = ParagraphStyle("NativeH3", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=11, leading=14,
+                          spaceAfter=4)
+STYLE_TITLE = ParagraphStyle("NativeTitle", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=20, leading=24,
+                             alignment=TA_CENTER)
+STYLE_PACKING = ParagraphStyle("NativePacking", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=18, leading=20,
+                               alignment=TA_CENTER)
+STYLE_ORDER_NO = ParagraphStyle("NativeOrderNo", parent=STYLE_PACKING, fontSize=16, leading=19)
+STYLE_SECTION = ParagraphStyle("NativeSection", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=13, leading=16)
+STYLE_LEAD_TIME = ParagraphStyle("NativeLeadTime", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=11,
+                                 leading=14, alignment=TA_RIGHT)
+STYLE_TH = ParagraphStyle("NativeTh", parent=STYLE_BODY, fontName="Helvetica-Bold", fontSize=10, leading=12,
+                          alignment=TA_CENTER)
+STYLE_TD = ParagraphStyle("NativeTd", parent=STYLE_BODY, fontSize=11, leading=13, alignment=TA_CENTER)
+STYLE_TAG = ParagraphStyle("NativeTag", parent=STYLE_TD, fontName="Helvetica-Oblique", fontSize=10, leading=12,
+                           textColor=colors.HexColor("#333333"))
+
+# Column widths (percent of the content width) as Chromium lays out the template's table
+_COL_PERCENT = [12, 10, 10, 13, 19, 18, 18]
+ITEM_COL_WIDTHS = [CONTENT_WIDTH * p / sum(_COL_PERCENT) for p in _COL_PERCENT]
+
+
+# ---------------------------------------------------------------------
+# Assets
+# ---------------------------------------------------------------------
+def _asset_path(name: str) -> Optional[str]:
+    path = os.path.join(ASSETS_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+@lru_cache(maxsize=None)
+def _scaled_png(name: str, height: float) -> Optional[bytes]:
+    """
+    Asset flattened onto white and downscaled to IMAGE_DPI at `height` points.
+
+    The source PNGs are ~1000px wide with alpha; embedding them as-is makes
+    reportlab re-encode megabytes of pixels (and a soft mask) on every slip.
+    Cached per process, so each render only copies a few KB.
+    """
+    path = _asset_path(name)
+    if path is None:
+        return None
+    from PIL import Image as PILImage
+
+    with PILImage.open(path) as src:
+        src = src.convert("RGBA")
+        flat = PILImage.new("RGB", src.size, "white")
+        flat.paste(src, mask=src.split()[-1])
+    target_h = max(1, round(height / 72 * IMAGE_DPI))
+    if target_h < flat.height:
+        flat = flat.resize((round(flat.width * target_h / flat.height), target_h), PILImage.LANCZOS)
+    buffer = io.BytesIO()
+    flat.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _image(name: str, height: float) -> Optional[Image]:
+    """Image flowable scaled to `height`, keeping the aspect ratio."""
+    png = _scaled_png(name, height)
+    if png is None:
+        return None
+    w, h = ImageReader(io.BytesIO(png)).getSize()
+    return Image(io.BytesIO(png), width=height * w / h, height=height)
+
+
+@lru_cache(maxsize=None)
+def _logo_drawing():
+    path = _asset_path("dayus-logo.svg")
+    if not SVGLIB_AVAILABLE or path is None:
+        return None
+    return svg2rlg(path)
+
+
+def _logo(height: float):
+    """The SVG logo as vector graphics when svglib is installed, otherwise a text fallback."""
+    drawing = _logo_drawing()
+    if drawing is None:
+        return Paragraph("DAYUS", ParagraphStyle("NativeLogo", parent=STYLE_TITLE, alignment=0))
+    logo = deepcopy(drawing)
+    scale = height / logo.height
+    logo.width, logo.height = logo.width * scale, height
+    logo.scale(scale, scale)
+    return logo
+
+
+def _lead_time_badge(lead_time_plan: Optional[str]) -> str:
+    plan = lead_time_plan or ''
+    if '3 Day' in plan or '3Day' in plan:
+        return "Rectangle - 3 Day - New Red.png"
+    if 'Friday' in plan:
+        return "Rectangle - Friday - New Red .png"
+    return "Rectangle - Standard - New Red.png"
+
+
+# ---------------------------------------------------------------------
+# Page furniture
+# ---------------------------------------------------------------------
+class NativeSlipCanvas(NumberedCanvas):
+    """Footer: page count left, contact links centred, Dayus mark right."""
+
+    def draw_footer(self, page: int, total: int) -> None:
+        width, _ = self._pagesize
+        self.setFont("Helvetica", 10)
+        self.setFillColor(colors.black)
+        self.drawString(MARGIN_SIDE, FOOTER_Y, f"Page {page} of {total}")
+
+        # Contact line; the red separators are drawn as squares (no glyph for them in Helvetica)
+        parts = [("mail@dayus.com", "mailto:mail@dayus.com"), None,
+                 ("www.dayus.com", "https://www.dayus.com"), None,
+                 ("(519) 737-1199", None)]
+        gap, square = 8, 5
+        widths = [self.stringWidth(p[0], "Helvetica", 11) if p else square for p in parts]
+        x = width / 2 - (sum(widths) + gap * (len(parts) - 1)) / 2
+        self.setFont("Helvetica", 11)
+        for part, part_width in zip(parts, widths):
+            if part is None:
+                self.setFillColor(SEPARATOR_RED)
+                self.rect(x, FOOTER_Y + 1.5, square, square, stroke=0, fill=1)
+            else:
+                text, url = part
+                self.setFillColor(LINK_BLUE if url else colors.black)
+                self.drawString(x, FOOTER_Y, text)
+                if url:
+                    self.setStrokeColor(LINK_BLUE)
+                    self.setLineWidth(0.5)
+                    self.line(x, FOOTER_Y - 1.5, x + part_width, FOOTER_Y - 1.5)
+            x += part_width + gap
+
+        height = 25 * 0.75  # 25px
+        mark = _scaled_png("dayus-mark.png", height)
+        if mark is not None:
+            # Same ImageReader name on every page, so the image is embedded once
+            reader = ImageReader(io.BytesIO(mark))
+            w, h = reader.getSize()
+            self.drawImage(reader, width - MARGIN_SIDE - height * w / h, FOOTER_Y - 6, height * w / h, height)
+
+
+# ---------------------------------------------------------------------
+# Slip sections
+# ---------------------------------------------------------------------
+def build_header(data: Dict) -> Table:
+    """Logo | 3 Day Ship badge | barcode over 'PACKING' / order number, ruled underneath."""
+    order_no = str(data.get('order_no') or '')
+    barcode = code128.Code128(order_no, barHeight=0.32 * inch, barWidth=1.5, quiet=True) if order_no else ''
+    packing = [barcode, Spacer(1, 4), Paragraph("PACKING", STYLE_PACKING), Paragraph(_text(order_no), STYLE_ORDER_NO)]
+    badge = _image("Square - 3 Day - New Red.png", 70 * 0.75) or ''
+    table = Table([[_logo(40 * 0.75), badge, packing]], colWidths=[3.0 * inch, 1.5 * inch, 3.0 * inch])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+        ('ALIGN', (2, 0), (2, 0), 'CENTER'),
+        ('LEFTPADDING', (0, 0), (0, 0), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('LINEBELOW', (0, 0), (-1, 0), 0.75, colors.black),
+    ]))
+    return table
+
+
+def build_address_block(data: Dict) -> Table:
+    """Bill To | Project/PO/Tag | Ship To, order date, then Ship via / Shipped Date between rules."""
+    bill_to = _lines(
+        f"<b>{_text(data.get('customer_name'))}</b>",
+        _text(data.get('customer_address1')),
+        _text(data.get('customer_address2')),
+        f"{_text(data.get('customer_city'))}; {_text(data.get('customer_province'))}",
+        f"{_text(data.get('customer_country'))}; {_text(data.get('customer_postal_code'))}",
+        _text(format_phone(data.get('customer_phone'))),
+        _text(data.get('sales_rep_name')),
+    )
+    center = [
+        Paragraph(f"<b>Project:</b>&nbsp;&nbsp;{_text(data.get('project_name'))}", STYLE_ADDRESS),
+        Spacer(1, 6),
+        Paragraph(f"<b>PO#:</b>&nbsp;&nbsp;{_text(data.get('po_number'))}", STYLE_ADDRESS),
+        Spacer(1, 6),
+        Paragraph(f"<b>Tag:</b>&nbsp;&nbsp;{_text(data.get('tag'))}", STYLE_ADDRESS),
+    ]
+    ship_address2 = data.get('ship_address2')
+    ship_to = "<br/>".join([
+        f"<b>{_text(data.get('ship_name'))}</b>",
+        _text(data.get('ship_address1')),
+    ] + ([_text(ship_address2)] if ship_address2 and str(ship_address2).strip() else []) + [
+        f"{_text(data.get('ship_city'))}; {_text(data.get('ship_province'))}",
+        f"{_text(data.get('ship_postal_code'))} {_text(data.get('ship_country'))}",
+        "",
+        f"<b>Attn:</b> {_text(data.get('ship_attention'))}",
+        _text(format_phone(data.get('ship_phone'))),
+        _text(data.get('ship_email')),
+    ])
+    third = CONTENT_WIDTH / 3
+    rows = [
+        [[Paragraph("Bill To:", STYLE_H3), Paragraph(bill_to, STYLE_ADDRESS)],
+         center,
+         [Paragraph("Ship to:", STYLE_H3), Paragraph(ship_to, STYLE_ADDRESS)]],
+        [Paragraph(f"<b>Order Date:</b>&nbsp;&nbsp;{_text(data.get('order_date'))}", STYLE_ADDRESS), '', ''],
+        [Paragraph(f"<b>Ship via:</b>&nbsp;&nbsp;{_text(data.get('ship_by'))}", STYLE_ADDRESS), '',
+         Paragraph(f"<b>Shipped Date:</b>&nbsp;&nbsp;{_text(data.get('ship_by_date'))}",
+                   ParagraphStyle("NativeShipped", parent=STYLE_ADDRESS, alignment=TA_RIGHT))],
+    ]
+    table = Table(rows, colWidths=[third, third, third])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (0, -1), 0),
+        ('SPAN', (0, 1), (-1, 1)),
+        ('SPAN', (0, 2), (1, 2)),
+        ('TOPPADDING', (0, 1), (-1, 1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, 1), 8),
+        ('LINEABOVE', (0, 2), (-1, 2), 0.75, colors.black),
+        ('LINEBELOW', (0, 2), (-1, 2), 0.75, colors.black),
+        ('TOPPADDING', (0, 2), (-1, 2), 8),
+        ('BOTTOMPADDING', (0, 2), (-1, 2), 8),
+        ('RIGHTPADDING', (2, 2), (2, 2), 20),
+    ]))
+    return table
+
+
+def build_section_title(data: Dict) -> Table:
+    """'Box Summary' on the left, 'Lead Time Program' + delivery badge on the right."""
+    badge = _image(_lead_time_badge(data.get('lead_time_plan')), 30 * 0.75) or ''
+    badge_width = badge.drawWidth + 10 if badge else 0
+    table = Table(
+        [[Paragraph("Box Summary", STYLE_SECTION), Paragraph("Lead Time Program", STYLE_LEAD_TIME), badge]],
+        colWidths=[CONTENT_WIDTH - 2.0 * inch - badge_width, 2.0 * inch, badge_width],
+    )
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (0, 0), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ]))
+    return table
+
+
+def _grouped_rows(grouped_items: List[Dict]) -> List[List]:
+    rows = []
+    for group in grouped_items:
+        rows.append([
+            Paragraph(_text(group.get('box_display')), STYLE_TD),
+            _text(group.get('qty_ordered')),
+            _text(group.get('qty_shipped')),
+            '',
+            [Paragraph(_text(group.get('product_code')), STYLE_TD),
+             Paragraph(_text(group.get('product_tag')) or '&nbsp;', STYLE_TAG)],
+            f"{format_dimension(group.get('length_in'))} x {format_dimension(group.get('height_in'))}",
+            Paragraph(_text(group.get('finish')), STYLE_TD),
+        ])
+    return rows
+
+
+def build_items_table(grouped_items: List[Dict]) -> Table:
+    """Box Summary table; grey header repeats on every page, odd body rows shaded."""
+    header = [Paragraph(h, STYLE_TH) for h in
+              ("Box #", "Qty<br/>Ordered", "Qty<br/>Shipped", "Qty<br/>Backordered", "Code", "Length x Height", "Finish")]
+    rows = _grouped_rows(grouped_items)
+    table = Table([header] + rows, colWidths=ITEM_COL_WIDTHS, repeatRows=1)
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), HEADER_SHADE),
+        ('FONT', (0, 1), (-1, -1), 'Helvetica', 11),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+        ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('LEFTPADDING', (0, 0), (-1, -1), 2),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 2),
+    ]
+    for i in range(1, len(rows) + 1, 2):
+        style.append(('BACKGROUND', (0, i), (-1, i), ROW_SHADE))
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def render_packing_slip_native(data: Dict) -> bytes:
+    """
+    Render the HTML packing slip layout straight to PDF, without Chromium.
+
+    Args:
+        data: Packing slip data dictionary from get_packing_slip_data()
+
+    Returns:
+        bytes: PDF document
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=MARGIN_SIDE,
+        rightMargin=MARGIN_SIDE,
+        topMargin=MARGIN_TOP,
+        bottomMargin=MARGIN_BOTTOM,
+        title=f"Packing Slip - {data.get('order_no') or ''}",
+    )
+    story = [
+        build_header(data),
+        Spacer(1, 12),
+        Paragraph("PACKING SLIP", STYLE_TITLE),
+        Spacer(1, 12),
+        build_address_block(data),
+        Spacer(1, 14),
+        build_section_title(data),
+        Spacer(1, 10),
+        build_items_table(group_items_for_display(data.get('items', []))),
+    ]
+    doc.build(story, canvasmaker=NativeSlipCanvas)
+    return buffer.getvalue()
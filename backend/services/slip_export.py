@@ -0,0 +1,132 @@
+"""
+End-of-day packing slip export: many packs -> one merged PDF or one ZIP.
+
+Packs are processed in chunks (BATCH_EXPORT_CHUNK_SIZE): each chunk's data
+is assembled with one batched query set and its slips are rendered in
+parallel on the browser pool.
+
+ZIP is the bounded path: each chunk's PDFs are written straight into a
+spooled temporary file, so only one chunk of PDFs is in memory at a time.
+A merged PDF cannot be built that way - pypdf keeps every appended page in
+its writer until the document is written - so memory grows with the number
+of packs, and merged exports are limited to BATCH_EXPORT_MAX_MERGED_PACKS.
+"""
+from __future__ import annotations
+import io
+import logging
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+from backend.core.config import get_settings
+from backend.services.pack_view import get_packing_slip_data_batch
+from backend.services.report_html import render_packing_slip_pdf
+
+try:
+    from pypdf import PdfWriter, PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Spooled output stays in memory up to this size, then moves to disk
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _chunks(items: List[int], size: int) -> Iterator[List[int]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _render_chunk(pack_ids: List[int], executor: ThreadPoolExecutor) -> Iterator[Tuple[int, bytes | None, str | None]]:
+    """Yield (pack_id, pdf_bytes, error) in pack_ids order."""
+    slips = get_packing_slip_data_batch(pack_ids)
+    futures = {pid: executor.submit(render_packing_slip_pdf, slips[pid]) for pid in pack_ids if pid in slips}
+    for pid in pack_ids:
+        if pid not in futures:
+            yield pid, None, "Pack not found or order missing in OES"
+            continue
+        try:
+            yield pid, futures.pop(pid).result(), None
+        except Exception as e:
+            logger.exception(f"Packing slip render failed for pack {pid}")
+            yield pid, None, str(e)
+
+
+def export_packing_slips(pack_ids: List[int], fmt: str = "zip") -> Tuple[tempfile.SpooledTemporaryFile, int, List[dict]]:
+    """
+    Render the packing slips of `pack_ids` into a single artifact.
+
+    Args:
+        pack_ids: Packs to export, in output order
+        fmt: "zip" (one PDF per pack) or "pdf" (all slips merged, held in memory until written;
+            at most BATCH_EXPORT_MAX_MERGED_PACKS packs)
+
+    Returns:
+        (spooled file positioned at 0, size in bytes, list of {pack_id, error} for skipped packs)
+    """
+    if fmt not in ("zip", "pdf"):
+        raise ValueError("Export format must be 'zip' or 'pdf'")
+    if fmt == "pdf" and not PYPDF_AVAILABLE:
+        raise ValueError("Merged PDF export requires pypdf. Install with: pip install pypdf")
+
+    settings = get_settings()
+    if fmt == "pdf" and len(pack_ids) > settings.BATCH_EXPORT_MAX_MERGED_PACKS:
+        raise ValueError(
+            f"Too many packs ({len(pack_ids)}) for one merged PDF; the limit is "
+            f"{settings.BATCH_EXPORT_MAX_MERGED_PACKS}. Use format=zip for larger exports"
+        )
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    skipped: List[dict] = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.BROWSER_POOL_SIZE, thread_name_prefix="slip-export") as executor:
+            if fmt == "zip":
+                with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                    for chunk in _chunks(pack_ids, settings.BATCH_EXPORT_CHUNK_SIZE):
+                        for pid, pdf, error in _render_chunk(chunk, executor):
+                            if pdf is None:
+                                skipped.append({"pack_id": pid, "error": error})
+                                continue
+                            zf.writestr(f"packing_slip_{pid}.pdf", pdf)
+                    if skipped:
+                        zf.writestr(
+                            "skipped.txt",
+                            "\n".join(f"{s['pack_id']}: {s['error']}" for s in skipped),
+                        )
+            else:
+                writer = PdfWriter()
+                for chunk in _chunks(pack_ids, settings.BATCH_EXPORT_CHUNK_SIZE):
+                    for pid, pdf, error in _render_chunk(chunk, executor):
+                        if pdf is None:
+                            skipped.append({"pack_id": pid, "error": error})
+                            continue
+                        writer.append(PdfReader(io.BytesIO(pdf)))
+                # Every slip embeds the same logo/badge images; keep one copy of each
+                try:
+                    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+                except AttributeError:
+                    pass  # older pypdf
+                writer.write(out)
+    except Exception:
+        out.close()
+        raise
+
+    size = out.tell()
+    out.seek(0)
+    return out, size, skipped
+
+
+def iter_file(f, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Stream a file object in chunks and close it when done."""
+    try:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            yield block
+    finally:
+        f.close()
@@ -0,0 +1,59 @@
+# backend/services/stations.py
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.db.models import StationSetting
+
+LABEL_FORMATS = ("html", "zpl")
+
+
+def list_stations(db: Session) -> list[StationSetting]:
+    return list(db.execute(select(StationSetting).order_by(StationSetting.station_id)).scalars().all())
+
+
+def get_station(db: Session, station_id: str) -> Optional[StationSetting]:
+    return db.execute(
+        select(StationSetting).where(StationSetting.station_id == station_id)
+    ).scalar_one_or_none()
+
+
+def upsert_station(db: Session, station_id: str, *, printer_name: Optional[str], label_format: str = "html",
+                   auto_print_labels: bool = False, user_id: Optional[int] = None) -> StationSetting:
+    station_id = (station_id or "").strip()
+    if not station_id:
+        raise ValueError("station_id is required")
+    if label_format not in LABEL_FORMATS:
+        raise ValueError(f"Unknown label format '{label_format}'. Use one of: {', '.join(LABEL_FORMATS)}")
+    if auto_print_labels and not printer_name:
+        raise ValueError("A printer is required to auto-print labels")
+
+    s = get_station(db, station_id)
+    if s is None:
+        s = StationSetting(station_id=station_id)
+        db.add(s)
+    s.printer_name = printer_name
+    s.label_format = label_format
+    s.auto_print_labels = bool(auto_print_labels)
+    s.updated_by = user_id
+    s.updated_at = datetime.utcnow()
+    db.flush()
+    return s
+
+
+def delete_station(db: Session, station_id: str) -> None:
+    s = get_station(db, station_id)
+    if not s:
+        raise ValueError(f"Station {station_id} not found")
+    db.delete(s)
+    db.flush()
+
+
+def auto_print_target(db: Session, station_id: Optional[str]) -> Optional[StationSetting]:
+    """The station's settings if it auto-prints labels when a box is weighed, else None."""
+    if not station_id:
+        return None
+    s = get_station(db, station_id)
+    if s is None or not s.auto_print_labels or not s.printer_name:
+        return None
+    return s
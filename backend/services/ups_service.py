@@ -4,34 +4,43 @@ Handles OAuth authentication and rate requests for UPS shipping.
 """
 from __future__ import annotations
 import requests
+import asyncio
 import base64
-import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional, Tuple
 from backend.core.config import get_settings
+from backend.services import carrier_log
+from backend.db.session import run_db
+from backend.services.carrier_http import async_carrier_http, carrier_http, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Used when UPS leaves expires_in out of the token response
+DEFAULT_TOKEN_LIFETIME_SECONDS = 3600
 
-def get_oauth_token(client_id: str, client_secret: str, use_production: bool = True) -> str:
+
+def ups_base_url(use_production: bool = True) -> str:
+    """UPS API root: production or CIE, unless UPS_BASE_URL points somewhere else (e.g. the fake server)."""
+    base_url = get_settings().UPS_BASE_URL
+    if base_url:
+        return base_url.rstrip("/")
+    return "https://onlinetools.ups.com" if use_production else "https://wwwcie.ups.com"
+
+
+def _request_oauth_token(client_id: str, client_secret: str, use_production: bool = True) -> Dict[str, Any]:
     """
-    Get OAuth token from UPS using client credentials flow.
-    
-    Args:
-        client_id: UPS API Client ID
-        client_secret: UPS API Client Secret
-        use_production: If True, use production endpoint; else use CIE (testing)
+    Request a new OAuth token from UPS using client credentials flow.
     
     Returns:
-        OAuth access token string
+        UPS token response (access_token, expires_in, ...)
     
     Raises:
         ValueError: If authentication fails
     """
-    if use_production:
-        token_url = "https://onlinetools.ups.com/security/v1/oauth/token"
-    else:
-        token_url = "https://wwwcie.ups.com/security/v1/oauth/token"
+    token_url = f"{ups_base_url(use_production)}/security/v1/oauth/token"
     
     # Create Basic Auth header using client_secret_basic method
     credentials = f"{client_id}:{client_secret}"
@@ -47,14 +56,138 @@ def get_oauth_token(client_id: str, client_secret: str, use_production: bool = T
     }
     
     try:
-        response = requests.post(token_url, headers=headers, data=data)
+        response = carrier_http.post(token_url, "ups.oauth", headers=headers, data=data)
         response.raise_for_status()
         token_data = response.json()
-        return token_data["access_token"]
     except requests.exceptions.RequestException as e:
         raise ValueError(f"UPS OAuth authentication failed: {str(e)}")
-    except KeyError:
+    if not token_data.get("access_token"):
         raise ValueError("UPS OAuth response missing access_token")
+    return token_data
+
+
+class OAuthTokenCache:
+    """
+    UPS OAuth tokens keyed by (client id, environment).
+    
+    A token is reused until UPS_TOKEN_REFRESH_MARGIN_SECONDS before its
+    `expires_in` runs out. Refreshes are single-flight per key: concurrent
+    callers wait for the one request in progress instead of each asking UPS
+    for a token.
+    """
+
+    def __init__(self):
+        self._tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}  # key -> (token, expires at, monotonic)
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(client_id: str, use_production: bool) -> Tuple[str, str]:
+        return client_id, "production" if use_production else "cie"
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._tokens.get(key)
+        if entry is None:
+            return None
+        token, expires_at = entry
+        if time.monotonic() >= expires_at - get_settings().UPS_TOKEN_REFRESH_MARGIN_SECONDS:
+            return None
+        return token
+
+    def get(self, client_id: str, client_secret: str, use_production: bool = True) -> str:
+        key = self._key(client_id, use_production)
+        with self._lock:
+            token = self._fresh(key)
+            if token is not None:
+                return token
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another caller may have refreshed while we waited
+            with self._lock:
+                token = self._fresh(key)
+                if token is not None:
+                    return token
+
+            token_data = _request_oauth_token(client_id, client_secret, use_production)
+            try:
+                lifetime = int(token_data.get("expires_in") or DEFAULT_TOKEN_LIFETIME_SECONDS)
+            except (TypeError, ValueError):
+                lifetime = DEFAULT_TOKEN_LIFETIME_SECONDS
+            token = token_data["access_token"]
+            with self._lock:
+                self._tokens[key] = (token, time.monotonic() + lifetime)
+            logger.info(f"UPS OAuth token refreshed for {key[1]} (expires in {lifetime}s)")
+            return token
+
+    def peek(self, client_id: str, use_production: bool = True) -> Optional[str]:
+        """The cached token if still fresh; never calls UPS."""
+        with self._lock:
+            return self._fresh(self._key(client_id, use_production))
+
+    def invalidate(self, client_id: str, use_production: bool = True) -> None:
+        """Forget a token (e.g. UPS answered 401 with it)."""
+        with self._lock:
+            self._tokens.pop(self._key(client_id, use_production), None)
+
+
+_token_cache = OAuthTokenCache()
+
+
+def get_oauth_token(client_id: str, client_secret: str, use_production: bool = True) -> str:
+    """
+    Get OAuth token from UPS using client credentials flow.
+    
+    Tokens are cached until shortly before they expire, so normally this
+    makes no HTTP call.
+    
+    Args:
+        client_id: UPS API Client ID
+        client_secret: UPS API Client Secret
+        use_production: If True, use production endpoint; else use CIE (testing)
+    
+    Returns:
+        OAuth access token string
+    
+    Raises:
+        ValueError: If authentication fails
+    """
+    return _token_cache.get(client_id, client_secret, use_production)
+
+
+# Services compared by rate shopping, in the same code families map_service_level_to_ups_code uses
+DOMESTIC_SERVICES = [
+    ("14", "UPS Next Day Air Early"),
+    ("01", "Next Day Air"),
+    ("13", "Next Day Air Saver"),
+    ("02", "2nd Day Air"),
+    ("12", "3 Day Select"),
+    ("03", "Ground"),
+]
+INTERNATIONAL_SERVICES = [
+    ("54", "UPS Worldwide Express Plus"),
+    ("07", "UPS Worldwide Express"),
+    ("65", "UPS Saver"),
+    ("08", "UPS Worldwide Expedited"),
+    ("11", "UPS Standard"),
+]
+
+
+def uses_international_codes(destination_country: Optional[str], origin_country: Optional[str]) -> bool:
+    """
+    If origin is CA, all shipments (including CA-to-CA) use international codes.
+    If origin is US, US-to-US is domestic, US-to-CA is international.
+    """
+    origin_country = (origin_country or "US").upper().strip()[:2]
+    destination_country = (destination_country or "US").upper().strip()[:2]
+    return origin_country == "CA" or origin_country != destination_country
+
+
+def eligible_services(destination_country: Optional[str], origin_country: Optional[str]) -> list[tuple[str, str]]:
+    """(code, description) of every service worth quoting for this lane."""
+    if uses_international_codes(destination_country, origin_country):
+        return list(INTERNATIONAL_SERVICES)
+    return list(DOMESTIC_SERVICES)
 
 
 def map_service_level_to_ups_code(service_level: Optional[str], destination_country: Optional[str], origin_country: Optional[str] = None) -> tuple[str, str]:
@@ -75,9 +208,6 @@ def map_service_level_to_ups_code(service_level: Optional[str], destination_coun
     if len(origin_country) != 2:
         origin_country = "US"
     
-    # Determine if origin is CA
-    is_origin_ca = origin_country == "CA"
-    
     # Determine if destination is US or CA
     destination_country = (destination_country or "US").upper().strip()[:2]
     if len(destination_country) != 2:
@@ -87,9 +217,7 @@ def map_service_level_to_ups_code(service_level: Optional[str], destination_coun
     is_ca = destination_country == "CA"
     
     # Determine if this is a domestic or international shipment
-    # If origin is CA, all shipments (including CA-to-CA) use international codes
-    # If origin is US, US-to-US is domestic, US-to-CA is international
-    use_international_codes = is_origin_ca or (origin_country != destination_country)
+    use_international_codes = uses_international_codes(destination_country, origin_country)
     
     # If service level is empty or None, use defaults
     if not service_level or not service_level.strip():
@@ -139,46 +267,22 @@ def map_service_level_to_ups_code(service_level: Optional[str], destination_coun
             return ("03", "Ground")
 
 
-def get_ups_rate(
-    pack_id: int,
-    pack_boxes: list[Dict[str, Any]],
-    ship_to_address: Dict[str, Any],
-    service_level: Optional[str],
-    ups_account_number: str,
-    ship_from_address: Dict[str, Any],
-    use_production: bool = True
-) -> Dict[str, Any]:
-    """
-    Get UPS shipping rate for a pack.
-    
-    Args:
-        pack_id: Pack ID
-        pack_boxes: List of box dictionaries with dimensions and weights
-        ship_to_address: Ship-to address dictionary
-        service_level: Service level from OES
-        ups_account_number: UPS account number (6 digits)
-        ship_from_address: Ship-from address dictionary
-        use_production: If True, use production endpoint; else use CIE
-    
-    Returns:
-        UPS RateResponse dictionary
-    
-    Raises:
-        ValueError: If request fails or missing required data
-    """
+def ship_from_address() -> Dict[str, Any]:
+    """Ship-from address from the UPS_SHIP_FROM_* settings."""
     settings = get_settings()
-    
-    # Validate credentials
-    if not settings.UPS_CLIENT_ID or not settings.UPS_CLIENT_SECRET:
-        raise ValueError("UPS API credentials not configured")
-    
-    if not ups_account_number:
-        raise ValueError("UPS account number is required for negotiated rates")
-    
-    # Get OAuth token
-    token = get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, use_production)
-    
-    # Map service level to UPS code
+    return {
+        "name": settings.UPS_SHIP_FROM_NAME,
+        "address1": settings.UPS_SHIP_FROM_ADDRESS1,
+        "address2": settings.UPS_SHIP_FROM_ADDRESS2,
+        "city": settings.UPS_SHIP_FROM_CITY,
+        "province": settings.UPS_SHIP_FROM_PROVINCE,
+        "postal_code": settings.UPS_SHIP_FROM_POSTAL_CODE,
+        "country": settings.UPS_SHIP_FROM_COUNTRY
+    }
+
+
+def shipment_countries(ship_to_address: Dict[str, Any], ship_from_address: Dict[str, Any]) -> tuple[str, str]:
+    """Normalized 2-letter (destination, origin) country codes for a shipment."""
     # Extract and normalize destination country code
     destination_country = ship_to_address.get("ship_country") or ship_to_address.get("country") or "US"
     # Normalize to uppercase 2-letter code
@@ -190,8 +294,25 @@ def get_ups_rate(
     origin_country = ship_from_address.get("country", "CA").upper().strip()[:2]
     if len(origin_country) != 2:
         origin_country = "CA"  # Default to CA based on config
+    return destination_country, origin_country
+
+
+def build_rate_payload(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    ship_from_address: Dict[str, Any],
+    ups_account_number: str,
+    service_code: str,
+    service_description: str,
+) -> Dict[str, Any]:
+    """
+    Build the UPS RateRequest body for one service.
     
-    service_code, service_description = map_service_level_to_ups_code(service_level, destination_country, origin_country)
+    Raises:
+        ValueError: If boxes or the ship-to address are incomplete
+    """
+    destination_country, _ = shipment_countries(ship_to_address, ship_from_address)
     
     # Build packages array
     packages = []
@@ -312,49 +433,498 @@ def get_ups_rate(
             }
         }
     }
-    
-    # Make API request
-    if use_production:
-        api_url = "https://onlinetools.ups.com/api/rating/v2409/Rate"
-    else:
-        api_url = "https://wwwcie.ups.com/api/rating/v2409/Rate"
-    
-    headers = {
+    return payload
+
+
+# Paces every rating call to UPS, however many packs / services are being quoted at once
+rate_limiter = TokenBucket(get_settings().UPS_RATE_LIMIT_PER_SECOND, get_settings().UPS_RATE_LIMIT_BURST)
+
+
+def _note_throttle(response) -> None:
+    if response.status_code == 429:
+        # Still throttled after the HTTP client's own retries: hold everyone back
+        try:
+            pause = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            pause = get_settings().UPS_RATE_PAUSE_ON_429_SECONDS
+        logger.warning(f"UPS rating throttled (429); pausing rating calls for {pause:.1f}s")
+        rate_limiter.pause(pause)
+
+
+def _post_rate(api_url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> requests.Response:
+    rate_limiter.acquire()
+    response = carrier_http.post(api_url, "ups.rate", json=payload, headers=headers)
+    _note_throttle(response)
+    return response
+
+
+async def _post_rate_async(api_url: str, payload: Dict[str, Any], headers: Dict[str, str]):
+    await rate_limiter.acquire_async()
+    response = await async_carrier_http.post(api_url, "ups.rate", json=payload, headers=headers)
+    _note_throttle(response)
+    return response
+
+
+def _rate_headers(token: str, pack_id: int) -> Dict[str, str]:
+    return {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
-        "transId": f"pack_{pack_id}".ljust(32)[:32],  # 32 char max
+        "transId": f"pack_{pack_id}"[:32],  # 32 char max; no padding (trailing spaces are not a legal header value)
         "transactionSrc": "packaging-app"
     }
+
+
+def _rate_call_fields(payload: Dict[str, Any], pack_id: int, use_production: bool) -> Dict[str, Any]:
+    """Summary fields carrier_log records for a rating call."""
+    shipment = payload["RateRequest"]["Shipment"]
+    packages = shipment.get("Package") or []
+    return {
+        "pack_id": pack_id,
+        "service": (shipment.get("Service") or {}).get("Code"),
+        "packages": len(packages) if isinstance(packages, list) else 1,
+        "env": "production" if use_production else "cie",
+    }
+
+
+def post_rate_request(payload: Dict[str, Any], pack_id: int, use_production: bool = True) -> Dict[str, Any]:
+    """
+    Send a RateRequest to UPS (no caching).
+    
+    Returns:
+        UPS RateResponse dictionary
+    
+    Raises:
+        ValueError: If the request fails
+    """
+    settings = get_settings()
+    
+    # Make API request
+    api_url = f"{ups_base_url(use_production)}/api/rating/v2409/Rate"
+    
+    # OAuth token (cached until shortly before it expires)
+    token = get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, use_production)
     
-    # Log request payload for debugging
-    logger.info(f"UPS API Request for Pack {pack_id}:")
-    logger.info(f"URL: {api_url}")
-    logger.info(f"Headers: {json.dumps({k: v if k != 'Authorization' else 'Bearer [REDACTED]' for k, v in headers.items()}, indent=2)}")
-    logger.info(f"Payload: {json.dumps(payload, indent=2)}")
+    headers = _rate_headers(token, pack_id)
+    call = _rate_call_fields(payload, pack_id, use_production)
+    started = time.perf_counter()
     
+    response = None
     try:
-        response = requests.post(api_url, json=payload, headers=headers)
+        response = _post_rate(api_url, payload, headers)
+        if response.status_code == 401:
+            # Cached token revoked or expired early: fetch a new one and retry once
+            logger.warning("UPS rejected the cached OAuth token; requesting a new one")
+            _token_cache.invalidate(settings.UPS_CLIENT_ID, use_production)
+            token = get_oauth_token(settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, use_production)
+            headers["Authorization"] = f"Bearer {token}"
+            response = _post_rate(api_url, payload, headers)
         
-        # Log response for debugging
-        logger.info(f"UPS API Response for Pack {pack_id}:")
-        logger.info(f"Status Code: {response.status_code}")
         try:
             response_json = response.json()
-            logger.info(f"Response Body: {json.dumps(response_json, indent=2)}")
-        except:
-            logger.info(f"Response Body (raw): {response.text[:1000]}")  # Limit to first 1000 chars
+        except ValueError:
+            response_json = {"raw": response.text[:1000]}
         
         response.raise_for_status()
+        rated = summarize_rate_response(response_json)
+        carrier_log.log_call("ups.rate", started, response.status_code, request=payload, response=response_json,
+                             **call, charge=rated["charge"], currency=rated["currency"])
         return response_json
     except requests.exceptions.RequestException as e:
         error_msg = f"UPS API request failed: {str(e)}"
+        status = response.status_code if response is not None else None
+        error_data = None
         if hasattr(e, 'response') and e.response is not None:
             try:
                 error_data = e.response.json()
-                logger.error(f"UPS API Error Response: {json.dumps(error_data, indent=2)}")
                 error_msg += f" - {error_data}"
-            except:
-                logger.error(f"UPS API Error Response (raw): {e.response.text[:1000]}")
+            except ValueError:
                 error_msg += f" - Status: {e.response.status_code}"
+        carrier_log.log_call("ups.rate", started, status, level=logging.WARNING, request=payload,
+                             response=error_data, **call, error=_ups_error(error_data) or type(e).__name__)
+        raise ValueError(error_msg)
+
+
+def _ups_error(error_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """"code: message" of the first error in a UPS error response."""
+    try:
+        first = error_data["response"]["errors"][0]
+        return f"{first.get('code')}: {first.get('message')}"
+    except (TypeError, KeyError, IndexError):
+        return None
+
+
+async def get_oauth_token_async(use_production: bool = True) -> str:
+    """
+    get_oauth_token() for coroutines. A cached token is returned straight
+    away; the occasional refresh runs on the DB executor so it keeps the
+    sync cache's single-flight behaviour.
+    """
+    settings = get_settings()
+    token = _token_cache.peek(settings.UPS_CLIENT_ID, use_production)
+    if token is not None:
+        return token
+    return await run_db(get_oauth_token, settings.UPS_CLIENT_ID, settings.UPS_CLIENT_SECRET, use_production)
+
+
+async def post_rate_request_async(payload: Dict[str, Any], pack_id: int, use_production: bool = True) -> Dict[str, Any]:
+    """
+    post_rate_request() on the async HTTP client: the event loop is free
+    while UPS works on the quote.
+    
+    Raises:
+        ValueError: If the request fails
+    """
+    import httpx
+
+    settings = get_settings()
+    api_url = f"{ups_base_url(use_production)}/api/rating/v2409/Rate"
+    headers = _rate_headers(await get_oauth_token_async(use_production), pack_id)
+    call = _rate_call_fields(payload, pack_id, use_production)
+    started = time.perf_counter()
+    
+    try:
+        response = await _post_rate_async(api_url, payload, headers)
+        if response.status_code == 401:
+            logger.warning("UPS rejected the cached OAuth token; requesting a new one")
+            _token_cache.invalidate(settings.UPS_CLIENT_ID, use_production)
+            headers["Authorization"] = f"Bearer {await get_oauth_token_async(use_production)}"
+            response = await _post_rate_async(api_url, payload, headers)
+    except httpx.HTTPError as e:
+        carrier_log.log_call("ups.rate", started, None, level=logging.WARNING, request=payload,
+                             **call, error=type(e).__name__)
+        raise ValueError(f"UPS API request failed: {str(e)}")
+    
+    try:
+        response_json = response.json()
+    except ValueError:
+        response_json = None
+    
+    if response.is_error:
+        error_msg = f"UPS API request failed: {response.status_code} {response.reason_phrase} for url: {response.url}"
+        error_msg += f" - {response_json}" if response_json is not None else f" - Status: {response.status_code}"
+        carrier_log.log_call("ups.rate", started, response.status_code, level=logging.WARNING, request=payload,
+                             response=response_json, **call,
+                             error=_ups_error(response_json) or f"HTTP {response.status_code}")
         raise ValueError(error_msg)
+    
+    if response_json is None:
+        response_json = {"raw": response.text[:1000]}
+    rated = summarize_rate_response(response_json)
+    carrier_log.log_call("ups.rate", started, response.status_code, request=payload, response=response_json,
+                         **call, charge=rated["charge"], currency=rated["currency"])
+    return response_json
+
+
+def rate_with_cache(payload: Dict[str, Any], pack_id: int, use_production: bool = True,
+                    use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Rate a RateRequest, reusing a stored quote for the same shipment fingerprint.
+    
+    The UPS response is returned with a "cache" entry added: hit, fingerprint,
+    cached_at, expires_at and age_seconds. Every quote returned is also added
+    to the shipment_quote history for this pack (cache hits with from_cache
+    set: the fingerprint leaves the pack out, so the hit may replay another
+    pack's quote).
+    """
+    from backend.services import quote_history, rate_cache
+
+    fingerprint = rate_cache.fingerprint(payload, use_production)
+    if use_cache:
+        cached = rate_cache.lookup(fingerprint)
+        if cached is not None:
+            logger.debug(f"UPS rate for Pack {pack_id} served from cache ({fingerprint[:12]})")
+            quote_history.record(pack_id, payload, cached, fingerprint, use_production)
+            return cached
+
+    rate_response = post_rate_request(payload, pack_id, use_production)
+    service_code = payload["RateRequest"]["Shipment"]["Service"]["Code"]
+    stored = rate_cache.store(fingerprint, rate_response, service_code=service_code, pack_id=pack_id)
+    quote_history.record(pack_id, payload, stored, fingerprint, use_production)
+    return stored
+
+
+async def rate_with_cache_async(payload: Dict[str, Any], pack_id: int, use_production: bool = True,
+                                use_cache: bool = True) -> Dict[str, Any]:
+    """rate_with_cache() for coroutines; cache and history writes run on the DB executor."""
+    from backend.services import quote_history, rate_cache
+
+    fingerprint = rate_cache.fingerprint(payload, use_production)
+    if use_cache:
+        cached = await run_db(rate_cache.lookup, fingerprint)
+        if cached is not None:
+            logger.debug(f"UPS rate for Pack {pack_id} served from cache ({fingerprint[:12]})")
+            await run_db(quote_history.record, pack_id, payload, cached, fingerprint, use_production)
+            return cached
+
+    rate_response = await post_rate_request_async(payload, pack_id, use_production)
+    service_code = payload["RateRequest"]["Shipment"]["Service"]["Code"]
+    stored = await run_db(rate_cache.store, fingerprint, rate_response, service_code=service_code, pack_id=pack_id)
+    await run_db(quote_history.record, pack_id, payload, stored, fingerprint, use_production)
+    return stored
+
+
+def get_ups_rate(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+    use_production: bool = True,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Get UPS shipping rate for a pack.
+    
+    Args:
+        pack_id: Pack ID
+        pack_boxes: List of box dictionaries with dimensions and weights
+        ship_to_address: Ship-to address dictionary
+        service_level: Service level from OES
+        ups_account_number: UPS account number (6 digits)
+        ship_from_address: Ship-from address dictionary
+        use_production: If True, use production endpoint; else use CIE
+        use_cache: If False, always ask UPS (the fresh quote is still stored)
+    
+    Returns:
+        UPS RateResponse dictionary, plus "cache" metadata (see rate_with_cache)
+    
+    Raises:
+        ValueError: If request fails or missing required data
+    """
+    payload = _service_level_payload(pack_id, pack_boxes, ship_to_address, service_level,
+                                     ups_account_number, ship_from_address)
+    return rate_with_cache(payload, pack_id, use_production, use_cache)
 
+
+async def get_ups_rate_async(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+    use_production: bool = True,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """get_ups_rate() for async endpoints; same arguments, result and errors."""
+    payload = _service_level_payload(pack_id, pack_boxes, ship_to_address, service_level,
+                                     ups_account_number, ship_from_address)
+    return await rate_with_cache_async(payload, pack_id, use_production, use_cache)
+
+
+def _check_rate_config(ups_account_number: str) -> None:
+    settings = get_settings()
+    if not settings.UPS_CLIENT_ID or not settings.UPS_CLIENT_SECRET:
+        raise ValueError("UPS API credentials not configured")
+    if not ups_account_number:
+        raise ValueError("UPS account number is required for negotiated rates")
+
+
+def _service_level_payload(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+) -> Dict[str, Any]:
+    """RateRequest for the UPS service the OES service level maps to."""
+    _check_rate_config(ups_account_number)
+    
+    # Map service level to UPS code
+    destination_country, origin_country = shipment_countries(ship_to_address, ship_from_address)
+    service_code, service_description = map_service_level_to_ups_code(service_level, destination_country, origin_country)
+    
+    return build_rate_payload(
+        pack_id, pack_boxes, ship_to_address, ship_from_address,
+        ups_account_number, service_code, service_description,
+    )
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _money(charge: Optional[Dict[str, Any]]) -> Optional[float]:
+    return _number((charge or {}).get("MonetaryValue"))
+
+
+def summarize_rate_response(rate_response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pull the numbers a supervisor compares out of a UPS RateResponse.
+    
+    Returns:
+        dict: service_code, total_charge, negotiated_charge, charge (negotiated
+        if present, else published), currency, business_days_in_transit,
+        billing_weight, alerts
+    """
+    rated = (rate_response.get("RateResponse") or {}).get("RatedShipment") or {}
+    if isinstance(rated, list):
+        rated = rated[0] if rated else {}
+    total = rated.get("TotalCharges") or {}
+    negotiated = (rated.get("NegotiatedRateCharges") or {}).get("TotalCharge")
+    alerts = rated.get("RatedShipmentAlert") or []
+    if isinstance(alerts, dict):
+        alerts = [alerts]
+    total_charge, negotiated_charge = _money(total), _money(negotiated)
+    return {
+        "service_code": (rated.get("Service") or {}).get("Code"),
+        "total_charge": total_charge,
+        "negotiated_charge": negotiated_charge,
+        "charge": negotiated_charge if negotiated_charge is not None else total_charge,
+        "currency": total.get("CurrencyCode") or (negotiated or {}).get("CurrencyCode"),
+        "business_days_in_transit": (rated.get("GuaranteedDelivery") or {}).get("BusinessDaysInTransit"),
+        "billing_weight": _number((rated.get("BillingWeight") or {}).get("Weight")),
+        "alerts": [a.get("Description") for a in alerts if a.get("Description")],
+    }
+
+
+# Shared by every rate-shop request; bounds concurrent calls to UPS from this process
+rate_executor = ThreadPoolExecutor(max_workers=get_settings().UPS_RATE_SHOP_WORKERS, thread_name_prefix="ups-rate")
+
+
+def rate_shop(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+    use_production: bool = True,
+    use_cache: bool = True,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Quote every eligible service for a pack at once and rank the results.
+    
+    All services are requested concurrently, so the call takes about as long
+    as the slowest single quote; anything still outstanding after `timeout`
+    (UPS_RATE_SHOP_TIMEOUT_SECONDS by default) is reported in `timed_out`
+    and the quotes that did come back are returned.
+    
+    Returns:
+        dict: requested_service (the OES service level's mapping), rates
+        (cheapest first, each a summarize_rate_response() plus service and
+        cache), errors, timed_out, elapsed_ms
+    
+    Raises:
+        ValueError: If credentials or shipment data are missing
+    """
+    if timeout is None:
+        timeout = get_settings().UPS_RATE_SHOP_TIMEOUT_SECONDS
+    requested, services, payloads = _shop_payloads(pack_id, pack_boxes, ship_to_address, service_level,
+                                                   ups_account_number, ship_from_address)
+
+    start = time.perf_counter()
+    futures = {
+        rate_executor.submit(rate_with_cache, payloads[code], pack_id, use_production, use_cache): (code, description)
+        for code, description in services
+    }
+    done, not_done = wait(futures, timeout=timeout)
+    for future in not_done:
+        future.cancel()
+
+    outcomes = []
+    for future in done:
+        try:
+            outcomes.append((futures[future], future.result()))
+        except Exception as e:
+            outcomes.append((futures[future], e))
+    return _shop_result(pack_id, requested, outcomes, [futures[f][0] for f in not_done], start)
+
+
+async def rate_shop_async(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+    use_production: bool = True,
+    use_cache: bool = True,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    rate_shop() for async endpoints: the services are quoted as concurrent
+    tasks on the event loop rather than on rate_executor threads. Same
+    arguments, result and errors.
+    """
+    if timeout is None:
+        timeout = get_settings().UPS_RATE_SHOP_TIMEOUT_SECONDS
+    requested, services, payloads = _shop_payloads(pack_id, pack_boxes, ship_to_address, service_level,
+                                                   ups_account_number, ship_from_address)
+
+    start = time.perf_counter()
+    tasks = {
+        asyncio.ensure_future(rate_with_cache_async(payloads[code], pack_id, use_production, use_cache)): (code, description)
+        for code, description in services
+    }
+    done, not_done = await asyncio.wait(tasks, timeout=timeout)
+    for task in not_done:
+        task.cancel()
+
+    outcomes = []
+    for task in done:
+        try:
+            outcomes.append((tasks[task], task.result()))
+        except Exception as e:
+            outcomes.append((tasks[task], e))
+    return _shop_result(pack_id, requested, outcomes, [tasks[t][0] for t in not_done], start)
+
+
+def _shop_payloads(
+    pack_id: int,
+    pack_boxes: list[Dict[str, Any]],
+    ship_to_address: Dict[str, Any],
+    service_level: Optional[str],
+    ups_account_number: str,
+    ship_from_address: Dict[str, Any],
+) -> Tuple[Tuple[str, str], list, Dict[str, Dict[str, Any]]]:
+    """(requested (code, description), eligible services, RateRequest per service code)"""
+    _check_rate_config(ups_account_number)
+
+    destination_country, origin_country = shipment_countries(ship_to_address, ship_from_address)
+    requested = map_service_level_to_ups_code(service_level, destination_country, origin_country)
+    services = eligible_services(destination_country, origin_country)
+
+    # Payloads are validated up front so bad box data fails the whole request
+    payloads = {
+        code: build_rate_payload(pack_id, pack_boxes, ship_to_address, ship_from_address,
+                                 ups_account_number, code, description)
+        for code, description in services
+    }
+    return requested, services, payloads
+
+
+def _shop_result(pack_id: int, requested: Tuple[str, str], outcomes: list, timed_out: list,
+                 start: float) -> Dict[str, Any]:
+    """Rank rate-shop outcomes ((code, description), response or exception) into the response."""
+    requested_code, requested_description = requested
+    rates, errors = [], []
+    for (code, description), outcome in outcomes:
+        if isinstance(outcome, Exception):
+            # Typically "service not available" for this lane
+            errors.append({"service_code": code, "service": description, "error": str(outcome)})
+            continue
+        summary = summarize_rate_response(outcome)
+        summary.update({"service_code": code, "service": description,
+                        "requested": code == requested_code, "cache": outcome.get("cache")})
+        rates.append(summary)
+
+    rates.sort(key=lambda r: (r["charge"] is None, r["charge"] if r["charge"] is not None else 0))
+    for rank, rate in enumerate(rates, start=1):
+        rate["rank"] = rank
+
+    return {
+        "pack_id": pack_id,
+        "mode": "shop",
+        "requested_service": {"service_code": requested_code, "service": requested_description},
+        "rates": rates,
+        "errors": sorted(errors, key=lambda e: e["service_code"]),
+        "timed_out": sorted(timed_out),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000),
+    }
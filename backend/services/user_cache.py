@@ -0,0 +1,103 @@
+"""
+Short-lived cache of the users behind authenticated requests.
+
+get_current_user() would otherwise look the user up on every request. Entries
+are keyed by (username, token issue time) and live for
+AUTH_USER_CACHE_TTL_SECONDS; the user management endpoints drop a user's
+entries as soon as they change it, and a per-username generation counter
+keeps a lookup that raced with such a change from storing the old record.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.core.config import get_settings
+
+CacheKey = Tuple[str, Optional[int]]
+
+
+class UserCache:
+    """Thread-safe TTL + LRU cache of detached User rows keyed by (username, iat)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, username: str) -> int:
+        """Current generation of a username; bumped on every invalidation."""
+        with self._lock:
+            return self._generations.get(username, 0)
+
+    def get(self, username: str, issued_at: Optional[int]) -> Optional[Any]:
+        if self.ttl_seconds <= 0:
+            return None
+        key = (username, issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, username: str, issued_at: Optional[int], user: Any, generation: int) -> bool:
+        """
+        Store a user loaded at `generation`. If the username has been
+        invalidated since, the user is discarded and False is returned.
+        """
+        if self.ttl_seconds <= 0:
+            return False
+        with self._lock:
+            if generation != self._generations.get(username, 0):
+                return False
+            key = (username, issued_at)
+            self._entries[key] = (user, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *usernames: str) -> None:
+        """Drop every cached entry of these usernames (all tokens) and bump their generation."""
+        with self._lock:
+            for username in usernames:
+                self._generations[username] = self._generations.get(username, 0) + 1
+                for k in [k for k in self._entries if k[0] == username]:
+                    del self._entries[k]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for username in {k[0] for k in self._entries}:
+                self._generations[username] = self._generations.get(username, 0) + 1
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(
+    ttl_seconds=get_settings().AUTH_USER_CACHE_TTL_SECONDS,
+    max_entries=get_settings().AUTH_USER_CACHE_MAX_ENTRIES,
+)
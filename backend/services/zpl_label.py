@@ -0,0 +1,161 @@
+"""
+ZPL (Zebra Programming Language) box labels.
+
+Produces the `box_label.html` fields as native ZPL for the Zebra ZD420s:
+ship-to block, Attn/phone, tag, project, PO/DRG #, "BOX N OF M", a Code128
+of the order number and the four two-up item rows that line up with the
+pre-printed lines on the 4in x 4.75in stock. The printer rasterises the
+text itself, so labels print sharp and need no browser.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from backend.services.report import format_dimension, format_phone
+
+DPI = 203
+LABEL_WIDTH_IN = 4.0
+LABEL_HEIGHT_IN = 4.75
+
+# Item table (same geometry as box_label.html's .contents-table)
+ITEM_ROWS = 4
+ITEM_ROW_HEIGHT_IN = 0.375
+ITEM_BOTTOM_IN = 0.12
+ITEM_LEFT_IN = 0.02
+ITEM_RIGHT_IN = 0.03
+# qty | description | length | x | height, per half; the browser normalises the percentages
+_ITEM_COL_PERCENT = [11, 27, 7.2, 2.1, 7.2]
+
+
+def dots(inches: float) -> int:
+    return round(inches * DPI)
+
+
+def zpl_escape(value) -> str:
+    """
+    Make a value safe inside ^FD (used with ^FH_ and ^CI28).
+
+    '^' and '~' would start a command and '_' is the hex escape character,
+    so those - plus control and non-ASCII characters, as UTF-8 bytes - are
+    written as _XX hex escapes.
+    """
+    if value is None:
+        return ''
+    out = []
+    for ch in str(value):
+        if ch in '\r\n\t':
+            out.append(' ')
+        elif ch in '^~_' or not (32 <= ord(ch) < 127):
+            out.extend(f"_{b:02X}" for b in ch.encode('utf-8'))
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _text(x: int, y: int, value, height: int, width: Optional[int] = None, block: Optional[int] = None,
+          align: str = 'L') -> str:
+    """Scalable font (^A0) text field; `block` wraps it in a one-line ^FB of that width."""
+    fb = f"^FB{block},1,0,{align},0" if block else ''
+    return f"^FO{x},{y}^A0N,{height},{width or height}{fb}^FH_^FD{zpl_escape(value)}^FS"
+
+
+def render_box_label_zpl(data: Dict, total_boxes: Optional[int] = None) -> str:
+    """
+    Render one box label as a ZPL ^XA...^XZ block.
+
+    Args:
+        data: Box label data from get_box_label_data()
+        total_boxes: Box count for "BOX N OF M" (defaults to data['total_boxes'])
+
+    Returns:
+        str: ZPL for a single label
+    """
+    total_boxes = total_boxes if total_boxes is not None else data.get('total_boxes')
+    width, height = dots(LABEL_WIDTH_IN), dots(LABEL_HEIGHT_IN)
+    left = dots(0.1)
+    content_width = width - 2 * left
+
+    big, small, line = 39, 34, 48  # 14pt / 12pt text, 14pt * 1.4 line height
+    col2 = left + dots(0.55)
+
+    cmds = [
+        "^XA",
+        "^CI28",  # UTF-8 field data
+        f"^PW{width}",
+        f"^LL{height}",
+        "^LH0,0",
+    ]
+
+    # --- Ship-to block (below the pre-printed header) ---
+    y = dots(0.625)
+    cmds.append(_text(left, y + 4, "To:", small))
+    cmds.append(_text(col2, y, data.get('ship_name'), big, block=content_width - (col2 - left)))
+    y += line
+    for value in (
+        data.get('ship_address1'),
+        data.get('ship_address2') if data.get('ship_address2') and str(data.get('ship_address2')).strip() else None,
+        f"{data.get('ship_city') or ''}, {data.get('ship_province') or ''} {data.get('ship_postal_code') or ''}",
+    ):
+        if value is None:
+            continue
+        cmds.append(_text(left, y, value, big, block=content_width))
+        y += line
+
+    half = content_width // 2
+    cmds.append(_text(left, y, "Attn:", small))
+    cmds.append(_text(col2, y, data.get('ship_attention') or '', small, block=half - (col2 - left)))
+    cmds.append(_text(left + half, y, "PH:", small))
+    cmds.append(_text(left + half + dots(0.45), y, format_phone(data.get('ship_phone')), small))
+    y += line
+
+    cmds.append(_text(left, y, "Tag:", small))
+    cmds.append(_text(col2, y, data.get('tag') or '', big, block=content_width - (col2 - left)))
+    y += line
+    cmds.append(_text(left, y, "Proj:", small))
+    cmds.append(_text(col2, y, data.get('project_name') or '', small, block=content_width - (col2 - left)))
+    y += line
+
+    cmds.append(_text(left, y, "PO #:", small))
+    cmds.append(_text(col2, y, data.get('po_number') or '', big, block=half - (col2 - left)))
+    cmds.append(_text(left + half, y, "DRG #:", small))
+    cmds.append(_text(left + half + dots(0.6), y, data.get('order_no') or '', big))
+    y += line + dots(0.05)
+
+    # --- Barcode (order number) + BOX N OF M ---
+    order_no = str(data.get('order_no') or '')
+    if order_no:
+        cmds.append(f"^FO{left},{y}^BY2,3,{dots(0.3)}^BCN,{dots(0.3)},N,N,N^FH_^FD{zpl_escape(order_no)}^FS")
+    box_text = f"BOX {data.get('box_no') or ''}"
+    if total_boxes:
+        box_text += f" OF {total_boxes}"
+    cmds.append(_text(left + half, y, box_text, 50, block=half, align='R'))
+
+    # --- Item rows (two items per row, on the pre-printed lines) ---
+    items: List[Dict] = data.get('items') or []
+    table_left = dots(ITEM_LEFT_IN)
+    table_width = width - table_left - dots(ITEM_RIGHT_IN)
+    scale = table_width / (2 * sum(_ITEM_COL_PERCENT))
+    col_widths = [round(p * scale) for p in _ITEM_COL_PERCENT]
+    row_height = dots(ITEM_ROW_HEIGHT_IN)
+    rows_top = height - dots(ITEM_BOTTOM_IN) - ITEM_ROWS * row_height
+    item_font = 23  # 8pt
+    for i, item in enumerate(items[:ITEM_ROWS * 2]):
+        row, side = divmod(i, 2)
+        x = table_left + side * sum(col_widths)
+        ty = rows_top + row * row_height + (row_height - item_font) // 2
+        qty_w, desc_w, len_w, x_w, _ = col_widths
+        cmds.append(_text(x, ty, item.get('qty'), item_font, block=qty_w, align='C'))
+        x += qty_w
+        cmds.append(_text(x, ty, item.get('product_code'), item_font, block=desc_w))
+        x += desc_w
+        cmds.append(_text(x, ty, format_dimension(item.get('length_in')), item_font, block=len_w))
+        x += len_w + x_w
+        cmds.append(_text(x, ty, format_dimension(item.get('height_in')), item_font))
+
+    cmds.append("^PQ1")
+    cmds.append("^XZ")
+    return "\n".join(cmds) + "\n"
+
+
+def render_pack_labels_zpl(all_box_data: List[Dict]) -> str:
+    """All of a pack's box labels as one ZPL job (one ^XA...^XZ per label)."""
+    return "".join(render_box_label_zpl(box_data) for box_data in all_box_data)